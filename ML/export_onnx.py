@@ -5,6 +5,7 @@ import pickle
 import joblib
 from pathlib import Path
 from typing import Any
+from sklearn.svm import LinearSVC
 from skl2onnx import convert_sklearn
 from skl2onnx.common.data_types import FloatTensorType
 from datetime import datetime, timezone
@@ -86,6 +87,25 @@ def can_convert_to_onnx(model, model_key: str) -> bool:
     return True
 
 
+def to_primal_linear_svc(model):
+    """Rewrite a binary linear-kernel SVC as the equivalent LinearSVC (w.x + b).
+
+    skl2onnx converts SVC through the SVMClassifier operator, which sums every
+    support-vector kernel term in float32 and drifts by up to ~0.1 in decision
+    score. The primal form scores with one dot product and stays within ~1e-4.
+    """
+    if type(model).__name__ != 'SVC' or model.kernel != 'linear' or len(model.classes_) != 2:
+        return model
+    if getattr(model, 'probability', False):
+        return model
+    primal = LinearSVC()
+    primal.coef_ = np.asarray(model.coef_, dtype=np.float64)
+    primal.intercept_ = np.asarray(model.intercept_, dtype=np.float64)
+    primal.classes_ = model.classes_
+    primal.n_features_in_ = model.n_features_in_
+    return primal
+
+
 def export_model(model_key: str, out_path: Path):
     """Export a single model to ONNX format."""
     model_path = MODEL_PATHS.get(model_key)
@@ -104,7 +124,11 @@ def export_model(model_key: str, out_path: Path):
         print(f"[export] Converting '{model_key}' model with {n_features} features -> ONNX")
         
         initial_type = [('input', FloatTensorType([None, n_features]))]
-        onnx_model = convert_sklearn(model, initial_types=initial_type)
+        model = to_primal_linear_svc(model)
+        # Emit class probabilities as a plain float tensor instead of a list of dicts
+        # (ZipMap), which the server's onnxruntime backend reads without per-row conversion
+        options = {id(model): {'zipmap': False}} if hasattr(model, 'predict_proba') else None
+        onnx_model = convert_sklearn(model, initial_types=initial_type, options=options)
         
         out_path.parent.mkdir(parents=True, exist_ok=True)
         with open(out_path, 'wb') as f:
@@ -0,0 +1,110 @@
+"""
+Admission control for the model inference queues
+
+Without a bound, requests pile up behind a slow model (the Keras network
+above all) and every one of them waits longer than the last, until clients
+time out with the work half done. Each servable model gets an
+AdmissionController that counts the requests queued for or being scored by
+that model:
+
+- a request that finds `max_depth` requests ahead of it is rejected at once;
+- a request that has waited `max_wait_ms` by the time its model is free is
+  shed instead of scored.
+
+Both raise `Overloaded`, which the API returns as 503 with a Retry-After
+header. Anything older than `max_wait_ms` is shed, so a full queue has been
+cleared one wait limit later, and that is the Retry-After given.
+"""
+import math
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Iterator
+
+from metrics import QUEUE_DEPTH, SHED
+
+# Reasons a request is shed
+QUEUE_FULL = "queue_full"
+QUEUE_WAIT = "queue_wait"
+
+
+class Overloaded(RuntimeError):
+    """Raised when a model's queue is full or a request waited too long for it"""
+
+    def __init__(self, message: str, retry_after: int):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+
+class AdmissionController:
+    """Bounded queue depth and queue wait for one model; 0 disables either limit"""
+
+    def __init__(self, name: str, max_depth: int, max_wait_ms: float):
+        self.name = name
+        self.max_depth = max(0, max_depth)
+        self.max_wait = max(0.0, max_wait_ms) / 1000.0
+        self.depth = 0
+        self.max_depth_seen = 0
+        self.admitted = 0
+        self.shed = {QUEUE_FULL: 0, QUEUE_WAIT: 0}
+        self._lock = threading.Lock()
+        self._depth_gauge = QUEUE_DEPTH.labels(name)
+
+    @property
+    def retry_after(self) -> int:
+        """Seconds after which a shed client should retry"""
+        return max(1, math.ceil(self.max_wait))
+
+    @contextmanager
+    def admit(self) -> Iterator[None]:
+        """Hold a place in the model's queue until the block exits, or raise Overloaded"""
+        with self._lock:
+            if self.max_depth and self.depth >= self.max_depth:
+                full = True
+            else:
+                full = False
+                self.depth += 1
+                self.admitted += 1
+                self.max_depth_seen = max(self.max_depth_seen, self.depth)
+        if full:
+            self._shed(QUEUE_FULL)
+            raise Overloaded(f"{self.name} queue is full ({self.max_depth} requests)", self.retry_after)
+        self._depth_gauge.inc()
+        try:
+            yield
+        finally:
+            with self._lock:
+                self.depth -= 1
+            self._depth_gauge.dec()
+
+    def check_wait(self, enqueued: float) -> None:
+        """Raise Overloaded for a request queued at `enqueued` (perf_counter) longer than max_wait"""
+        if self.max_wait and time.perf_counter() - enqueued > self.max_wait:
+            self._shed(QUEUE_WAIT)
+            raise Overloaded(
+                f"{self.name} request waited over {self.max_wait * 1000.0:g} ms in the queue", self.retry_after
+            )
+
+    def guard(self, fn: Callable) -> Callable:
+        """Wrap a pool task so that it is shed if it starts after max_wait"""
+        enqueued = time.perf_counter()
+        def guarded(*args: Any) -> Any:
+            self.check_wait(enqueued)
+            return fn(*args)
+        return guarded
+
+    def _shed(self, reason: str) -> None:
+        with self._lock:
+            self.shed[reason] += 1
+        SHED.labels(self.name, reason).inc()
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Return the limits and counters as a JSON-serializable dict"""
+        return {
+            "depth": self.depth,
+            "max_depth": self.max_depth,
+            "max_wait_ms": self.max_wait * 1000.0,
+            "max_depth_seen": self.max_depth_seen,
+            "admitted": self.admitted,
+            "shed": dict(self.shed),
+        }
@@ -3,37 +3,179 @@ FastAPI Health Prediction Server
 
 A production-ready API server for health predictions using machine learning models.
 """
+import asyncio
 import logging
 import numpy as np
 from contextlib import asynccontextmanager
-from fastapi import FastAPI, HTTPException, Depends, Header
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, List, Optional, Sequence
+from fastapi import FastAPI, HTTPException, Depends, Header, Query, Request
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse, PlainTextResponse, Response, StreamingResponse
+from starlette.requests import ClientDisconnect
 
+from admission import Overloaded
 from config import settings
-from models.loader import model_loader
+from metrics import (
+    COALESCED, MetricsMiddleware, MAPPING, INFERENCE, QUEUE_AND_INFERENCE, DECODE, SERIALIZATION, registry,
+    time_stage
+)
+from models.loader import model_loader, FAILED
+from models.executor import InferenceExecutor
+from models.ensemble import EnsembleStats, run_models, select_common_predictions
+from models.singleflight import SingleFlight, request_key
+from models.raw_features import (
+    ARROW_MEDIA_TYPE, BINARY_MEDIA_TYPES, CSV, CSV_RESULT_HEADER, MEDIA_TYPES, NDJSON, NPY_MEDIA_TYPE,
+    RAW_FEATURE_COLUMNS, CsvChunker, arrow_available, encode_error, encode_results, read_features, write_results
+)
+from serving import RANKED_MODELS, ModelGeneration, ModelServer, ReloadInProgress, watch_artifacts
 from models.mappers import (
     DiabetesInput, HeartInput, ParkinsonsInput, CommonInput,
-    map_diabetes_input, map_heart_input, map_parkinsons_input, map_common_symptoms
+    map_diabetes_input, map_heart_input, map_parkinsons_input, map_common_symptoms,
+    map_diabetes_batch, map_heart_batch, map_parkinsons_batch, map_common_symptoms_batch
 )
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# Inference worker pools, created at startup and shared by every model generation
+executor: Optional[InferenceExecutor] = None
+
+# The current model generation, replaced as a whole by a reload
+model_server = ModelServer()
+
+# Combined and early-exit counts of the concurrently scored common models
+ensemble_stats = EnsembleStats(RANKED_MODELS)
+
+# Predictions in flight, shared by identical concurrent requests
+single_flight = SingleFlight()
+
+async def serving_models() -> AsyncIterator[ModelGeneration]:
+    """The model generation a request is served with, held until the request has finished"""
+    generation = model_server.current
+    generation.in_flight += 1
+    try:
+        yield generation
+    finally:
+        generation.in_flight -= 1
+
+async def _models_available(generation: ModelGeneration, *model_names: str) -> bool:
+    """Make sure models are in memory, loading lazy ones on their family's worker pool"""
+    loader = generation.loader
+    for name in model_names:
+        if not loader.is_model_loaded(name):
+            if not await executor.run(executor.family_of(name), loader.load_model, name):
+                return False
+    return True
+
+async def _infer(generation: ModelGeneration, model_name: str, features: np.ndarray):
+    """Run a model's batch predict function on its family's worker pool, within its admission limits"""
+    admission = generation.admission[model_name]
+    with admission.admit():
+        return await executor.run(
+            executor.family_of(model_name), admission.guard(generation.predict_fns[model_name]), features
+        )
+
+async def _coalesced(generation: ModelGeneration, endpoint: str, data, compute: Callable[[], Awaitable[Any]]):
+    """Run compute() once for identical concurrent requests to an endpoint"""
+    if not settings.SINGLE_FLIGHT_ENABLED:
+        return await compute()
+    key = (generation.number, endpoint, request_key(data))
+    if key in single_flight:
+        COALESCED.labels(endpoint).inc()
+    return await single_flight.run(key, compute)
+
+async def _predict_record(generation: ModelGeneration, model_name: str, data, mapper: Callable, endpoint: str):
+    """Get (prediction, confidence) for one record, from the answer table if possible"""
+    table = generation.answer_tables.get(model_name)
+    if table is not None:
+        with time_stage(endpoint, model_name, INFERENCE):
+            result = table.lookup(data)
+        if result is not None:
+            return result
+    
+    # Unknown answer values fall back to live inference, shared by identical requests
+    async def predict():
+        with time_stage(endpoint, model_name, MAPPING):
+            features = mapper(data)
+        with time_stage(endpoint, model_name, QUEUE_AND_INFERENCE):
+            return await generation.batchers[model_name].submit(features)
+    
+    return await _coalesced(generation, endpoint, data, predict)
+
+async def _predict_records(generation: ModelGeneration, model_name: str, records: Sequence,
+                           batch_mapper: Callable, endpoint: str):
+    """Get predictions and confidences for a list of records, using the answer table where possible"""
+    table = generation.answer_tables.get(model_name)
+    if table is None:
+        with time_stage(endpoint, model_name, MAPPING):
+            features = batch_mapper(records)
+        with time_stage(endpoint, model_name, QUEUE_AND_INFERENCE):
+            return await _infer(generation, model_name, features)
+    
+    with time_stage(endpoint, model_name, INFERENCE):
+        indices = table.lookup_many(records)
+        predictions = table.predictions[indices]
+        probs = table.confidences[indices]
+    missing = np.flatnonzero(indices < 0)
+    if len(missing):
+        with time_stage(endpoint, model_name, MAPPING):
+            features = batch_mapper([records[i] for i in missing])
+        with time_stage(endpoint, model_name, QUEUE_AND_INFERENCE):
+            live_predictions, live_probs = await _infer(generation, model_name, features)
+        predictions[missing] = live_predictions
+        probs[missing] = live_probs
+    return predictions, probs
+
+def _timed_call(endpoint: str, model_name: str, call: Callable):
+    """Wrap a model call so its queue and inference time is timed under the model's name"""
+    async def timed():
+        with time_stage(endpoint, model_name, QUEUE_AND_INFERENCE):
+            return await call()
+    return timed
+
+def _json_response(endpoint: str, model_name: str, content) -> JSONResponse:
+    """Serialize a prediction response, timing the serialization stage"""
+    with time_stage(endpoint, model_name, SERIALIZATION):
+        return JSONResponse(content)
+
+class UploadStreamingResponse(StreamingResponse):
+    """StreamingResponse whose body is computed while the request body is still being read
+    
+    Starlette's StreamingResponse reads the request to notice a disconnect, which
+    would consume the upload; here only the body iterator reads the request.
+    """
+    
+    async def __call__(self, scope, receive, send) -> None:
+        await self.stream_response(send)
+        if self.background is not None:
+            await self.background()
+
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     """Handle application lifespan events"""
     # Startup
     logger.info("Starting up application...")
-    success = model_loader.load_all_models()
-    if not success:
+    global executor
+    executor = InferenceExecutor(settings.INFERENCE_POOL_SIZES)
+    try:
+        model_server.start(model_loader, executor)
+    except RuntimeError:
         logger.error("Failed to load models at startup!")
-        raise RuntimeError("Model loading failed")
+        executor.shutdown()
+        raise
+    watcher = None
+    if settings.MODEL_WATCH_ENABLED:
+        watcher = asyncio.create_task(watch_artifacts(model_server, settings.MODEL_WATCH_INTERVAL_SECONDS))
     
     yield
     
     # Shutdown
     logger.info("Shutting down application...")
+    if watcher is not None:
+        watcher.cancel()
+    await model_server.stop()
+    executor.shutdown()
 
 # Initialize FastAPI app with lifespan handler
 app = FastAPI(
@@ -43,11 +185,28 @@ app = FastAPI(
     lifespan=lifespan
 )
 
+if settings.METRICS_ENABLED:
+    app.add_middleware(MetricsMiddleware)
+
+@app.exception_handler(Overloaded)
+async def overloaded_handler(request: Request, exc: Overloaded):
+    """Shed requests fail fast with 503 and a hint of when to retry"""
+    return JSONResponse(
+        status_code=503, content={"detail": str(exc)}, headers={"Retry-After": str(exc.retry_after)}
+    )
+
 def verify_key(x_api_key: str = Header(...)):
     """Verify API key authentication"""
     if x_api_key != settings.API_KEY:
         raise HTTPException(status_code=401, detail="Invalid API Key")
 
+def verify_admin_key(x_admin_key: str = Header(...)):
+    """Verify admin authentication; admin endpoints are disabled without ADMIN_API_KEY"""
+    if not settings.ADMIN_API_KEY:
+        raise HTTPException(status_code=403, detail="Admin endpoints are disabled")
+    if x_admin_key != settings.ADMIN_API_KEY:
+        raise HTTPException(status_code=401, detail="Invalid admin key")
+
 # Configure CORS
 app.add_middleware(
     CORSMiddleware,
@@ -58,205 +217,480 @@ app.add_middleware(
 )
 
 @app.get("/health")
-async def health_check():
+async def health_check(generation: ModelGeneration = Depends(serving_models)):
     """Health check endpoint"""
+    # Lazily loaded models report not_loaded until their first request
+    model_states = generation.loader.get_load_states()
     return {
-        "status": "healthy",
-        "models_loaded": model_loader.get_status(),
+        "status": "degraded" if FAILED in model_states.values() else "healthy",
+        "models_loaded": generation.loader.get_status(),
+        "models": model_states,
+        "model_generation": generation.number,
         "version": settings.VERSION
     }
 
+@app.get("/metrics", include_in_schema=False)
+async def metrics():
+    """Prometheus metrics in the text exposition format"""
+    if not settings.METRICS_ENABLED:
+        raise HTTPException(status_code=404, detail="Metrics are disabled")
+    return PlainTextResponse(registry.render(), media_type="text/plain; version=0.0.4")
+
+@app.get("/stats", dependencies=[Depends(verify_key)])
+async def stats(generation: ModelGeneration = Depends(serving_models)):
+    """Runtime statistics for tuning the inference pipeline"""
+    common_cache = generation.common_cache
+    return {
+        "adapters": {
+            name: {"backend": adapter.backend, "method": adapter.method}
+            for name, adapter in generation.loader.adapters.items()
+        },
+        "batching": {name: batcher.stats.snapshot() for name, batcher in generation.batchers.items()},
+        "answer_tables": {name: table.stats() for name, table in generation.answer_tables.items()},
+        "common_cache": common_cache.stats() if common_cache is not None else None,
+        "common_ensemble": ensemble_stats.snapshot(),
+        "single_flight": single_flight.stats(),
+        "admission": {name: admission.snapshot() for name, admission in generation.admission.items()},
+        "model_load_seconds": generation.loader.load_seconds,
+        "model_generation": generation.number,
+        "model_reloads": model_server.reloads,
+        "last_reload": model_server.last_reload
+    }
+
+@app.post("/admin/reload", dependencies=[Depends(verify_admin_key)])
+async def reload_models():
+    """Load the model artifacts again and switch to them once warmed up"""
+    try:
+        return await model_server.reload()
+    except ReloadInProgress as e:
+        raise HTTPException(status_code=409, detail=str(e))
+    except Exception as e:
+        logger.error(f"Model reload failed: {e}")
+        raise HTTPException(
+            status_code=500,
+            detail=f"Reload failed, still serving generation {model_server.current.number}: {str(e)}"
+        )
+
+def _check_batch(records: Sequence) -> None:
+    """Reject empty or oversized batch requests"""
+    if not records:
+        raise HTTPException(status_code=400, detail="Batch must contain at least one record")
+    if len(records) > settings.MAX_BATCH_RECORDS:
+        raise HTTPException(
+            status_code=413,
+            detail=f"Batch too large: {len(records)} records (limit {settings.MAX_BATCH_RECORDS})"
+        )
+
+def _diabetes_result(data: DiabetesInput, prediction, prob) -> dict:
+    """Build the diabetes response for one record"""
+    result = "High Risk" if prediction == 1 else "Low Risk"
+    
+    return {
+        "prediction": result,
+        "confidence": float(prob * 100),  # Convert to percentage
+        "risk_factors": {
+            "excessive_thirst": data.excessiveThirst,
+            "frequent_urination": data.frequentUrination,
+            "weight_loss": data.unexplainedWeightLoss,
+            "fatigue": data.fatigue,
+            "blurred_vision": data.blurredVision,
+            "slow_healing": data.slowHealingWounds
+        }
+    }
+
+def _heart_result(data: HeartInput, prediction, prob) -> dict:
+    """Build the heart disease response for one record"""
+    result = "High Risk" if prediction == 1 else "Low Risk"
+    risk_level = "high" if prediction == 1 else "low"
+    
+    return {
+        "prediction": result,
+        "risk_level": risk_level,
+        "confidence": float(prob * 100),  # Convert to percentage
+        "risk_factors": {
+            "chest_pain": data.chestPain,
+            "breathing_difficulty": data.breathingDifficulty,
+            "age": data.age,
+            "fatigue": data.fatigue,
+            "heart_rate": data.heartRate,
+            "exercise_habits": data.exerciseHabits
+        }
+    }
+
+def _parkinsons_result(data: ParkinsonsInput, prediction, prob) -> dict:
+    """Build the Parkinson's response for one record"""
+    result = "High Risk" if prediction == 1 else "Low Risk"
+    risk_level = "high" if prediction == 1 else "low"
+    
+    return {
+        "prediction": result,
+        "risk_level": risk_level,
+        "confidence": float(prob * 100),  # Convert to percentage
+        "risk_factors": {
+            "speech_problems": data.speech_problems,
+            "tremors": data.tremors,
+            "handwriting_changes": data.handwriting_changes,
+            "balance_issues": data.balance_issues,
+            "stiffness": data.stiffness,
+            "age": data.age
+        }
+    }
+
+def _common_result(data: CommonInput, predicted_disease, confidence, model_used: str,
+                   differential: Optional[dict] = None) -> dict:
+    """Build the common diseases response for one record"""
+    result = {
+        "prediction": predicted_disease,
+        "confidence": float(confidence),
+        "model_used": model_used,
+        "symptoms": data.symptoms,
+        "severity": data.severity
+    }
+    if differential is not None:
+        result["differential"] = differential
+    return result
+
+def _differential(rankings: Dict[str, tuple], class_names: np.ndarray, top_k: Optional[int]) -> Optional[dict]:
+    """Name each common model's top_k most probable diseases, best first"""
+    if top_k is None:
+        return None
+    return {
+        model: [
+            {"disease": disease, "probability": float(probability)}
+            for disease, probability in zip(class_names[labels[:top_k]].tolist(), probabilities[:top_k])
+        ]
+        for model, (labels, probabilities) in rankings.items()
+    }
+
+async def _predict_binary_batch(generation: ModelGeneration, model_name: str, label: str, records: Sequence,
+                                mapper: Callable, build_result: Callable) -> JSONResponse:
+    """Score a list of records with one vectorized call to a binary model"""
+    endpoint = f"/predict/{model_name}/batch"
+    try:
+        _check_batch(records)
+        if not await _models_available(generation, model_name):
+            raise HTTPException(status_code=503, detail=f"{label} model not available")
+        
+        predictions, probs = await _predict_records(generation, model_name, records, mapper, endpoint)
+        
+        with time_stage(endpoint, model_name, DECODE):
+            results = [
+                build_result(data, prediction, prob)
+                for data, prediction, prob in zip(records, predictions, probs)
+            ]
+        return _json_response(endpoint, model_name, results)
+    except (HTTPException, Overloaded):
+        raise
+    except Exception as e:
+        logger.error(f"{label} batch prediction error: {e}")
+        raise HTTPException(status_code=500, detail=f"Prediction error: {str(e)}")
+
 @app.post("/predict/diabetes", dependencies=[Depends(verify_key)])
-async def predict_diabetes(data: DiabetesInput):
+async def predict_diabetes(data: DiabetesInput, generation: ModelGeneration = Depends(serving_models)):
     """Predict diabetes risk based on symptoms"""
     try:
-        diabetes_model = model_loader.get_model('diabetes')
-        if not diabetes_model:
+        if not await _models_available(generation, 'diabetes'):
             raise HTTPException(status_code=503, detail="Diabetes model not available")
         
-        features = map_diabetes_input(data)
-        prediction = diabetes_model.predict(features)[0]
-        
-        # Handle both probability and non-probability models
-        try:
-            # Try to get probability score
-            prob_scores = diabetes_model.predict_proba(features)
-            prob = prob_scores.max()
-        except AttributeError:
-            # If predict_proba is not available, use decision function or default
-            try:
-                decision_score = diabetes_model.decision_function(features)[0]
-                # Convert decision function score to probability-like confidence
-                prob = 1.0 / (1.0 + abs(decision_score)) if decision_score != 0 else 0.5
-                prob = max(0.6, min(0.95, prob))  # Ensure reasonable confidence range
-            except:
-                # Default confidence based on prediction
-                prob = 0.85 if prediction == 1 else 0.75
-        
-        result = "High Risk" if prediction == 1 else "Low Risk"
+        endpoint = "/predict/diabetes"
+        prediction, prob = await _predict_record(generation, 'diabetes', data, map_diabetes_input, endpoint)
         
-        return {
-            "prediction": result,
-            "confidence": float(prob * 100),  # Convert to percentage
-            "risk_factors": {
-                "excessive_thirst": data.excessiveThirst,
-                "frequent_urination": data.frequentUrination,
-                "weight_loss": data.unexplainedWeightLoss,
-                "fatigue": data.fatigue,
-                "blurred_vision": data.blurredVision,
-                "slow_healing": data.slowHealingWounds
-            }
-        }
+        with time_stage(endpoint, 'diabetes', DECODE):
+            result = _diabetes_result(data, prediction, prob)
+        return _json_response(endpoint, 'diabetes', result)
+    except (HTTPException, Overloaded):
+        raise
     except Exception as e:
         logger.error(f"Diabetes prediction error: {e}")
         raise HTTPException(status_code=500, detail=f"Prediction error: {str(e)}")
 
+@app.post("/predict/diabetes/batch", dependencies=[Depends(verify_key)])
+async def predict_diabetes_batch(records: List[DiabetesInput], generation: ModelGeneration = Depends(serving_models)):
+    """Predict diabetes risk for a list of patients"""
+    return await _predict_binary_batch(
+        generation, 'diabetes', "Diabetes", records, map_diabetes_batch, _diabetes_result
+    )
+
 @app.post("/predict/heart", dependencies=[Depends(verify_key)])
-async def predict_heart(data: HeartInput):
+async def predict_heart(data: HeartInput, generation: ModelGeneration = Depends(serving_models)):
     """Predict heart disease risk based on symptoms"""
     try:
-        heart_model = model_loader.get_model('heart')
-        if not heart_model:
+        if not await _models_available(generation, 'heart'):
             raise HTTPException(status_code=503, detail="Heart model not available")
         
-        features = map_heart_input(data)
-        prediction = heart_model.predict(features)[0]
+        endpoint = "/predict/heart"
+        prediction, prob = await _predict_record(generation, 'heart', data, map_heart_input, endpoint)
         
-        # Handle both probability and non-probability models
-        try:
-            # Try to get probability score
-            prob_scores = heart_model.predict_proba(features)
-            prob = prob_scores.max()
-        except AttributeError:
-            # If predict_proba is not available, use decision function or default
-            try:
-                decision_score = heart_model.decision_function(features)[0]
-                # Convert decision function score to probability-like confidence
-                prob = 1.0 / (1.0 + abs(decision_score)) if decision_score != 0 else 0.5
-                prob = max(0.6, min(0.95, prob))  # Ensure reasonable confidence range
-            except:
-                # Default confidence based on prediction
-                prob = 0.85 if prediction == 1 else 0.75
-        
-        result = "High Risk" if prediction == 1 else "Low Risk"
-        risk_level = "high" if prediction == 1 else "low"
-        
-        return {
-            "prediction": result,
-            "risk_level": risk_level,
-            "confidence": float(prob * 100),  # Convert to percentage
-            "risk_factors": {
-                "chest_pain": data.chestPain,
-                "breathing_difficulty": data.breathingDifficulty,
-                "age": data.age,
-                "fatigue": data.fatigue,
-                "heart_rate": data.heartRate,
-                "exercise_habits": data.exerciseHabits
-            }
-        }
+        with time_stage(endpoint, 'heart', DECODE):
+            result = _heart_result(data, prediction, prob)
+        return _json_response(endpoint, 'heart', result)
+    except (HTTPException, Overloaded):
+        raise
     except Exception as e:
         logger.error(f"Heart prediction error: {e}")
         raise HTTPException(status_code=500, detail=f"Prediction error: {str(e)}")
 
+@app.post("/predict/heart/batch", dependencies=[Depends(verify_key)])
+async def predict_heart_batch(records: List[HeartInput], generation: ModelGeneration = Depends(serving_models)):
+    """Predict heart disease risk for a list of patients"""
+    return await _predict_binary_batch(
+        generation, 'heart', "Heart", records, map_heart_batch, _heart_result
+    )
+
 @app.post("/predict/parkinsons", dependencies=[Depends(verify_key)])
-async def predict_parkinsons(data: ParkinsonsInput):
+async def predict_parkinsons(data: ParkinsonsInput, generation: ModelGeneration = Depends(serving_models)):
     """Predict Parkinson's disease risk based on symptoms"""
     try:
-        parkinsons_model = model_loader.get_model('parkinsons')
-        if not parkinsons_model:
+        if not await _models_available(generation, 'parkinsons'):
             raise HTTPException(status_code=503, detail="Parkinsons model not available")
         
-        features = map_parkinsons_input(data)
-        print(f"DEBUG: Features shape: {features.shape}")
-        prediction = parkinsons_model.predict(features)[0]
-        print(f"DEBUG: Prediction: {prediction}")
-        
-        # Handle both probability and non-probability models
-        try:
-            # Try to get probability score
-            print("DEBUG: Attempting predict_proba...")
-            prob_scores = parkinsons_model.predict_proba(features)
-            prob = prob_scores.max()
-            print(f"DEBUG: Got probability: {prob}")
-        except (AttributeError, Exception) as e:
-            print(f"DEBUG: predict_proba failed with: {type(e).__name__}: {e}")
-            # If predict_proba is not available, use decision function or default
-            try:
-                print("DEBUG: Attempting decision_function...")
-                decision_score = parkinsons_model.decision_function(features)[0]
-                print(f"DEBUG: Decision score: {decision_score}")
-                # Convert decision function score to probability-like confidence
-                prob = 1.0 / (1.0 + abs(decision_score)) if decision_score != 0 else 0.5
-                prob = max(0.6, min(0.95, prob))  # Ensure reasonable confidence range
-            except Exception as e2:
-                print(f"DEBUG: decision_function failed with: {type(e2).__name__}: {e2}")
-                # Default confidence based on prediction
-                prob = 0.85 if prediction == 1 else 0.75
+        endpoint = "/predict/parkinsons"
+        prediction, prob = await _predict_record(generation, 'parkinsons', data, map_parkinsons_input, endpoint)
         
-        result = "High Risk" if prediction == 1 else "Low Risk"
-        risk_level = "high" if prediction == 1 else "low"
-        
-        return {
-            "prediction": result,
-            "risk_level": risk_level,
-            "confidence": float(prob * 100),  # Convert to percentage
-            "risk_factors": {
-                "speech_problems": data.speech_problems,
-                "tremors": data.tremors,
-                "handwriting_changes": data.handwriting_changes,
-                "balance_issues": data.balance_issues,
-                "stiffness": data.stiffness,
-                "age": data.age
-            }
-        }
+        with time_stage(endpoint, 'parkinsons', DECODE):
+            result = _parkinsons_result(data, prediction, prob)
+        return _json_response(endpoint, 'parkinsons', result)
+    except (HTTPException, Overloaded):
+        raise
     except Exception as e:
         logger.error(f"Parkinsons prediction error: {e}")
         raise HTTPException(status_code=500, detail=f"Prediction error: {str(e)}")
 
+@app.post("/predict/parkinsons/batch", dependencies=[Depends(verify_key)])
+async def predict_parkinsons_batch(records: List[ParkinsonsInput], generation: ModelGeneration = Depends(serving_models)):
+    """Predict Parkinson's disease risk for a list of patients"""
+    return await _predict_binary_batch(
+        generation, 'parkinsons', "Parkinsons", records, map_parkinsons_batch, _parkinsons_result
+    )
+
+async def _score_common(generation: ModelGeneration, data: CommonInput, symptom_index, cache_key, endpoint: str) -> tuple:
+    """Score one common-disease record; returns (disease, confidence, model used, rankings)"""
+    # Use symptom vector with the encoder and models
+    with time_stage(endpoint, 'common', MAPPING):
+        symptom_vector = map_common_symptoms(data, symptom_index)
+    
+    # Run both models concurrently and return the one with higher confidence,
+    # or the first confident answer when early exit is enabled
+    outputs = await run_models({
+        name: _timed_call(endpoint, name, lambda name=name: generation.batchers[name].submit(symptom_vector))
+        for name in RANKED_MODELS
+    }, settings.COMMON_EARLY_EXIT_CONFIDENCE, ensemble_stats)
+    rankings = {name: (top, top_prob) for name, (_, _, top, top_prob) in outputs.items()}
+    
+    if len(outputs) == 1:
+        (model_used, (prediction, confidence, _, _)), = outputs.items()
+    else:
+        predictions, confidences, models_used = select_common_predictions(
+            np.array([outputs['logistic'][0]]), np.array([outputs['logistic'][1]]),
+            np.array([outputs['neural'][0]]), np.array([outputs['neural'][1]])
+        )
+        prediction, confidence, model_used = predictions[0], confidences[0], str(models_used[0])
+    
+    # Decode the prediction from the class names built at load time
+    with time_stage(endpoint, 'common', DECODE):
+        predicted_disease = generation.loader.get_class_names()[prediction]
+    result = (predicted_disease, float(confidence), model_used, rankings)
+    # Early answers are not cached, so the cache only holds combined results
+    common_cache = generation.common_cache
+    if common_cache is not None and len(outputs) == len(RANKED_MODELS):
+        common_cache.put(cache_key, result)
+    return result
+
 @app.post("/predict/common", dependencies=[Depends(verify_key)])
-async def predict_common(data: CommonInput):
-    """Predict common diseases based on symptoms"""
+async def predict_common(data: CommonInput, top_k: Optional[int] = Query(None, ge=1, le=settings.MAX_TOP_K),
+                         generation: ModelGeneration = Depends(serving_models)):
+    """Predict common diseases based on symptoms, optionally with the top_k candidates of each model"""
     try:
-        logistic_model = model_loader.get_model('logistic')
-        neural_model = model_loader.get_model('neural')
-        encoder = model_loader.get_model('encoder')
-        symptom_columns = model_loader.get_model('symptom_columns')
+        if not await _models_available(generation, 'logistic', 'neural', 'encoder', 'symptom_columns'):
+            raise HTTPException(status_code=503, detail="Common disease models not available")
+        class_names = generation.loader.get_class_names()
+        symptom_index = generation.loader.get_symptom_index()
+        
+        endpoint = "/predict/common"
+        
+        # Requests with the same recognized symptoms get the same prediction
+        common_cache = generation.common_cache
+        cache_key = symptom_index.positions_of(data.symptoms)
+        result = common_cache.get(cache_key) if common_cache is not None else None
+        if result is None:
+            result = await _coalesced(generation, endpoint, data, lambda: _score_common(
+                generation, data, symptom_index, cache_key, endpoint
+            ))
         
-        if not all([logistic_model, neural_model, encoder, symptom_columns]):
+        predicted_disease, confidence, model_used, rankings = result
+        with time_stage(endpoint, 'common', DECODE):
+            differential = _differential(rankings, class_names, top_k)
+        return _json_response(endpoint, 'common', _common_result(
+            data, predicted_disease, confidence, model_used, differential
+        ))
+    except (HTTPException, Overloaded):
+        raise
+    except Exception as e:
+        logger.error(f"Common diseases prediction error: {e}")
+        raise HTTPException(status_code=500, detail=f"Prediction error: {str(e)}")
+
+@app.post("/predict/common/batch", dependencies=[Depends(verify_key)])
+async def predict_common_batch(records: List[CommonInput],
+                               top_k: Optional[int] = Query(None, ge=1, le=settings.MAX_TOP_K),
+                               generation: ModelGeneration = Depends(serving_models)):
+    """Predict common diseases for a list of patients, optionally with top_k candidates"""
+    try:
+        _check_batch(records)
+        if not await _models_available(generation, 'logistic', 'neural', 'encoder', 'symptom_columns'):
             raise HTTPException(status_code=503, detail="Common disease models not available")
+        class_names = generation.loader.get_class_names()
+        symptom_index = generation.loader.get_symptom_index()
         
-        # Use symptom vector with the encoder and models
-        symptom_vector = map_common_symptoms(data, symptom_columns)
+        endpoint = "/predict/common/batch"
+        with time_stage(endpoint, 'common', MAPPING):
+            symptom_matrix = map_common_symptoms_batch(records, symptom_index)
         
-        # Try both models and return the one with higher confidence
-        logistic_pred = logistic_model.predict(symptom_vector)[0]
-        logistic_prob = logistic_model.predict_proba(symptom_vector).max()
+        # Every row needs both models, so the batch always waits for and combines both
+        outputs = await run_models({
+            name: _timed_call(endpoint, name, lambda name=name: _infer(generation, name, symptom_matrix))
+            for name in RANKED_MODELS
+        })
+        logistic_pred, logistic_prob, logistic_top, logistic_top_prob = outputs['logistic']
+        neural_pred, neural_prob, neural_top, neural_top_prob = outputs['neural']
         
-        neural_pred = neural_model.predict(symptom_vector)[0]
-        neural_prob = float(np.max(neural_pred))
+        predictions, confidences, models_used = select_common_predictions(
+            logistic_pred, logistic_prob, neural_pred, neural_prob
+        )
         
-        # Use the model with higher confidence
-        if logistic_prob > neural_prob:
-            prediction = logistic_pred
-            confidence = logistic_prob
-            model_used = "logistic"
-        else:
-            prediction = np.argmax(neural_pred)
-            confidence = neural_prob
-            model_used = "neural"
+        # Decode every prediction with one lookup in the class names
+        with time_stage(endpoint, 'common', DECODE):
+            predicted_diseases = class_names[predictions]
+            results = [
+                _common_result(data, disease, confidence, str(model_used), _differential({
+                    "logistic": (logistic_top[i], logistic_top_prob[i]),
+                    "neural": (neural_top[i], neural_top_prob[i]),
+                }, class_names, top_k))
+                for i, (data, disease, confidence, model_used)
+                in enumerate(zip(records, predicted_diseases, confidences, models_used))
+            ]
+        return _json_response(endpoint, 'common', results)
+    except (HTTPException, Overloaded):
+        raise
+    except Exception as e:
+        logger.error(f"Common diseases batch prediction error: {e}")
+        raise HTTPException(status_code=500, detail=f"Prediction error: {str(e)}")
+
+def _score_csv_block(generation: ModelGeneration, disease: str, chunker: CsvChunker,
+                     block: bytes, first_row: int, output: str):
+    """Parse, score and serialize one block of a CSV upload; returns (rows, payload)"""
+    endpoint = "/predict/{disease}/csv"
+    with time_stage(endpoint, disease, MAPPING):
+        features, valid = chunker.parse_rows(block)
+    predictions = confidences = ()
+    if valid.any():
+        with time_stage(endpoint, disease, INFERENCE):
+            predictions, confidences = generation.predict_fns[disease](
+                features if valid.all() else features[valid]
+            )
+    with time_stage(endpoint, disease, SERIALIZATION):
+        return len(valid), encode_results(output, first_row, valid, predictions, confidences)
+
+@app.post("/predict/{disease}/csv", dependencies=[Depends(verify_key)])
+async def predict_csv(disease: str, request: Request,
+                      output: str = Query(NDJSON, alias="format", pattern=f"^({NDJSON}|{CSV})$"),
+                      generation: ModelGeneration = Depends(serving_models)):
+    """Score a CSV extract with the raw dataset columns, streaming results while the upload is read"""
+    if disease not in RAW_FEATURE_COLUMNS:
+        raise HTTPException(status_code=404, detail=f"No raw-feature model for '{disease}'")
+    if not await _models_available(generation, disease):
+        raise HTTPException(status_code=503, detail=f"{disease.capitalize()} model not available")
+    
+    chunker = CsvChunker(disease, settings.CSV_CHUNK_ROWS)
+    upload = request.stream()
+    blocks = []
+    finished = True
+    try:
+        # Read up to the header first, so an upload without the feature columns is rejected
+        async for data in upload:
+            blocks.extend(chunker.feed(data))
+            if chunker.header is not None:
+                finished = False
+                break
+        if finished:
+            blocks.extend(chunker.finish())
+    except ClientDisconnect:
+        # Nobody is left to answer; 499 keeps the request out of the error counts
+        logger.info(f"{disease} CSV upload disconnected before its header")
+        return Response(status_code=499)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    
+    async def results():
+        rows = 0
         
-        # Decode the prediction using the encoder
-        predicted_disease = encoder.inverse_transform([prediction])[0]
+        async def score(block: bytes) -> bytes:
+            nonlocal rows
+            admission = generation.admission[disease]
+            with admission.admit():
+                n, payload = await executor.run(
+                    executor.family_of(disease), admission.guard(_score_csv_block),
+                    generation, disease, chunker, block, rows, output
+                )
+            rows += n
+            return payload
         
-        return {
-            "prediction": predicted_disease,
-            "confidence": float(confidence),
-            "model_used": model_used,
-            "symptoms": data.symptoms,
-            "severity": data.severity
-        }
+        try:
+            if output == CSV:
+                yield CSV_RESULT_HEADER
+            for block in blocks:
+                yield await score(block)
+            if not finished:
+                # Each block is scored as soon as its rows have arrived
+                async for data in upload:
+                    for block in chunker.feed(data):
+                        yield await score(block)
+                for block in chunker.finish():
+                    yield await score(block)
+        except ClientDisconnect:
+            logger.info(f"{disease} CSV upload disconnected after {rows} rows")
+        except Exception as e:
+            logger.error(f"{disease} CSV scoring error after {rows} rows: {e}")
+            yield encode_error(output, f"Prediction error: {str(e)}")
+    
+    return UploadStreamingResponse(results(), media_type=MEDIA_TYPES[output])
+
+@app.post("/predict/{disease}/raw", dependencies=[Depends(verify_key)])
+async def predict_raw(disease: str, request: Request, generation: ModelGeneration = Depends(serving_models)):
+    """Score a binary feature matrix (.npy or Arrow IPC) and answer in the same format"""
+    endpoint = "/predict/{disease}/raw"
+    if disease not in RAW_FEATURE_COLUMNS:
+        raise HTTPException(status_code=404, detail=f"No raw-feature model for '{disease}'")
+    media_type = request.headers.get("content-type", NPY_MEDIA_TYPE).split(";")[0].strip()
+    if media_type not in BINARY_MEDIA_TYPES:
+        raise HTTPException(status_code=415, detail=f"Send {' or '.join(BINARY_MEDIA_TYPES)}")
+    if media_type == ARROW_MEDIA_TYPE and not arrow_available():
+        raise HTTPException(status_code=415, detail="Arrow IPC bodies need pyarrow installed")
+    if not await _models_available(generation, disease):
+        raise HTTPException(status_code=503, detail=f"{disease.capitalize()} model not available")
+    
+    body = await request.body()
+    try:
+        with time_stage(endpoint, disease, MAPPING):
+            features = read_features(media_type, disease, body)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    if not len(features):
+        raise HTTPException(status_code=400, detail="The feature matrix has no rows")
+    if len(features) > settings.MAX_RAW_ROWS:
+        raise HTTPException(
+            status_code=413,
+            detail=f"Too many rows: {len(features)} (limit {settings.MAX_RAW_ROWS})"
+        )
+    
+    try:
+        with time_stage(endpoint, disease, QUEUE_AND_INFERENCE):
+            predictions, confidences = await _infer(generation, disease, features)
+        with time_stage(endpoint, disease, SERIALIZATION):
+            return Response(write_results(media_type, predictions, confidences), media_type=media_type)
+    except Overloaded:
+        raise
     except Exception as e:
-        logger.error(f"Common diseases prediction error: {e}")
+        logger.error(f"{disease} raw prediction error: {e}")
         raise HTTPException(status_code=500, detail=f"Prediction error: {str(e)}")
 
 if __name__ == "__main__":
@@ -0,0 +1,249 @@
+"""
+Offline batch scoring for the health prediction models
+
+Rescoring a historical dataset does not need the API server. This CLI reads a
+CSV in blocks of `--chunk-rows` rows, scores the blocks on a pool of worker
+processes that each load the model once with `ModelLoader`, and writes the
+results in input order, in the CSV format of `POST /predict/{disease}/csv`.
+Only a few blocks per worker are in flight at a time, so memory stays flat
+however large the input is, and throughput grows with `--workers`.
+
+The input has the dataset's raw feature columns (`RAW_FEATURE_COLUMNS`), or,
+with `--questionnaire`, the request fields of the questionnaire endpoint,
+which are validated and mapped with the API's batch mappers. The `common`
+model takes a `symptoms` column of `;`-separated symptom names, scored by the
+logistic regression and the neural network like `POST /predict/common/batch`;
+its predictions are disease names and it has no risk.
+
+Usage:
+  python -m server.batch score --model heart in.csv out.csv [--workers 4] [--chunk-rows 5000]
+  python server/batch.py score --model diabetes --questionnaire answers.csv out.csv
+  python server/batch.py score --model common symptoms.csv out.csv
+"""
+import argparse
+import csv
+import io
+import logging
+import os
+import sys
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Dict, Optional, Sequence, Tuple
+
+import numpy as np
+from pydantic import ValidationError
+
+# Importable as `server.batch` from the project root, like the scripts
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from config import settings
+from models.answer_tables import QUESTIONNAIRE_MODELS
+from models.ensemble import select_common_predictions
+from models.loader import ModelLoader
+from models.mappers import CommonInput, map_common_symptoms_batch
+from models.raw_features import CSV, CSV_RESULT_HEADER, RAW_FEATURE_COLUMNS, CsvChunker, encode_results
+
+# Bytes read from the input file at a time
+READ_SIZE = 1 << 20
+
+# Blocks queued per worker, enough to keep every worker busy while the results are written
+BLOCKS_PER_WORKER = 2
+
+# The symptom-list model, its input column and the separator of its symptoms
+COMMON = "common"
+SYMPTOMS_COLUMN = "symptoms"
+SYMPTOM_SEPARATOR = ";"
+NO_SYMPTOMS = "no symptoms"
+
+# Models and metadata the common model is scored with
+COMMON_ARTIFACTS = ("logistic", "neural", "symptom_columns", "encoder")
+
+# Model, chunker and input format of a worker process, set by _init_worker
+_worker: Dict[str, object] = {}
+
+
+def questionnaire_columns(model_name: str) -> list:
+    """CSV columns of a questionnaire input: the request fields"""
+    return list(QUESTIONNAIRE_MODELS[model_name][1].model_fields)
+
+
+def input_columns(model_name: str, questionnaire: bool) -> Optional[list]:
+    """CSV columns the model reads, or None for the dataset's raw feature columns"""
+    if model_name == COMMON:
+        return [SYMPTOMS_COLUMN]
+    return questionnaire_columns(model_name) if questionnaire else None
+
+
+def _init_worker(model_name: str, project_root: str, header: bytes, questionnaire: bool) -> None:
+    """Load the model once per worker process and read the input header"""
+    loader = ModelLoader()
+    loader.project_root = Path(project_root)
+    chunker = CsvChunker(model_name, 1, input_columns(model_name, questionnaire))
+    list(chunker.feed(header))
+    _worker.update(model_name=model_name, chunker=chunker, questionnaire=questionnaire)
+    if model_name == COMMON:
+        adapters = {name: loader.get_adapter(name) for name in ("logistic", "neural")}
+        _worker.update(
+            adapter=adapters if None not in adapters.values() else None,
+            symptom_index=loader.get_symptom_index(), class_names=loader.get_class_names(),
+            error="; ".join(f"{name}: {loader.errors[name]}" for name in COMMON_ARTIFACTS if name in loader.errors),
+        )
+        if _worker["symptom_index"] is None or _worker["class_names"] is None:
+            _worker["adapter"] = None
+    else:
+        _worker.update(adapter=loader.get_adapter(model_name), error=loader.errors.get(model_name))
+
+
+def _parse_questionnaire(chunker: CsvChunker, block: bytes, model_name: str) -> Tuple[np.ndarray, np.ndarray]:
+    """Validate and map a block of questionnaire rows into (features of the valid rows, valid)"""
+    _, input_model, batch_mapper = QUESTIONNAIRE_MODELS[model_name]
+    frame, well_formed = chunker.read_rows(block, dtype=str, keep_default_na=False)
+    records = []
+    valid = np.zeros(len(well_formed), dtype=bool)
+    for i, values in zip(np.flatnonzero(well_formed), frame.itertuples(index=False)):
+        if not any(values):
+            continue
+        try:
+            records.append(input_model(**dict(zip(chunker.columns, values))))
+            valid[i] = True
+        except ValidationError:
+            pass
+    if not records:
+        return np.empty((0, len(RAW_FEATURE_COLUMNS[model_name]))), valid
+    return batch_mapper(records), valid
+
+
+def _parse_symptoms(chunker: CsvChunker, block: bytes) -> Tuple[np.ndarray, np.ndarray]:
+    """Map a block of symptom lists into (symptom matrix of the valid rows, valid); blank rows are invalid"""
+    frame, well_formed = chunker.read_rows(block, dtype=str, keep_default_na=False)
+    records = []
+    valid = np.zeros(len(well_formed), dtype=bool)
+    for i, value in zip(np.flatnonzero(well_formed), frame[chunker.positions[0]].tolist()):
+        symptoms = [symptom for symptom in value.split(SYMPTOM_SEPARATOR) if symptom.strip()]
+        if symptoms:
+            # Only the symptoms reach the models, so the other request fields are left unset
+            records.append(CommonInput.model_construct(symptoms=symptoms))
+            valid[i] = True
+    return map_common_symptoms_batch(records, _worker["symptom_index"]), valid
+
+
+def _score_common(features: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """Score symptom rows with both common models; returns (disease names, confidences)"""
+    adapters = _worker["adapter"]
+    logistic_pred, logistic_prob = adapters["logistic"].infer(features)
+    neural_pred, neural_prob = adapters["neural"].infer(features)
+    predictions, confidences, _ = select_common_predictions(logistic_pred, logistic_prob, neural_pred, neural_prob)
+    return _worker["class_names"][predictions], confidences
+
+
+def _encode_diseases(first_row: int, valid: np.ndarray, diseases: Sequence, confidences: Sequence) -> bytes:
+    """Serialize the results of one block of the common model, in the columns of `CSV_RESULT_HEADER`"""
+    output = io.StringIO()
+    writer = csv.writer(output, lineterminator="\n")
+    scored = iter(zip(np.asarray(diseases).tolist(), np.asarray(confidences).tolist()))
+    for row, ok in enumerate(valid.tolist(), start=first_row):
+        if ok:
+            disease, confidence = next(scored)
+            writer.writerow([row, disease, "", repr(confidence * 100), ""])
+        else:
+            writer.writerow([row, "", "", "", NO_SYMPTOMS])
+    return output.getvalue().encode()
+
+
+def _score_block(block: bytes, first_row: int) -> Tuple[int, bytes]:
+    """Parse, score and serialize one block in a worker; returns (rows, results)"""
+    if _worker["adapter"] is None:
+        raise RuntimeError(f"{_worker['model_name']} model not available: {_worker['error']}")
+    chunker = _worker["chunker"]
+    if _worker["model_name"] == COMMON:
+        features, valid = _parse_symptoms(chunker, block)
+        diseases = confidences = ()
+        if len(features):
+            diseases, confidences = _score_common(features)
+        return len(valid), _encode_diseases(first_row, valid, diseases, confidences)
+    if _worker["questionnaire"]:
+        features, valid = _parse_questionnaire(chunker, block, _worker["model_name"])
+    else:
+        features, valid = chunker.parse_rows(block)
+        features = features if valid.all() else features[valid]
+    predictions = confidences = ()
+    if len(features):
+        predictions, confidences = _worker["adapter"].infer(features)
+    return len(valid), encode_results(CSV, first_row, valid, predictions, confidences)
+
+
+def _read_blocks(source, chunker: CsvChunker):
+    """Yield the blocks of rows of an input file opened in binary mode"""
+    for data in iter(lambda: source.read(READ_SIZE), b""):
+        yield from chunker.feed(data)
+    yield from chunker.finish()
+
+
+def score_file(model_name: str, input_path: str, output_path: str, workers: int, chunk_rows: int,
+               questionnaire: bool = False, project_root: Optional[Path] = None) -> Dict[str, float]:
+    """Score every row of `input_path` into `output_path`; returns rows, seconds and rows/s"""
+    project_root = project_root or ModelLoader().project_root
+    chunker = CsvChunker(model_name, chunk_rows, input_columns(model_name, questionnaire))
+    started = time.perf_counter()
+    rows = 0
+    with open(input_path, "rb") as source, open(output_path, "wb") as target:
+        # The header is checked before any worker starts
+        header = source.readline()
+        list(chunker.feed(header))
+        if chunker.header is None:
+            list(chunker.finish())
+
+        with ProcessPoolExecutor(
+            workers, initializer=_init_worker,
+            initargs=(model_name, str(project_root), header.rstrip(b"\r\n") + b"\n", questionnaire)
+        ) as pool:
+            target.write(CSV_RESULT_HEADER)
+            pending = deque()
+            for index, block in enumerate(_read_blocks(source, chunker)):
+                # Every block but the last has exactly chunk_rows rows
+                pending.append(pool.submit(_score_block, block, index * chunker.chunk_rows))
+                if len(pending) >= workers * BLOCKS_PER_WORKER:
+                    n, results = pending.popleft().result()
+                    target.write(results)
+                    rows += n
+            while pending:
+                n, results = pending.popleft().result()
+                target.write(results)
+                rows += n
+
+    seconds = time.perf_counter() - started
+    return {"rows": rows, "seconds": seconds, "rows_per_second": rows / seconds if seconds else 0.0}
+
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Score CSV files offline, without the API server")
+    commands = parser.add_subparsers(dest="command", required=True)
+    score = commands.add_parser("score", help="Score every row of a CSV file")
+    score.add_argument("--model", required=True, choices=sorted([*RAW_FEATURE_COLUMNS, COMMON]),
+                       help=f"Model to score with; {COMMON} reads a '{SYMPTOMS_COLUMN}' column of "
+                            f"'{SYMPTOM_SEPARATOR}'-separated symptom names")
+    score.add_argument("input", help="Input CSV with a header row")
+    score.add_argument("output", help="Output CSV: row,prediction,risk,confidence,error")
+    score.add_argument("--workers", type=int, default=os.cpu_count() or 1, help="Worker processes")
+    score.add_argument("--chunk-rows", type=int, default=settings.CSV_CHUNK_ROWS,
+                       help="Rows parsed and scored per model call")
+    score.add_argument("--questionnaire", action="store_true",
+                       help="Input columns are the questionnaire request fields, not the dataset columns")
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.WARNING)
+    workers = max(1, args.workers)
+    try:
+        summary = score_file(args.model, args.input, args.output, workers, args.chunk_rows, args.questionnaire)
+    except (OSError, ValueError, RuntimeError) as e:
+        print(f"[batch][ERROR] {e}", file=sys.stderr)
+        return 1
+    print(f"[batch] {args.model}: {summary['rows']} rows in {summary['seconds']:.2f} s "
+          f"({summary['rows_per_second']:.0f} rows/s, {workers} workers) -> {args.output}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -2,7 +2,7 @@
 Configuration settings for the FastAPI server
 """
 import os
-from typing import List
+from typing import Dict, List
 
 class Settings:
     """Application settings"""
@@ -19,6 +19,12 @@ class Settings:
         "https://health-predictor-v2.vercel.app/"
     ]
     
+    # Admin endpoints such as POST /admin/reload are disabled while this is empty
+    ADMIN_API_KEY: str = os.getenv("ADMIN_API_KEY", "")
+    
+    # Worker processes started by serve.py, which share the preloaded models
+    WORKERS: int = int(os.getenv("WORKERS", "1"))
+    
     # Model Paths
     DIABETES_MODEL_PATH: str = "Datasets/sav files/diabetes_model.sav"
     HEART_MODEL_PATH: str = "Datasets/sav files/heart_disease_model.sav"
@@ -28,6 +34,102 @@ class Settings:
     ENCODER_PATH: str = "Datasets/pkl/encoder.pkl"
     SYMPTOM_COLUMNS_PATH: str = "Datasets/pkl/symptom_columns.pkl"
     
+    # Hot reload: seconds the previous models keep serving in-flight requests after a
+    # reload, and optional polling of the model directories to reload on changes
+    RELOAD_DRAIN_SECONDS: float = float(os.getenv("RELOAD_DRAIN_SECONDS", "30"))
+    MODEL_WATCH_ENABLED: bool = os.getenv("MODEL_WATCH_ENABLED", "False").lower() == "true"
+    MODEL_WATCH_INTERVAL_SECONDS: float = float(os.getenv("MODEL_WATCH_INTERVAL_SECONDS", "5"))
+    
+    # Memory-mappable model copies written by scripts/convert_mmap.py, used when present
+    MMAP_MODELS_ENABLED: bool = os.getenv("MMAP_MODELS_ENABLED", "True").lower() == "true"
+    MMAP_MODELS_DIR: str = os.getenv("MMAP_MODELS_DIR", "Datasets/mmap")
+    
+    # Model loading per artifact: "eager" loads at startup, "lazy" on first use.
+    # MODEL_LOAD_MODE sets the default; <NAME>_LOAD_MODE overrides one artifact.
+    MODEL_LOAD_MODE: str = os.getenv("MODEL_LOAD_MODE", "eager").lower()
+    MODEL_LOAD_MODES: Dict[str, str] = {
+        "diabetes": os.getenv("DIABETES_LOAD_MODE", MODEL_LOAD_MODE).lower(),
+        "heart": os.getenv("HEART_LOAD_MODE", MODEL_LOAD_MODE).lower(),
+        "parkinsons": os.getenv("PARKINSONS_LOAD_MODE", MODEL_LOAD_MODE).lower(),
+        "logistic": os.getenv("LOGISTIC_LOAD_MODE", MODEL_LOAD_MODE).lower(),
+        "neural": os.getenv("NEURAL_LOAD_MODE", MODEL_LOAD_MODE).lower(),
+        "encoder": os.getenv("ENCODER_LOAD_MODE", MODEL_LOAD_MODE).lower(),
+        "symptom_columns": os.getenv("SYMPTOM_COLUMNS_LOAD_MODE", MODEL_LOAD_MODE).lower(),
+    }
+    
+    # Micro-batching (concurrent requests per model are scored together)
+    BATCH_MAX_SIZE: int = int(os.getenv("BATCH_MAX_SIZE", "32"))
+    BATCH_MAX_WAIT_MS: float = float(os.getenv("BATCH_MAX_WAIT_MS", "2"))
+    
+    # Largest record list accepted by the /predict/{disease}/batch endpoints
+    MAX_BATCH_RECORDS: int = int(os.getenv("MAX_BATCH_RECORDS", "1000"))
+    
+    # Rows parsed and scored per model call by the streaming /predict/{disease}/csv endpoints
+    CSV_CHUNK_ROWS: int = int(os.getenv("CSV_CHUNK_ROWS", "5000"))
+    
+    # Largest feature matrix accepted by the binary /predict/{disease}/raw endpoints
+    MAX_RAW_ROWS: int = int(os.getenv("MAX_RAW_ROWS", "100000"))
+    
+    # Admission control per model: requests queued or being scored before new ones get 503
+    # (0 = unbounded), and how long a queued request may wait before it is shed (0 = no limit)
+    MAX_QUEUE_DEPTH: int = int(os.getenv("MAX_QUEUE_DEPTH", "256"))
+    MAX_QUEUE_WAIT_MS: float = float(os.getenv("MAX_QUEUE_WAIT_MS", "2000"))
+    MAX_QUEUE_DEPTHS: Dict[str, int] = {
+        "diabetes": int(os.getenv("DIABETES_MAX_QUEUE_DEPTH", MAX_QUEUE_DEPTH)),
+        "heart": int(os.getenv("HEART_MAX_QUEUE_DEPTH", MAX_QUEUE_DEPTH)),
+        "parkinsons": int(os.getenv("PARKINSONS_MAX_QUEUE_DEPTH", MAX_QUEUE_DEPTH)),
+        "logistic": int(os.getenv("LOGISTIC_MAX_QUEUE_DEPTH", MAX_QUEUE_DEPTH)),
+        "neural": int(os.getenv("NEURAL_MAX_QUEUE_DEPTH", MAX_QUEUE_DEPTH)),
+    }
+    MAX_QUEUE_WAITS_MS: Dict[str, float] = {
+        "diabetes": float(os.getenv("DIABETES_MAX_QUEUE_WAIT_MS", MAX_QUEUE_WAIT_MS)),
+        "heart": float(os.getenv("HEART_MAX_QUEUE_WAIT_MS", MAX_QUEUE_WAIT_MS)),
+        "parkinsons": float(os.getenv("PARKINSONS_MAX_QUEUE_WAIT_MS", MAX_QUEUE_WAIT_MS)),
+        "logistic": float(os.getenv("LOGISTIC_MAX_QUEUE_WAIT_MS", MAX_QUEUE_WAIT_MS)),
+        "neural": float(os.getenv("NEURAL_MAX_QUEUE_WAIT_MS", MAX_QUEUE_WAIT_MS)),
+    }
+    
+    # Inference worker threads per model family (keeps model calls off the event loop)
+    INFERENCE_POOL_SIZES: Dict[str, int] = {
+        "diabetes": int(os.getenv("DIABETES_POOL_SIZE", "1")),
+        "heart": int(os.getenv("HEART_POOL_SIZE", "1")),
+        "parkinsons": int(os.getenv("PARKINSONS_POOL_SIZE", "1")),
+        "common": int(os.getenv("COMMON_POOL_SIZE", "2")),
+    }
+    
+    # Serve questionnaire models from precomputed answer tables built at startup
+    ANSWER_TABLES_ENABLED: bool = os.getenv("ANSWER_TABLES_ENABLED", "True").lower() == "true"
+    
+    # LRU cache of /predict/common results keyed on the recognized symptom columns (0 disables)
+    COMMON_CACHE_SIZE: int = int(os.getenv("COMMON_CACHE_SIZE", "1024"))
+    COMMON_CACHE_TTL_SECONDS: float = float(os.getenv("COMMON_CACHE_TTL_SECONDS", "0"))
+    
+    # Return /predict/common as soon as one common model answers with at least this
+    # confidence, cancelling the other (0 always waits for and combines both)
+    COMMON_EARLY_EXIT_CONFIDENCE: float = float(os.getenv("COMMON_EARLY_EXIT_CONFIDENCE", "0"))
+    
+    # Identical concurrent /predict/* requests share one mapping and inference
+    SINGLE_FLIGHT_ENABLED: bool = os.getenv("SINGLE_FLIGHT_ENABLED", "True").lower() == "true"
+    
+    # Largest top_k accepted for /predict/common differential diagnoses
+    MAX_TOP_K: int = int(os.getenv("MAX_TOP_K", "10"))
+    
+    # Neural network runtime: "keras", "numpy" (TensorFlow-free forward pass), or "auto"
+    # (numpy when the extracted weights exist, keras otherwise)
+    NEURAL_BACKEND: str = os.getenv("NEURAL_BACKEND", "auto").lower()
+    NEURAL_NUMPY_PATH: str = "Datasets/pkl/neural_network_model.npz"
+    
+    # Score the common-disease logistic regression over the reported symptoms only
+    SPARSE_LOGISTIC_ENABLED: bool = os.getenv("SPARSE_LOGISTIC_ENABLED", "True").lower() == "true"
+    
+    # Inference backend: "sklearn" or "onnx" (ONNX Runtime, falls back to sklearn per model)
+    INFERENCE_BACKEND: str = os.getenv("INFERENCE_BACKEND", "sklearn").lower()
+    ONNX_MODELS_DIR: str = os.getenv("ONNX_MODELS_DIR", "web/models")
+    ONNX_INTRA_OP_THREADS: int = int(os.getenv("ONNX_INTRA_OP_THREADS", "1"))
+    
+    # Prometheus /metrics endpoint and per-request instrumentation
+    METRICS_ENABLED: bool = os.getenv("METRICS_ENABLED", "True").lower() == "true"
+    
     # Server Settings
     TITLE: str = "Health Predictor API"
     VERSION: str = "1.0.0"
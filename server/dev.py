@@ -37,6 +37,42 @@ def test_api():
     print("[TEST] Testing API endpoints...")
     return run_command("python server/tests/test_api.py", "Testing API endpoints")
 
+def compare_backends():
+    """Compare ONNX Runtime and sklearn predictions and latency"""
+    print("[TEST] Comparing ONNX and sklearn backends...")
+    return run_command("python server/scripts/compare_backends.py", "Checking ONNX parity and latency")
+
+def export_numpy_nn():
+    """Extract the Keras neural network into NumPy weights"""
+    print("[EXPORT] Extracting neural network weights...")
+    return run_command("python server/scripts/export_numpy_nn.py", "Writing TensorFlow-free neural network")
+
+def convert_mmap():
+    """Write memory-mappable copies of the model artifacts"""
+    print("[EXPORT] Converting model artifacts for memory mapping...")
+    return run_command("python server/scripts/convert_mmap.py", "Writing memory-mappable model copies")
+
+def bench_startup():
+    """Profile server startup: imports, artifact loading and first predictions"""
+    print("[BENCH] Profiling server startup...")
+    options = " ".join(sys.argv[2:])
+    return run_command(f"python server/scripts/bench_startup.py {options}".strip(),
+                       "Starting the server in repeated subprocess runs")
+
+def load_test():
+    """Measure throughput and tail latency under concurrent load"""
+    print("[BENCH] Running load generator...")
+    options = " ".join(sys.argv[2:])
+    return run_command(f"python server/scripts/loadgen.py {options}".strip(),
+                       "Replaying the prediction request mix")
+
+def microbench():
+    """Time mappers and model inference and check them against the baseline"""
+    print("[BENCH] Running microbenchmarks...")
+    options = " ".join(sys.argv[2:])
+    return run_command(f"python server/scripts/microbench.py {options}".strip(),
+                       "Comparing hot paths with the stored baseline")
+
 def start_server():
     """Start the development server"""
     print("[SERVER] Starting development server...")
@@ -61,6 +97,12 @@ Health Prediction Server - Development Tools
 Available commands:
   test-models    Test ML model loading
   test-api       Test API endpoints (server must be running)
+  onnx-check     Compare ONNX Runtime and sklearn predictions and latency
+  export-nn      Extract the neural network for TensorFlow-free serving
+  convert-mmap   Write memory-mappable model copies shared by every worker
+  bench-startup  Profile startup time (options: --runs N --output FILE)
+  load-test      Measure throughput and latency (options: --in-process, --spawn, --url URL, --rps N)
+  microbench     Check mapper and inference speed against the baseline (options: --update-baseline)
   start          Start the development server
   install        Install Python dependencies
   health         Check server health
@@ -73,6 +115,8 @@ Examples:
   python server/dev.py install
   python server/dev.py test-models
   python server/dev.py start
+  python server/dev.py bench-startup --runs 5 --output startup_bench.json
+  python server/dev.py load-test --in-process --concurrency 16 --duration 10
 """)
 
 def main():
@@ -93,6 +137,12 @@ def main():
     commands = {
         "test-models": test_models,
         "test-api": test_api,
+        "onnx-check": compare_backends,
+        "export-nn": export_numpy_nn,
+        "convert-mmap": convert_mmap,
+        "bench-startup": bench_startup,
+        "load-test": load_test,
+        "microbench": microbench,
         "start": start_server,
         "install": install_deps,
         "health": check_health,
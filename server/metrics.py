@@ -0,0 +1,294 @@
+"""
+In-process Prometheus metrics for the FastAPI server
+
+Counters, gauges and histograms are plain Python objects with one small lock
+per labelled series, held only for a few additions. `render` produces the
+Prometheus text exposition format served by `GET /metrics`.
+"""
+import threading
+import time
+from bisect import bisect_left
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from starlette.routing import Match
+
+# Latency buckets in seconds, from sub-millisecond table lookups to slow model calls
+DEFAULT_BUCKETS = (0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05,
+                   0.1, 0.25, 0.5, 1.0, 2.5, 5.0)
+
+# Prediction stages timed inside the handlers
+MAPPING = "mapping"
+INFERENCE = "inference"
+QUEUE_AND_INFERENCE = "queue_and_inference"
+DECODE = "decode"
+SERIALIZATION = "serialization"
+
+
+def _format_labels(names: Sequence[str], values: Sequence[str], extra: str = "") -> str:
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _escape(value: str) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_value(value: float) -> str:
+    value = float(value)
+    return str(int(value)) if value.is_integer() else repr(value)
+
+
+class _Value:
+    """A single counter or gauge series"""
+
+    def __init__(self):
+        self.value = 0.0
+        self._lock = threading.Lock()
+
+    def inc(self, amount: float = 1.0):
+        with self._lock:
+            self.value += amount
+
+    def dec(self, amount: float = 1.0):
+        with self._lock:
+            self.value -= amount
+
+    def set(self, value: float):
+        self.value = value
+
+
+class _Timer:
+    """Context manager that observes its elapsed wall time on a histogram series"""
+
+    __slots__ = ("series", "started")
+
+    def __init__(self, series: "_HistogramValue"):
+        self.series = series
+
+    def __enter__(self):
+        self.started = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.series.observe(time.perf_counter() - self.started)
+        return False
+
+
+class _HistogramValue:
+    """A single histogram series with fixed bucket bounds"""
+
+    def __init__(self, buckets: Tuple[float, ...]):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)  # last slot is +Inf
+        self.sum = 0.0
+        self.count = 0
+        self._lock = threading.Lock()
+
+    def observe(self, value: float):
+        index = bisect_left(self.buckets, value)
+        with self._lock:
+            self.counts[index] += 1
+            self.sum += value
+            self.count += 1
+
+    def time(self) -> _Timer:
+        """Time a `with` block, including any awaits inside it"""
+        return _Timer(self)
+
+
+class _Metric:
+    """A named metric with one series per combination of label values"""
+
+    kind = ""
+
+    def __init__(self, name: str, documentation: str, label_names: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.label_names = tuple(label_names)
+        self._series: Dict[Tuple[str, ...], object] = {}
+        self._lock = threading.Lock()
+
+    def _new_series(self):
+        raise NotImplementedError
+
+    def labels(self, *values: str):
+        """Get the series for a combination of label values, creating it on first use"""
+        series = self._series.get(values)
+        if series is None:
+            if len(values) != len(self.label_names):
+                raise ValueError(f"{self.name} expects labels {self.label_names}")
+            with self._lock:
+                series = self._series.setdefault(values, self._new_series())
+        return series
+
+    def _sample_lines(self, labels: Tuple[str, ...], series) -> List[str]:
+        return [f"{self.name}{_format_labels(self.label_names, labels)} {_format_value(series.value)}"]
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.kind}"]
+        for labels, series in sorted(self._series.items()):
+            lines.extend(self._sample_lines(labels, series))
+        return lines
+
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def _new_series(self):
+        return _Value()
+
+
+class Gauge(_Metric):
+    kind = "gauge"
+
+    def _new_series(self):
+        return _Value()
+
+
+class Histogram(_Metric):
+    kind = "histogram"
+
+    def __init__(self, name: str, documentation: str, label_names: Sequence[str] = (),
+                 buckets: Sequence[float] = DEFAULT_BUCKETS):
+        super().__init__(name, documentation, label_names)
+        self.buckets = tuple(sorted(buckets))
+
+    def _new_series(self):
+        return _HistogramValue(self.buckets)
+
+    def _sample_lines(self, labels: Tuple[str, ...], series: _HistogramValue) -> List[str]:
+        with series._lock:
+            counts, total, count = list(series.counts), series.sum, series.count
+        lines = []
+        cumulative = 0
+        for bound, bucket_count in zip(self.buckets + (float("inf"),), counts):
+            cumulative += bucket_count
+            le = "+Inf" if bound == float("inf") else repr(bound)
+            bucket_labels = _format_labels(self.label_names, labels, f'le="{le}"')
+            lines.append(f"{self.name}_bucket{bucket_labels} {cumulative}")
+        label_text = _format_labels(self.label_names, labels)
+        lines.append(f"{self.name}_sum{label_text} {_format_value(total)}")
+        lines.append(f"{self.name}_count{label_text} {count}")
+        return lines
+
+
+class MetricsRegistry:
+    """Collection of metrics rendered together"""
+
+    def __init__(self):
+        self.metrics: List[_Metric] = []
+
+    def _register(self, metric: _Metric) -> _Metric:
+        self.metrics.append(metric)
+        return metric
+
+    def counter(self, name: str, documentation: str, label_names: Sequence[str] = ()) -> Counter:
+        return self._register(Counter(name, documentation, label_names))
+
+    def gauge(self, name: str, documentation: str, label_names: Sequence[str] = ()) -> Gauge:
+        return self._register(Gauge(name, documentation, label_names))
+
+    def histogram(self, name: str, documentation: str, label_names: Sequence[str] = (),
+                  buckets: Sequence[float] = DEFAULT_BUCKETS) -> Histogram:
+        return self._register(Histogram(name, documentation, label_names, buckets))
+
+    def render(self) -> str:
+        """Render every metric in the Prometheus text format"""
+        lines = []
+        for metric in self.metrics:
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+
+registry = MetricsRegistry()
+
+REQUESTS = registry.counter(
+    "http_requests_total", "HTTP requests by endpoint and response status", ("endpoint", "status")
+)
+ERRORS = registry.counter(
+    "http_request_errors_total", "HTTP requests that ended in a 5xx response", ("endpoint",)
+)
+IN_FLIGHT = registry.gauge(
+    "http_requests_in_flight", "HTTP requests currently being handled", ("endpoint",)
+)
+REQUEST_LATENCY = registry.histogram(
+    "http_request_duration_seconds", "Time from request start to the end of the response", ("endpoint",)
+)
+STAGE_LATENCY = registry.histogram(
+    "prediction_stage_duration_seconds",
+    "Prediction time per stage: mapping, inference (model call or answer-table lookup only), "
+    "queue_and_inference (batcher and admission queue wait plus the model call), decode, serialization",
+    ("endpoint", "model", "stage")
+)
+MODEL_LATENCY = registry.histogram(
+    "model_inference_duration_seconds", "Time of one model call on a batch of rows", ("model",)
+)
+QUEUE_DEPTH = registry.gauge(
+    "model_queue_depth", "Requests queued for or being scored by each model", ("model",)
+)
+SHED = registry.counter(
+    "model_requests_shed_total", "Requests rejected with 503 by a model's admission controller", ("model", "reason")
+)
+COALESCED = registry.counter(
+    "predictions_coalesced_total", "Requests that awaited an identical prediction already in flight", ("endpoint",)
+)
+
+
+def time_stage(endpoint: str, model: str, stage: str) -> _Timer:
+    """Time one prediction stage of an endpoint"""
+    return STAGE_LATENCY.labels(endpoint, model, stage).time()
+
+
+class MetricsMiddleware:
+    """ASGI middleware that counts and times every HTTP request
+
+    Requests are labelled with their route path, the template for routes with
+    path parameters such as `/predict/{disease}/csv`; paths that match no
+    route share the "unmatched" label so unknown URLs cannot grow the series
+    count.
+    """
+
+    def __init__(self, app):
+        self.app = app
+        self._route_paths: Optional[frozenset] = None
+
+    def _endpoint(self, scope) -> str:
+        if self._route_paths is None:
+            self._route_paths = frozenset(route.path for route in scope["app"].routes)
+        path = scope["path"]
+        if path in self._route_paths:
+            return path
+        # Parameterized routes; like literal paths, a route matching all but the method counts
+        for route in scope["app"].routes:
+            match, _ = route.matches(scope)
+            if match != Match.NONE:
+                return route.path
+        return "unmatched"
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        endpoint = self._endpoint(scope)
+        status = 500
+        in_flight = IN_FLIGHT.labels(endpoint)
+
+        async def send_with_status(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        in_flight.inc()
+        started = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            REQUEST_LATENCY.labels(endpoint).observe(time.perf_counter() - started)
+            in_flight.dec()
+            REQUESTS.labels(endpoint, str(status)).inc()
+            if status >= 500:
+                ERRORS.labels(endpoint).inc()
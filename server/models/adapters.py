@@ -0,0 +1,171 @@
+"""
+Load-time model adapters with a single inference entry point
+
+Each loaded model is probed once to find the cheapest call that yields both
+labels and a confidence score. Serving code then calls `infer(X)`, which runs
+the model exactly once per batch instead of trying predict, predict_proba
+and decision_function on every request.
+"""
+import logging
+from typing import Any, Optional, Tuple
+
+import numpy as np
+
+from .numpy_nn import NumpyNetwork
+from .sparse_logistic import SparseLogistic, is_logistic_regression
+
+logger = logging.getLogger(__name__)
+
+# Inference methods, in the order they are probed
+SPARSE = "sparse_logistic"     # LogisticRegression scored over the nonzero features
+PROBA = "predict_proba"        # labels and confidence from class probabilities
+KERAS = "keras_softmax"        # Keras model whose predict returns class probabilities
+NUMPY = "numpy_softmax"        # Dense network extracted from Keras, scored with NumPy
+DECISION = "decision_function"  # binary margin mapped to a bounded confidence
+PREDICT = "predict"            # labels only, fixed confidence per label
+
+
+def decision_confidence(decision_scores: np.ndarray) -> np.ndarray:
+    """Convert binary decision function scores to probability-like confidence"""
+    prob = np.where(decision_scores != 0, 1.0 / (1.0 + np.abs(decision_scores)), 0.5)
+    return np.clip(prob, 0.6, 0.95)  # Ensure reasonable confidence range
+
+
+def default_confidence(labels: np.ndarray) -> np.ndarray:
+    """Default confidence based on the predicted label"""
+    return np.where(labels == 1, 0.85, 0.75)
+
+
+def rank_classes(column_labels: np.ndarray, proba: np.ndarray, k: int) -> Tuple[np.ndarray, ...]:
+    """Get each row's most probable class and its k most probable classes, best first
+    
+    `argpartition` selects the top k in O(n_classes) and only those k are sorted.
+    Returns (labels, confidences, top_labels, top_probabilities).
+    """
+    best = np.argmax(proba, axis=1)
+    k = max(1, min(k, proba.shape[1]))
+    top = np.argpartition(-proba, k - 1, axis=1)[:, :k]
+    top_proba = np.take_along_axis(proba, top, axis=1)
+    order = np.argsort(-top_proba, axis=1, kind="stable")
+    top = np.take_along_axis(top, order, axis=1)
+    top_proba = np.take_along_axis(top_proba, order, axis=1)
+    return column_labels[best], proba[np.arange(len(best)), best], column_labels[top], top_proba
+
+
+def _is_keras_model(model: Any) -> bool:
+    """Check whether a model is a Keras/TensorFlow model"""
+    module = type(model).__module__
+    return module.startswith("keras") or module.startswith("tensorflow")
+
+
+def _n_features(model: Any) -> Optional[int]:
+    """Get the number of input features a model expects, if it says"""
+    if hasattr(model, "n_features_in_"):
+        return int(model.n_features_in_)
+    input_shape = getattr(model, "input_shape", None)
+    if input_shape is not None and input_shape[-1] is not None:
+        return int(input_shape[-1])
+    return None
+
+
+class ModelAdapter:
+    """Uniform `infer(X) -> (labels, confidences)` over a loaded model"""
+
+    def __init__(self, name: str, model: Any, method: str):
+        self.name = name
+        self.model = model
+        self.method = method
+        self.classes = np.asarray(model.classes_) if hasattr(model, "classes_") else None
+        self.n_features = _n_features(model)
+        self.scorer = SparseLogistic.from_model(model) if method == SPARSE else None
+
+    @property
+    def backend(self) -> str:
+        """Library that runs the model"""
+        if self.method == KERAS:
+            return "keras"
+        return "numpy" if self.method in (NUMPY, SPARSE) else "sklearn"
+
+    def infer_proba(self, features: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """Get class probabilities with a single model call, and the label of each column"""
+        if self.method in (PROBA, SPARSE):
+            proba = (self.scorer if self.method == SPARSE else self.model).predict_proba(features)
+            return self.classes, proba
+        if self.method == KERAS:
+            proba = np.asarray(self.model.predict(features, verbose=0))
+        elif self.method == NUMPY:
+            proba = self.model.predict(features)
+        else:
+            raise ValueError(f"{self.name}: {self.method} does not give class probabilities")
+        # Network outputs are indexed by the encoded class label
+        return np.arange(proba.shape[1]), proba
+
+    def infer_ranked(self, features: np.ndarray, k: int) -> Tuple[np.ndarray, ...]:
+        """Score a feature matrix and rank each row's k most probable classes"""
+        return rank_classes(*self.infer_proba(features), k)
+
+    def infer(self, features: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """Score a feature matrix with a single model call"""
+        if self.method in (PROBA, SPARSE, KERAS, NUMPY):
+            # Labels are the most probable class, as predict returns for
+            # probabilistic classifiers such as LogisticRegression
+            column_labels, proba = self.infer_proba(features)
+            best = np.argmax(proba, axis=1)
+            return column_labels[best], proba[np.arange(len(best)), best]
+        if self.method == DECISION:
+            decision_scores = self.model.decision_function(features)
+            labels = self.classes[(decision_scores > 0).astype(int)]
+            return labels, decision_confidence(decision_scores)
+        labels = np.asarray(self.model.predict(features))
+        return labels, default_confidence(labels)
+
+
+def _sparse_matches(model: Any, adapter: ModelAdapter, n_features: int) -> bool:
+    """Check sparse scoring against predict_proba on sparse binary rows"""
+    rng = np.random.default_rng(0)
+    rows = (rng.random((64, n_features)) < 8.0 / n_features).astype(float)
+    rows[0] = 0.0
+    expected = model.predict_proba(rows)
+    actual = adapter.scorer.predict_proba(rows)
+    return np.array_equal(expected.argmax(axis=1), actual.argmax(axis=1)) and np.allclose(
+        expected, actual, rtol=0.0, atol=1e-9
+    )
+
+
+def build_adapter(name: str, model: Any, sparse: bool = True) -> ModelAdapter:
+    """Probe a model once and wrap it with its cheapest working inference method"""
+    n_features = _n_features(model)
+    probe = np.zeros((1, n_features)) if n_features else None
+
+    candidates = []
+    if isinstance(model, NumpyNetwork):
+        candidates.append(NUMPY)
+    elif _is_keras_model(model):
+        candidates.append(KERAS)
+    else:
+        classes = getattr(model, "classes_", None)
+        if sparse and n_features and is_logistic_regression(model):
+            candidates.append(SPARSE)
+        # hasattr is False for e.g. SVC(probability=False), whose predict_proba is unavailable
+        if hasattr(model, "predict_proba") and classes is not None:
+            candidates.append(PROBA)
+        if hasattr(model, "decision_function") and classes is not None and len(classes) == 2:
+            candidates.append(DECISION)
+    candidates.append(PREDICT)
+
+    for method in candidates:
+        adapter = ModelAdapter(name, model, method)
+        if probe is None or method == PREDICT:
+            break
+        try:
+            labels, confidences = adapter.infer(probe)
+            if method == SPARSE and not _sparse_matches(model, adapter, n_features):
+                logger.warning(f"{name}: sparse scoring does not match predict_proba")
+                continue
+            if len(labels) == 1 and len(confidences) == 1:
+                break
+        except Exception as e:
+            logger.warning(f"{name}: {method} probe failed ({type(e).__name__}: {e})")
+
+    logger.info(f"{name}: serving with {adapter.method}")
+    return adapter
@@ -0,0 +1,130 @@
+"""
+Precomputed answer tables for the finite-domain questionnaire models
+
+Every diabetes and heart field, and every Parkinson's field that reaches the
+features, takes one of four enumerated answers. Each model's reachable input
+space is therefore small enough (4^6 = 4096 combinations at most) to score
+once at startup and serve by index afterwards.
+"""
+import itertools
+import logging
+import time
+from typing import Any, Callable, Dict, List, Mapping, Optional, Sequence, Tuple
+
+import numpy as np
+from pydantic import BaseModel
+
+from .mappers import (
+    DiabetesInput, HeartInput, ParkinsonsInput,
+    DIABETES_FIELD_MAPS, HEART_FIELD_MAPS, PARKINSONS_FIELD_MAPS,
+    map_diabetes_batch, map_heart_batch, map_parkinsons_batch
+)
+
+logger = logging.getLogger(__name__)
+
+# model name -> (answer maps of the fields that reach the features, input class, batch mapper)
+QUESTIONNAIRE_MODELS = {
+    "diabetes": (DIABETES_FIELD_MAPS, DiabetesInput, map_diabetes_batch),
+    "heart": (HEART_FIELD_MAPS, HeartInput, map_heart_batch),
+    "parkinsons": (PARKINSONS_FIELD_MAPS, ParkinsonsInput, map_parkinsons_batch),
+}
+
+
+class AnswerTable:
+    """Model results for every combination of a questionnaire's known answers
+
+    Entries are stored in mixed-radix order: the index of a record is the sum
+    of each field's answer position times that field's stride. Risk level is
+    derived from the stored prediction, so only predictions and confidences
+    are kept.
+    """
+
+    def __init__(self, fields: Mapping[str, Sequence[str]],
+                 predictions: np.ndarray, confidences: np.ndarray):
+        self.fields = list(fields)
+        self.positions = [
+            {answer: i for i, answer in enumerate(answers)} for answers in fields.values()
+        ]
+        self.strides = []
+        stride = 1
+        for answers in reversed(list(fields.values())):
+            self.strides.insert(0, stride)
+            stride *= len(answers)
+        if len(predictions) != stride or len(confidences) != stride:
+            raise ValueError(f"Expected {stride} table entries, got {len(predictions)}")
+        self.predictions = predictions
+        self.confidences = confidences
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self) -> int:
+        return len(self.predictions)
+
+    def index_of(self, data: BaseModel) -> Optional[int]:
+        """Get a record's table index, or None if any answer is not enumerated"""
+        index = 0
+        for field, positions, stride in zip(self.fields, self.positions, self.strides):
+            position = positions.get(getattr(data, field))
+            if position is None:
+                return None
+            index += position * stride
+        return index
+
+    def lookup(self, data: BaseModel) -> Optional[Tuple[Any, float]]:
+        """Get the precomputed (prediction, confidence) for a record"""
+        index = self.index_of(data)
+        if index is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        return self.predictions[index], self.confidences[index]
+
+    def lookup_many(self, records: Sequence[BaseModel]) -> np.ndarray:
+        """Get table indices for a list of records, -1 where there is no entry"""
+        indices = np.array(
+            [-1 if (index := self.index_of(data)) is None else index for data in records],
+            dtype=np.int64
+        )
+        found = int(np.count_nonzero(indices >= 0))
+        self.hits += found
+        self.misses += len(records) - found
+        return indices
+
+    def stats(self) -> Dict[str, int]:
+        """Return table size and hit counters"""
+        return {"entries": len(self), "hits": self.hits, "misses": self.misses}
+
+
+def enumerate_records(fields: Mapping[str, Mapping[str, Any]], input_cls) -> List[BaseModel]:
+    """Build one record per answer combination, in table order"""
+    answers = {field: list(mapping) for field, mapping in fields.items()}
+    return [
+        # Only the enumerated fields reach the mapper, so skip validation of the rest
+        input_cls.model_construct(**dict(zip(answers, combination)))
+        for combination in itertools.product(*answers.values())
+    ]
+
+
+def build_answer_table(fields: Mapping[str, Mapping[str, Any]], input_cls,
+                       batch_mapper: Callable, predict_fn: Callable) -> AnswerTable:
+    """Enumerate every answer combination through the mapper and model"""
+    answers = {field: list(mapping) for field, mapping in fields.items()}
+    predictions, confidences = predict_fn(batch_mapper(enumerate_records(fields, input_cls)))
+    return AnswerTable(answers, np.asarray(predictions), np.asarray(confidences, dtype=float))
+
+
+def build_answer_tables(predict_fns: Mapping[str, Callable]) -> Dict[str, AnswerTable]:
+    """Build answer tables for every questionnaire model with a predict function"""
+    tables = {}
+    for name, (fields, input_cls, batch_mapper) in QUESTIONNAIRE_MODELS.items():
+        if name not in predict_fns:
+            continue
+        started = time.perf_counter()
+        try:
+            tables[name] = build_answer_table(fields, input_cls, batch_mapper, predict_fns[name])
+        except Exception as e:
+            logger.error(f"Could not build {name} answer table, using live inference: {e}")
+            continue
+        elapsed_ms = (time.perf_counter() - started) * 1000.0
+        logger.info(f"Built {name} answer table: {len(tables[name])} entries in {elapsed_ms:.1f} ms")
+    return tables
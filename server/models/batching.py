@@ -0,0 +1,183 @@
+"""
+Micro-batching scheduler for model inference
+
+Concurrent single-row requests for the same model are gathered into one
+feature matrix and scored with a single vectorized model call.
+"""
+import asyncio
+import logging
+import time
+from contextlib import nullcontext
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+# A predict function takes an (N, n_features) matrix and returns a tuple of
+# arrays whose first axis is N; each caller receives its own row of each.
+PredictFn = Callable[[np.ndarray], Tuple[np.ndarray, ...]]
+
+# A runner executes a predict function somewhere other than the event loop,
+# e.g. `InferenceExecutor.runner(model_name)`.
+Runner = Callable[[PredictFn, np.ndarray], Awaitable[Tuple[np.ndarray, ...]]]
+
+
+class BatchStats:
+    """Running batch-size and queue-wait statistics for one batcher"""
+
+    def __init__(self, max_batch_size: int):
+        self.requests = 0
+        self.batches = 0
+        self.errors = 0
+        self.max_batch_size_seen = 0
+        self.total_queue_wait_ms = 0.0
+        self.max_queue_wait_ms = 0.0
+        self.total_inference_ms = 0.0
+        # Histogram of batch sizes, bucketed by powers of two up to the limit
+        self.size_buckets = [1]
+        while self.size_buckets[-1] < max_batch_size:
+            self.size_buckets.append(min(self.size_buckets[-1] * 2, max_batch_size))
+        self.size_counts = [0] * len(self.size_buckets)
+
+    def record(self, batch_size: int, queue_waits_ms: Sequence[float], inference_ms: float):
+        """Record one dispatched batch"""
+        self.requests += batch_size
+        self.batches += 1
+        self.max_batch_size_seen = max(self.max_batch_size_seen, batch_size)
+        self.total_queue_wait_ms += sum(queue_waits_ms)
+        self.max_queue_wait_ms = max(self.max_queue_wait_ms, max(queue_waits_ms))
+        self.total_inference_ms += inference_ms
+        for i, bound in enumerate(self.size_buckets):
+            if batch_size <= bound:
+                self.size_counts[i] += 1
+                break
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Return the statistics as a JSON-serializable dict"""
+        return {
+            "requests": self.requests,
+            "batches": self.batches,
+            "errors": self.errors,
+            "mean_batch_size": self.requests / self.batches if self.batches else 0.0,
+            "max_batch_size": self.max_batch_size_seen,
+            "mean_queue_wait_ms": self.total_queue_wait_ms / self.requests if self.requests else 0.0,
+            "max_queue_wait_ms": self.max_queue_wait_ms,
+            "mean_inference_ms": self.total_inference_ms / self.batches if self.batches else 0.0,
+            "batch_size_histogram": {
+                f"le_{bound}": count for bound, count in zip(self.size_buckets, self.size_counts)
+            },
+        }
+
+
+class MicroBatcher:
+    """Gather concurrent requests for one model into vectorized predict calls
+
+    A request is queued with `submit`. The first queued request opens a
+    window of `max_wait_ms`; everything that arrives before the window
+    closes (up to `max_batch_size` rows) is stacked and scored together.
+    Without a `runner` the predict function is called on the event loop.
+    With an `admission` controller, each request holds a place in the model's
+    queue until it has its results, and requests that have waited too long
+    by the time their batch is dispatched are failed instead of scored.
+    """
+
+    def __init__(self, name: str, predict_fn: PredictFn,
+                 max_batch_size: int = 32, max_wait_ms: float = 2.0,
+                 runner: Optional[Runner] = None, admission: Optional[Any] = None):
+        self.name = name
+        self.predict_fn = predict_fn
+        self.runner = runner
+        self.admission = admission
+        self.max_batch_size = max(1, max_batch_size)
+        self.max_wait = max(0.0, max_wait_ms) / 1000.0
+        self.stats = BatchStats(self.max_batch_size)
+        self._queue: Optional[asyncio.Queue] = None
+        self._worker: Optional[asyncio.Task] = None
+
+    async def submit(self, features: np.ndarray) -> Tuple[Any, ...]:
+        """Queue a single (1, n_features) row and wait for its results"""
+        with self.admission.admit() if self.admission is not None else nullcontext():
+            loop = asyncio.get_running_loop()
+            if self._worker is None or self._worker.done():
+                self._queue = asyncio.Queue()
+                self._worker = loop.create_task(self._run())
+            future = loop.create_future()
+            self._queue.put_nowait((features, future, time.perf_counter()))
+            return await future
+
+    async def close(self):
+        """Stop the worker task, failing anything still queued"""
+        if self._worker is not None:
+            self._worker.cancel()
+            try:
+                await self._worker
+            except asyncio.CancelledError:
+                pass
+            self._worker = None
+        while self._queue is not None and not self._queue.empty():
+            _, future, _ = self._queue.get_nowait()
+            if not future.done():
+                future.set_exception(RuntimeError(f"{self.name} batcher closed"))
+
+    async def _run(self):
+        """Worker loop: collect one batch at a time and dispatch it"""
+        while True:
+            first = await self._queue.get()
+            batch = [first]
+            deadline = first[2] + self.max_wait
+            while len(batch) < self.max_batch_size:
+                while len(batch) < self.max_batch_size and not self._queue.empty():
+                    batch.append(self._queue.get_nowait())
+                remaining = deadline - time.perf_counter()
+                if len(batch) >= self.max_batch_size or remaining <= 0:
+                    break
+                try:
+                    batch.append(await asyncio.wait_for(self._queue.get(), remaining))
+                except asyncio.TimeoutError:
+                    break
+            await self._dispatch(batch)
+
+    async def _dispatch(self, batch: List[Tuple[np.ndarray, asyncio.Future, float]]):
+        """Score one batch and hand every caller its own row"""
+        # Callers that gave up while queued do not need a row computed
+        batch = [item for item in batch if not item[1].done()]
+        if self.admission is not None:
+            batch = [item for item in batch if self._within_wait(item)]
+        if not batch:
+            return
+
+        started = time.perf_counter()
+        queue_waits_ms = [(started - enqueued) * 1000.0 for _, _, enqueued in batch]
+        try:
+            features = np.vstack([row for row, _, _ in batch])
+            outputs = await self._predict(features)
+            if not isinstance(outputs, tuple):
+                outputs = (outputs,)
+        except Exception as e:
+            logger.error(f"{self.name} batch inference error: {e}")
+            self.stats.errors += len(batch)
+            for _, future, _ in batch:
+                if not future.done():
+                    future.set_exception(e)
+            return
+
+        self.stats.record(len(batch), queue_waits_ms, (time.perf_counter() - started) * 1000.0)
+        for i, (_, future, _) in enumerate(batch):
+            if not future.done():
+                future.set_result(tuple(output[i] for output in outputs))
+
+    def _within_wait(self, item: Tuple[np.ndarray, asyncio.Future, float]) -> bool:
+        """Fail a queued request that has waited past the admission limit"""
+        try:
+            self.admission.check_wait(item[2])
+        except Exception as e:
+            item[1].set_exception(e)
+            return False
+        return True
+
+    async def _predict(self, features: np.ndarray) -> Tuple[np.ndarray, ...]:
+        """Run the predict function for a stacked feature matrix"""
+        if self.runner is not None:
+            return await self.runner(self.predict_fn, features)
+        return self.predict_fn(features)
@@ -0,0 +1,83 @@
+"""
+Concurrent scoring of the common-disease models
+
+The logistic regression and the neural network score the same symptom vector,
+so they run side by side on the common worker pool instead of one after the
+other. With a confidence threshold, the first model to answer with a
+confidence at or above it is returned on its own and the other model's call
+is cancelled: a call still queued in its micro-batcher never runs, and one
+already running on the pool finishes but its result is discarded.
+"""
+import asyncio
+from typing import Any, Awaitable, Callable, Dict, Sequence, Tuple
+
+import numpy as np
+
+# A model call returns the batcher outputs of one row: (prediction, confidence, ...)
+ModelCall = Callable[[], Awaitable[Tuple[Any, ...]]]
+
+
+class EnsembleStats:
+    """Counts of combined and early-exit answers"""
+
+    def __init__(self, model_names: Sequence[str]):
+        self.combined = 0
+        self.early_exits = {name: 0 for name in model_names}
+        self.cancelled = 0
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Return the statistics as a JSON-serializable dict"""
+        return {
+            "combined": self.combined,
+            "early_exits": dict(self.early_exits),
+            "cancelled": self.cancelled,
+        }
+
+
+async def run_models(calls: Dict[str, ModelCall], threshold: float = 0.0,
+                     stats: EnsembleStats = None) -> Dict[str, Tuple[Any, ...]]:
+    """Run every model call concurrently and return {model: outputs} of the answers used
+
+    With `threshold` <= 0 every model's outputs are returned. Otherwise the
+    most confident of the first models to finish with `outputs[1] >= threshold`
+    is returned alone and the calls still pending are cancelled.
+    """
+    tasks = {asyncio.ensure_future(call()): name for name, call in calls.items()}
+    try:
+        if threshold > 0:
+            pending = set(tasks)
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                confident = [
+                    task for task in done
+                    if task.exception() is None and task.result()[1] >= threshold
+                ]
+                if confident:
+                    best = max(confident, key=lambda task: task.result()[1])
+                    for task in pending:
+                        task.cancel()
+                    if stats is not None:
+                        stats.early_exits[tasks[best]] += 1
+                        stats.cancelled += len(pending)
+                    return {tasks[best]: best.result()}
+
+        results = await asyncio.gather(*tasks)
+    except BaseException:
+        # The request failed or was cancelled: do not leave model calls behind
+        for task in tasks:
+            task.cancel()
+        raise
+
+    if stats is not None:
+        stats.combined += 1
+    return dict(zip(tasks.values(), results))
+
+
+def select_common_predictions(logistic_pred, logistic_prob, neural_pred, neural_prob):
+    """Pick, per row, the prediction of whichever common model is more confident"""
+    # Use the model with higher confidence
+    use_logistic = logistic_prob > neural_prob
+    predictions = np.where(use_logistic, logistic_pred, neural_pred)
+    confidences = np.where(use_logistic, logistic_prob, neural_prob)
+    models_used = np.where(use_logistic, "logistic", "neural")
+    return predictions, confidences, models_used
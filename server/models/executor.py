@@ -0,0 +1,60 @@
+"""
+Bounded worker pools that keep blocking model inference off the event loop
+"""
+import asyncio
+import functools
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict
+
+logger = logging.getLogger(__name__)
+
+# Model family whose pool loads and serves each artifact
+MODEL_FAMILIES: Dict[str, str] = {
+    "diabetes": "diabetes",
+    "heart": "heart",
+    "parkinsons": "parkinsons",
+    "logistic": "common",
+    "neural": "common",
+    "encoder": "common",
+    "symptom_columns": "common",
+}
+
+
+class InferenceExecutor:
+    """One bounded thread pool per model family
+
+    sklearn and TensorFlow release the GIL inside their numeric kernels, so
+    worker threads let a slow Keras call run while the event loop keeps
+    serving other requests. Each family gets its own pool, so a backlog on
+    one model cannot starve the others.
+    """
+
+    def __init__(self, pool_sizes: Dict[str, int]):
+        self.pool_sizes = {family: max(1, size) for family, size in pool_sizes.items()}
+        self.pools = {
+            family: ThreadPoolExecutor(max_workers=size, thread_name_prefix=f"infer-{family}")
+            for family, size in self.pool_sizes.items()
+        }
+
+    def family_of(self, model_name: str) -> str:
+        """Get the family whose pool serves a model"""
+        return MODEL_FAMILIES.get(model_name, model_name)
+
+    async def run(self, family: str, fn: Callable, *args: Any) -> Any:
+        """Run `fn(*args)` on the family's pool and await the result"""
+        pool = self.pools.get(family)
+        if pool is None:
+            raise KeyError(f"No inference pool configured for '{family}'")
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(pool, functools.partial(fn, *args))
+
+    def runner(self, model_name: str) -> Callable:
+        """Get a coroutine function that runs callables on a model's pool"""
+        return functools.partial(self.run, self.family_of(model_name))
+
+    def shutdown(self, wait: bool = True):
+        """Shut down every pool"""
+        for family, pool in self.pools.items():
+            logger.info(f"Shutting down {family} inference pool")
+            pool.shutdown(wait=wait)
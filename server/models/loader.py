@@ -3,82 +3,219 @@ Model loading utilities for the health prediction API
 """
 import joblib
 import logging
-import os
+import numpy as np
+import threading
+import time
 from pathlib import Path
 from typing import Any, Dict, Optional
 
+from config import settings
+from .adapters import build_adapter
+from .mappers import SymptomIndex
+from .mmap_artifacts import MMAP_ARTIFACTS, count_arrays, find_mapped, load_mapped
+from .numpy_nn import NumpyNetwork
+from .onnx_backend import build_onnx_adapters
+
 logger = logging.getLogger(__name__)
 
+# Models served through an adapter (the encoder and symptom columns are metadata)
+SERVABLE_MODELS = ("diabetes", "heart", "parkinsons", "logistic", "neural")
+
+# Every artifact the server can load, in startup order
+ARTIFACTS = SERVABLE_MODELS + ("encoder", "symptom_columns")
+
+# Artifact load states reported by /health
+LOADED = "loaded"
+NOT_LOADED = "not_loaded"
+FAILED = "failed"
+
 class ModelLoader:
-    """Utility class for loading and managing ML models"""
+    """Utility class for loading and managing ML models
+    
+    Each artifact is loaded eagerly by `load_all_models` or lazily on first
+    use, according to `settings.MODEL_LOAD_MODES`. Loading an artifact also
+    imports the library it needs (sklearn, TensorFlow, onnxruntime) at that
+    point, so lazily loaded models cost nothing until they are requested.
+    """
     
     def __init__(self):
         self.models: Dict[str, Any] = {}
+        self.adapters: Dict[str, Any] = {}
+        self.errors: Dict[str, str] = {}
+        self.load_seconds: Dict[str, float] = {}
+        self.symptom_index: Optional[SymptomIndex] = None
+        self.class_names: Optional[np.ndarray] = None
         self.loaded = False
+        self._locks = {name: threading.Lock() for name in ARTIFACTS}
         
         # Get the project root directory (parent of server directory)
         self.server_dir = Path(__file__).parent.parent
         self.project_root = self.server_dir.parent
-        
+    
     def _get_model_path(self, relative_path: str) -> Path:
         """Get absolute path for model files"""
         return self.project_root / relative_path
     
-    def load_all_models(self) -> bool:
-        """Load all required models"""
-        try:
-            logger.info("Loading ML models...")
-            logger.info(f"Project root: {self.project_root}")
-            
-            # Load models with mmap mode for large files
-            diabetes_path = self._get_model_path("Datasets/sav files/diabetes_model.sav")
-            heart_path = self._get_model_path("Datasets/sav files/heart_disease_model.sav")
-            parkinsons_path = self._get_model_path("Datasets/sav files/parkinsons_model.sav")
-            
-            logger.info(f"Loading diabetes model from: {diabetes_path}")
-            self.models['diabetes'] = joblib.load(str(diabetes_path), mmap_mode="r")
-            
-            logger.info(f"Loading heart model from: {heart_path}")
-            self.models['heart'] = joblib.load(str(heart_path), mmap_mode="r")
-            
-            logger.info(f"Loading parkinsons model from: {parkinsons_path}")
-            self.models['parkinsons'] = joblib.load(str(parkinsons_path), mmap_mode="r")
-            
-            # Load other models
-            logistic_path = self._get_model_path("Datasets/pkl/logistic_regression_model.pkl")
-            neural_path = self._get_model_path("Datasets/pkl/neural_network_model.pkl")
-            encoder_path = self._get_model_path("Datasets/pkl/encoder.pkl")
-            symptom_path = self._get_model_path("Datasets/pkl/symptom_columns.pkl")
-            
-            logger.info(f"Loading logistic model from: {logistic_path}")
-            self.models['logistic'] = joblib.load(str(logistic_path))
-            
-            logger.info(f"Loading neural model from: {neural_path}")
-            self.models['neural'] = joblib.load(str(neural_path))
-            
-            logger.info(f"Loading encoder from: {encoder_path}")
-            self.models['encoder'] = joblib.load(str(encoder_path))
-            
-            logger.info(f"Loading symptom columns from: {symptom_path}")
-            self.models['symptom_columns'] = joblib.load(str(symptom_path))
-            
-            self.loaded = True
-            logger.info("All models loaded successfully!")
+    def _uses_numpy_network(self) -> bool:
+        """Whether the neural network is served by NumpyNetwork rather than Keras"""
+        return settings.NEURAL_BACKEND == "numpy" or (
+            settings.NEURAL_BACKEND == "auto" and self._get_model_path(settings.NEURAL_NUMPY_PATH).exists()
+        )
+    
+    def mapped_source(self, name: str) -> Optional[Path]:
+        """The artifact a memory-mappable copy of `name` is converted from, if it can have one"""
+        if name == "neural":
+            # Only the NumPy network has plain arrays to map
+            return self._get_model_path(settings.NEURAL_NUMPY_PATH) if self._uses_numpy_network() else None
+        if name in MMAP_ARTIFACTS:
+            return self._get_model_path(getattr(settings, f"{name.upper()}_MODEL_PATH"))
+        return None
+    
+    def _load_artifact(self, name: str, mapped: bool = True) -> Any:
+        """Deserialize one artifact from disk, from its memory-mappable copy when there is one"""
+        source = self.mapped_source(name)
+        if mapped and settings.MMAP_MODELS_ENABLED and source is not None:
+            path = find_mapped(self._get_model_path(settings.MMAP_MODELS_DIR), name, source)
+            if path is not None:
+                model = load_mapped(path)
+                mapped_arrays, arrays = count_arrays(model)
+                logger.info(f"Mapped {name} model from: {path} ({mapped_arrays}/{arrays} arrays shared)")
+                return model
+        
+        if name in ("diabetes", "heart", "parkinsons"):
+            # The notebooks pickled these models, so their arrays are always copied;
+            # scripts/convert_mmap.py writes copies that can be mapped
+            path = self._get_model_path(getattr(settings, f"{name.upper()}_MODEL_PATH"))
+            logger.info(f"Loading {name} model from: {path}")
+            return joblib.load(str(path))
+        
+        if name == "neural":
+            # The extracted NumPy network avoids importing TensorFlow
+            if self._uses_numpy_network():
+                neural_numpy_path = self._get_model_path(settings.NEURAL_NUMPY_PATH)
+                logger.info(f"Loading neural network weights from: {neural_numpy_path}")
+                return NumpyNetwork.load(neural_numpy_path)
+            path = self._get_model_path(settings.NEURAL_MODEL_PATH)
+        elif name == "logistic":
+            path = self._get_model_path(settings.LOGISTIC_MODEL_PATH)
+        elif name == "encoder":
+            path = self._get_model_path(settings.ENCODER_PATH)
+        elif name == "symptom_columns":
+            path = self._get_model_path(settings.SYMPTOM_COLUMNS_PATH)
+        else:
+            raise KeyError(f"Unknown model artifact '{name}'")
+        
+        logger.info(f"Loading {name} model from: {path}")
+        return joblib.load(str(path))
+    
+    def load_model(self, name: str) -> bool:
+        """Load one artifact, and its adapter if it is servable, unless already done
+        
+        Concurrent callers for the same artifact wait on its lock and share a
+        single load. A failure is remembered and reported, not retried.
+        """
+        if name in self.models:
             return True
-            
-        except Exception as e:
-            logger.error(f"Error loading models: {e}")
-            self.loaded = False
-            return False
+        with self._locks[name]:
+            if name in self.models:
+                return True
+            if name in self.errors:
+                return False
+            try:
+                started = time.perf_counter()
+                model = self._load_artifact(name)
+                if name in SERVABLE_MODELS:
+                    # Resolve the model's inference method once, up front
+                    adapter = build_adapter(name, model, sparse=settings.SPARSE_LOGISTIC_ENABLED)
+                    if settings.INFERENCE_BACKEND == "onnx":
+                        onnx_dir = self._get_model_path(settings.ONNX_MODELS_DIR)
+                        adapter = build_onnx_adapters(
+                            onnx_dir, {name: adapter}, settings.ONNX_INTRA_OP_THREADS
+                        )[name]
+                    self.adapters[name] = adapter
+                elif name == "symptom_columns":
+                    # Index the vocabulary once, so requests map symptoms by lookup
+                    self.symptom_index = SymptomIndex(model)
+                elif name == "encoder":
+                    # Decode labels by indexing, without calling the encoder per request
+                    self.class_names = np.asarray(model.classes_)
+                # Publish the model last, so readers never see it without its adapter
+                self.load_seconds[name] = time.perf_counter() - started
+                self.models[name] = model
+                logger.info(f"Loaded {name} in {self.load_seconds[name] * 1000.0:.1f} ms")
+                return True
+            except Exception as e:
+                logger.error(f"Error loading {name}: {e}")
+                self.errors[name] = str(e)
+                return False
+    
+    def load_all_models(self) -> bool:
+        """Load every artifact configured for eager loading"""
+        logger.info("Loading ML models...")
+        logger.info(f"Project root: {self.project_root}")
+        
+        eager = [name for name in ARTIFACTS if self.load_mode(name) == "eager"]
+        lazy = [name for name in ARTIFACTS if name not in eager]
+        if lazy:
+            logger.info(f"Deferring until first use: {', '.join(lazy)}")
+        
+        results = [self.load_model(name) for name in eager]
+        self.loaded = all(results)
+        if self.loaded:
+            logger.info("All eager models loaded successfully!")
+        return self.loaded
+    
+    def load_mode(self, name: str) -> str:
+        """Get an artifact's load mode, eager or lazy"""
+        return settings.MODEL_LOAD_MODES.get(name, settings.MODEL_LOAD_MODE)
+    
+    def is_fork_safe(self, name: str) -> bool:
+        """Whether an artifact can be loaded before forking worker processes
+        
+        TensorFlow starts thread pools that a forked child does not inherit, so
+        the Keras network has to be loaded in each worker instead.
+        """
+        return name != "neural" or self._uses_numpy_network()
+    
+    def is_model_loaded(self, model_name: str) -> bool:
+        """Check whether an artifact is in memory, without loading it"""
+        return model_name in self.models
     
     def get_model(self, model_name: str) -> Optional[Any]:
-        """Get a specific model by name"""
+        """Get a specific model by name, loading it first if needed"""
+        if model_name not in self.models and model_name in self._locks:
+            self.load_model(model_name)
         return self.models.get(model_name)
     
+    def get_adapter(self, model_name: str) -> Optional[Any]:
+        """Get the inference adapter for a servable model, loading it first if needed"""
+        if model_name not in self.adapters and model_name in self._locks:
+            self.load_model(model_name)
+        return self.adapters.get(model_name)
+    
+    def get_symptom_index(self) -> Optional[SymptomIndex]:
+        """Get the symptom name -> column index, loading the symptom columns first if needed"""
+        if self.symptom_index is None:
+            self.load_model("symptom_columns")
+        return self.symptom_index
+    
+    def get_class_names(self) -> Optional[np.ndarray]:
+        """Get the disease name of every encoded label, loading the encoder first if needed"""
+        if self.class_names is None:
+            self.load_model("encoder")
+        return self.class_names
+    
     def is_loaded(self) -> bool:
-        """Check if all models are loaded"""
+        """Check if all eager models are loaded"""
         return self.loaded
     
+    def get_load_states(self) -> Dict[str, str]:
+        """Get each artifact's state: loaded, not_loaded (lazy, not used yet) or failed"""
+        return {
+            name: LOADED if name in self.models else FAILED if name in self.errors else NOT_LOADED
+            for name in ARTIFACTS
+        }
+    
     def get_status(self) -> Dict[str, bool]:
         """Get loading status of all models"""
         return {
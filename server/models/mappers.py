@@ -2,7 +2,7 @@
 Input mapping functions for converting patient-friendly input to model features
 """
 import numpy as np
-from typing import List
+from typing import Dict, List, Optional, Sequence, Tuple
 from pydantic import BaseModel
 
 # Request models
@@ -37,32 +37,97 @@ class CommonInput(BaseModel):
     age: str
     medicalHistory: str
 
+# Qualitative answer -> numeric level maps for each questionnaire field
+DIABETES_FIELD_MAPS = {
+    "excessiveThirst": {"never": 0, "rarely": 1, "sometimes": 2, "often": 3},
+    "frequentUrination": {"no": 0, "slight": 1, "moderate": 2, "much": 3},
+    "unexplainedWeightLoss": {"no": 0, "slight": 1, "moderate": 2, "significant": 3},
+    "fatigue": {"never": 0, "sometimes": 1, "often": 2, "always": 3},
+    "blurredVision": {"never": 0, "occasionally": 1, "frequently": 2, "constantly": 3},
+    "slowHealingWounds": {"normal": 0, "slightly": 1, "much": 2, "very": 3},
+}
+
+HEART_FIELD_MAPS = {
+    "chestPain": {"never": 0, "rarely": 1, "sometimes": 2, "often": 3},
+    "breathingDifficulty": {"no": 0, "mild": 1, "moderate": 2, "severe": 3},
+    "fatigue": {"never": 0, "sometimes": 1, "often": 2, "always": 3},
+    "heartRate": {"slow": 0, "normal": 1, "fast": 2, "very_fast": 3},
+    "age": {"under_30": 45, "30_50": 50, "50_70": 58, "over_70": 65},  # Adjusted to be more realistic
+    "exerciseHabits": {"daily": 0, "weekly": 1, "monthly": 2, "never": 3},
+}
+
+_SEVERITY_MAP = {"no": 0, "mild": 1, "moderate": 2, "severe": 3}
+PARKINSONS_FIELD_MAPS = {
+    "speech_problems": _SEVERITY_MAP,
+    "handwriting_changes": _SEVERITY_MAP,
+    "tremors": _SEVERITY_MAP,
+    "balance_issues": _SEVERITY_MAP,
+    "stiffness": _SEVERITY_MAP,
+}
+
+# Simplified feature vector based on typical Parkinson's measures
+PARKINSONS_BASE_FEATURES = np.array([
+    119.992, 157.302, 74.997, 0.00784, 0.00007, 0.0037, 0.00554, 0.01109,
+    0.04374, 0.426, 0.02182, 0.0313, 0.02971, 0.06545, 0.02211, 21.033,
+    0.414783, 0.815285, -4.813031, 0.266482, 2.301442, 0.284654
+])
+
+# Jitter and shimmer features scale with symptom severity
+PARKINSONS_SCALED_FEATURES = np.zeros(len(PARKINSONS_BASE_FEATURES))
+PARKINSONS_SCALED_FEATURES[[3, 4, 5, 6, 7, 8, 9, 13, 14]] = 1.0
+
+# The map_*_input functions stay scalar: for one record, building arrays per
+# feature costs far more than the arithmetic, so the map_*_batch functions are
+# for lists of records only
+
+def _field_levels(records: Sequence[BaseModel], field: str, mapping: dict, default) -> np.ndarray:
+    """Look up the numeric level of one field for every record"""
+    return np.array([mapping.get(getattr(record, field), default) for record in records])
+
+def map_diabetes_batch(records: Sequence[DiabetesInput]) -> np.ndarray:
+    """Map a list of diabetes inputs to an (N, 8) feature matrix"""
+    maps = DIABETES_FIELD_MAPS
+    thirst = _field_levels(records, "excessiveThirst", maps["excessiveThirst"], 0)
+    urination = _field_levels(records, "frequentUrination", maps["frequentUrination"], 0)
+    weight = _field_levels(records, "unexplainedWeightLoss", maps["unexplainedWeightLoss"], 0)
+    fatigue = _field_levels(records, "fatigue", maps["fatigue"], 0)
+    vision = _field_levels(records, "blurredVision", maps["blurredVision"], 0)
+    healing = _field_levels(records, "slowHealingWounds", maps["slowHealingWounds"], 0)
+    n = len(records)
+    
+    # Create feature matrix based on the diabetes dataset structure
+    # Original features: Pregnancies,Glucose,BloodPressure,SkinThickness,Insulin,BMI,DiabetesPedigreeFunction,Age
+    return np.column_stack([
+        np.full(n, 1.0),  # pregnancies: default value
+        120 + thirst * 20,  # glucose
+        80 + fatigue * 5,  # blood pressure
+        np.full(n, 20.0),  # skin thickness
+        80 + urination * 30,  # insulin
+        25 + weight * 2,  # bmi
+        0.5 + vision * 0.2,  # diabetes pedigree
+        40 + healing * 5,  # age
+    ]).astype(float)
+
 def map_diabetes_input(data: DiabetesInput) -> np.ndarray:
     """Map patient-friendly diabetes input to model features"""
-    # Map qualitative responses to numerical values
-    thirst_map = {"never": 0, "rarely": 1, "sometimes": 2, "often": 3}
-    urination_map = {"no": 0, "slight": 1, "moderate": 2, "much": 3}
-    weight_map = {"no": 0, "slight": 1, "moderate": 2, "significant": 3}
-    fatigue_map = {"never": 0, "sometimes": 1, "often": 2, "always": 3}
-    vision_map = {"never": 0, "occasionally": 1, "frequently": 2, "constantly": 3}
-    healing_map = {"normal": 0, "slightly": 1, "much": 2, "very": 3}
+    maps = DIABETES_FIELD_MAPS
     
     # Create feature array based on the diabetes dataset structure
     # Original features: Pregnancies,Glucose,BloodPressure,SkinThickness,Insulin,BMI,DiabetesPedigreeFunction,Age
     pregnancies = 1  # Default value
-    glucose = 120 + (thirst_map.get(data.excessiveThirst, 0) * 20)
-    blood_pressure = 80 + (fatigue_map.get(data.fatigue, 0) * 5)
+    glucose = 120 + (maps["excessiveThirst"].get(data.excessiveThirst, 0) * 20)
+    blood_pressure = 80 + (maps["fatigue"].get(data.fatigue, 0) * 5)
     skin_thickness = 20
-    insulin = 80 + (urination_map.get(data.frequentUrination, 0) * 30)
-    bmi = 25 + (weight_map.get(data.unexplainedWeightLoss, 0) * 2)
-    diabetes_pedigree = 0.5 + (vision_map.get(data.blurredVision, 0) * 0.2)
-    age = 40 + (healing_map.get(data.slowHealingWounds, 0) * 5)
+    insulin = 80 + (maps["frequentUrination"].get(data.frequentUrination, 0) * 30)
+    bmi = 25 + (maps["unexplainedWeightLoss"].get(data.unexplainedWeightLoss, 0) * 2)
+    diabetes_pedigree = 0.5 + (maps["blurredVision"].get(data.blurredVision, 0) * 0.2)
+    age = 40 + (maps["slowHealingWounds"].get(data.slowHealingWounds, 0) * 5)
     
-    features = np.array([[pregnancies, glucose, blood_pressure, skin_thickness, insulin, bmi, diabetes_pedigree, age]])
-    return features
+    return np.array([[pregnancies, glucose, blood_pressure, skin_thickness, insulin, bmi, diabetes_pedigree, age]],
+                    dtype=float)
 
-def map_heart_input(data: HeartInput) -> np.ndarray:
-    """Map patient-friendly heart input to model features
+def map_heart_batch(records: Sequence[HeartInput]) -> np.ndarray:
+    """Map a list of heart inputs to an (N, 13) feature matrix
     
     Based on dataset analysis:
     Healthy patients (target=0) vs Diseased patients (target=1):
@@ -72,72 +137,125 @@ def map_heart_input(data: HeartInput) -> np.ndarray:
     - exang: 0.40 vs 0.27 (more exercise angina)
     - oldpeak: 1.74 vs 1.26 (higher ST depression)
     """
-    
-    # Map qualitative responses to numerical values
-    chest_pain_map = {"never": 0, "rarely": 1, "sometimes": 2, "often": 3}
-    breathing_map = {"no": 0, "mild": 1, "moderate": 2, "severe": 3}
-    fatigue_map = {"never": 0, "sometimes": 1, "often": 2, "always": 3}
-    heart_rate_map = {"slow": 0, "normal": 1, "fast": 2, "very_fast": 3}
-    age_map = {"under_30": 45, "30_50": 50, "50_70": 58, "over_70": 65}  # Adjusted to be more realistic
-    exercise_map = {"daily": 0, "weekly": 1, "monthly": 2, "never": 3}
+    maps = HEART_FIELD_MAPS
+    n = len(records)
     
     # Heart dataset features: age,sex,cp,trestbps,chol,fbs,restecg,thalach,exang,oldpeak,slope,ca,thal
-    age = age_map.get(data.age, 50)
-    sex = 1  # Default male (1 = male, 0 = female)
+    age = _field_levels(records, "age", maps["age"], 50)
+    sex = np.ones(n)  # Default male (1 = male, 0 = female)
     
     # Chest pain type (0=typical angina, 1=atypical, 2=non-anginal, 3=asymptomatic)
     # Higher values correlate with higher disease risk
-    cp = chest_pain_map.get(data.chestPain, 0)
+    cp = _field_levels(records, "chestPain", maps["chestPain"], 0)
     
     # Resting blood pressure - healthy patients have slightly higher (133.92 vs 130.38)
-    breathing_severity = breathing_map.get(data.breathingDifficulty, 0)
+    breathing_severity = _field_levels(records, "breathingDifficulty", maps["breathingDifficulty"], 0)
+    trestbps = np.where(
+        breathing_severity == 0,
+        135,  # healthy baseline when there is no breathing difficulty
+        np.clip(130 + breathing_severity * 8, 110, 180)
+    )
+    
+    # Cholesterol - healthy patients have slightly higher (248.89 vs 243.45)
+    fatigue_level = _field_levels(records, "fatigue", maps["fatigue"], 0)
+    chol = np.where(
+        fatigue_level == 0,
+        250,  # healthy baseline when there is no fatigue
+        np.clip(240 + fatigue_level * 25, 180, 450)
+    )
+    
+    # Fasting blood sugar > 120 mg/dl (0 = false, 1 = true)
+    fbs = ((fatigue_level >= 2) | (breathing_severity >= 2)).astype(int)
+    
+    # Resting electrocardiographic results (0=normal, 1=ST-T abnormality, 2=LV hypertrophy)
+    restecg = np.clip((breathing_severity + fatigue_level) // 3, 0, 2)
+    
+    # Maximum heart rate achieved
+    # KEY INSIGHT: Healthy patients have LOWER thalach (142.17 vs 154.81)
+    heart_rate_level = _field_levels(records, "heartRate", maps["heartRate"], 1)
+    exercise_level = _field_levels(records, "exerciseHabits", maps["exerciseHabits"], 1)
+    thalach = np.select(
+        [
+            heart_rate_level == 0,  # slow: on the healthy side
+            (heart_rate_level == 1) & (exercise_level <= 1),  # normal, good exercise habits: healthy baseline
+            heart_rate_level == 1,  # normal, poor exercise habits: moderate
+            heart_rate_level == 2,  # fast: concerning
+        ],
+        [135, 140, 150, 160],
+        175  # very_fast: high risk
+    )
+    
+    # Exercise induced angina (1 = yes, 0 = no)
+    # INSIGHT: Healthy patients have MORE exercise angina (0.40 vs 0.27)
+    # This seems counterintuitive but matches the data. Older people with good
+    # exercise habits are more likely to have exercise angina; sedentary people
+    # are less likely to experience it.
+    exang = np.where(exercise_level <= 1, (age > 55).astype(int), 0)
+    
+    # ST depression induced by exercise relative to rest
+    # INSIGHT: Healthy patients have HIGHER oldpeak (1.74 vs 1.26)
+    symptom_count = cp + breathing_severity + fatigue_level
+    oldpeak = np.select(
+        [symptom_count == 0, symptom_count <= 2, symptom_count <= 4],
+        [1.8, 1.5, 1.2],  # 1.8 is the healthy baseline
+        0.8  # very symptomatic
+    )
+    
+    # Slope of peak exercise ST segment (0=upsloping, 1=flat, 2=downsloping)
+    # Healthy mean=1.36, Diseased mean=1.44
+    slope = np.where(symptom_count <= 3, 1, 2)
+    
+    # Number of major vessels (0-4) colored by fluoroscopy
+    # Healthy mean=0.90, Diseased mean=0.68
+    ca = np.where(symptom_count <= 2, 1, 0)
+    
+    # Thalassemia: 0=normal, 1=fixed defect, 2=reversible defect, 3=not described
+    # Healthy mode=3, Diseased mode=2
+    thal = np.where(symptom_count == 0, 3, 2)
+    
+    return np.column_stack([
+        age, sex, cp, trestbps, chol, fbs, restecg, thalach, exang, oldpeak, slope, ca, thal
+    ]).astype(float)
+
+def map_heart_input(data: HeartInput) -> np.ndarray:
+    """Map patient-friendly heart input to model features, following map_heart_batch"""
+    maps = HEART_FIELD_MAPS
+    
+    # Heart dataset features: age,sex,cp,trestbps,chol,fbs,restecg,thalach,exang,oldpeak,slope,ca,thal
+    age = maps["age"].get(data.age, 50)
+    sex = 1  # Default male (1 = male, 0 = female)
+    cp = maps["chestPain"].get(data.chestPain, 0)
+    
+    breathing_severity = maps["breathingDifficulty"].get(data.breathingDifficulty, 0)
     if breathing_severity == 0:  # no breathing difficulty
         trestbps = 135  # healthy baseline
     else:
         trestbps = min(180, max(110, 130 + (breathing_severity * 8)))
     
-    # Cholesterol - healthy patients have slightly higher (248.89 vs 243.45)
-    fatigue_level = fatigue_map.get(data.fatigue, 0)
+    fatigue_level = maps["fatigue"].get(data.fatigue, 0)
     if fatigue_level == 0:  # no fatigue
         chol = 250  # healthy baseline
     else:
         chol = min(450, max(180, 240 + (fatigue_level * 25)))
     
-    # Fasting blood sugar > 120 mg/dl (0 = false, 1 = true)
     fbs = 1 if (fatigue_level >= 2 or breathing_severity >= 2) else 0
-    
-    # Resting electrocardiographic results (0=normal, 1=ST-T abnormality, 2=LV hypertrophy)
     restecg = min(2, max(0, (breathing_severity + fatigue_level) // 3))
     
-    # Maximum heart rate achieved
-    # KEY INSIGHT: Healthy patients have LOWER thalach (142.17 vs 154.81)
-    heart_rate_level = heart_rate_map.get(data.heartRate, 1)
-    exercise_level = exercise_map.get(data.exerciseHabits, 1)
-    
+    heart_rate_level = maps["heartRate"].get(data.heartRate, 1)
+    exercise_level = maps["exerciseHabits"].get(data.exerciseHabits, 1)
     if heart_rate_level == 0:  # slow
         thalach = 135  # on the healthy side
     elif heart_rate_level == 1:  # normal
-        if exercise_level <= 1:  # good exercise habits
-            thalach = 140  # healthy baseline
-        else:
-            thalach = 150  # moderate
+        thalach = 140 if exercise_level <= 1 else 150  # healthy baseline with good exercise habits
     elif heart_rate_level == 2:  # fast
         thalach = 160  # concerning
     else:  # very_fast
         thalach = 175  # high risk
     
-    # Exercise induced angina (1 = yes, 0 = no)
-    # INSIGHT: Healthy patients have MORE exercise angina (0.40 vs 0.27)
-    # This seems counterintuitive but matches the data
-    if exercise_level <= 1:  # good exercise habits
-        exang = 1 if age > 55 else 0  # older healthy people more likely to have exercise angina
-    else:  # poor exercise habits
-        exang = 0  # less likely to experience exercise angina due to sedentary lifestyle
-    
-    # ST depression induced by exercise relative to rest
-    # INSIGHT: Healthy patients have HIGHER oldpeak (1.74 vs 1.26)
-    symptom_count = chest_pain_map.get(data.chestPain, 0) + breathing_map.get(data.breathingDifficulty, 0) + fatigue_map.get(data.fatigue, 0)
+    # Older people with good exercise habits are more likely to have exercise angina
+    exang = int(age > 55) if exercise_level <= 1 else 0
     
+    symptom_count = cp + breathing_severity + fatigue_level
     if symptom_count == 0:  # no symptoms
         oldpeak = 1.8  # healthy baseline
     elif symptom_count <= 2:
@@ -146,111 +264,133 @@ def map_heart_input(data: HeartInput) -> np.ndarray:
         oldpeak = 1.2
     else:
         oldpeak = 0.8  # very symptomatic
+    slope = 1 if symptom_count <= 3 else 2
+    ca = 1 if symptom_count <= 2 else 0
+    thal = 3 if symptom_count == 0 else 2
     
-    # Slope of peak exercise ST segment (0=upsloping, 1=flat, 2=downsloping)
-    # Healthy mean=1.36, Diseased mean=1.44
-    if symptom_count == 0:
-        slope = 1  # healthy typical
-    elif symptom_count <= 3:
-        slope = 1
-    else:
-        slope = 2
-    
-    # Number of major vessels (0-4) colored by fluoroscopy
-    # Healthy mean=0.90, Diseased mean=0.68
-    if symptom_count == 0:
-        ca = 1  # healthy typical
-    elif symptom_count <= 2:
-        ca = 1
-    elif symptom_count <= 4:
-        ca = 0
-    else:
-        ca = 0
-    
-    # Thalassemia: 0=normal, 1=fixed defect, 2=reversible defect, 3=not described
-    # Healthy mode=3, Diseased mode=2
-    if symptom_count == 0:
-        thal = 3  # healthy typical
-    elif symptom_count <= 2:
-        thal = 2
-    else:
-        thal = 2
+    return np.array([[age, sex, cp, trestbps, chol, fbs, restecg, thalach, exang, oldpeak, slope, ca, thal]],
+                    dtype=float)
+
+def map_parkinsons_batch(records: Sequence[ParkinsonsInput]) -> np.ndarray:
+    """Map a list of Parkinson's inputs to an (N, 22) feature matrix"""
+    # Adjust features based on the mean symptom severity
+    symptom_multiplier = sum(
+        _field_levels(records, field, mapping, 0)
+        for field, mapping in PARKINSONS_FIELD_MAPS.items()
+    ) / 5.0
     
-    features = np.array([[age, sex, cp, trestbps, chol, fbs, restecg, thalach, exang, oldpeak, slope, ca, thal]])
-    return features
+    # Modify base features based on symptom severity
+    scale = 1 + np.outer(symptom_multiplier, PARKINSONS_SCALED_FEATURES)
+    return PARKINSONS_BASE_FEATURES * scale
 
 def map_parkinsons_input(data: ParkinsonsInput) -> np.ndarray:
     """Map patient-friendly Parkinson's input to model features"""
-    # Map qualitative responses to numerical values
-    speech_map = {"no": 0, "mild": 1, "moderate": 2, "severe": 3}
-    handwriting_map = {"no": 0, "mild": 1, "moderate": 2, "severe": 3}
-    tremor_map = {"no": 0, "mild": 1, "moderate": 2, "severe": 3}
-    balance_map = {"no": 0, "mild": 1, "moderate": 2, "severe": 3}
-    stiffness_map = {"no": 0, "mild": 1, "moderate": 2, "severe": 3}
-    
-    # Create a simplified feature vector based on typical Parkinson's measures
-    base_features = [
-        119.992, 157.302, 74.997, 0.00784, 0.00007, 0.0037, 0.00554, 0.01109,
-        0.04374, 0.426, 0.02182, 0.0313, 0.02971, 0.06545, 0.02211, 21.033,
-        0.414783, 0.815285, -4.813031, 0.266482, 2.301442, 0.284654
-    ]
-    
-    # Adjust features based on symptoms
-    symptom_multiplier = (
-        speech_map.get(data.speech_problems, 0) +
-        handwriting_map.get(data.handwriting_changes, 0) +
-        tremor_map.get(data.tremors, 0) +
-        balance_map.get(data.balance_issues, 0) +
-        stiffness_map.get(data.stiffness, 0)
+    # Adjust features based on the mean symptom severity
+    symptom_multiplier = sum(
+        mapping.get(getattr(data, field), 0) for field, mapping in PARKINSONS_FIELD_MAPS.items()
     ) / 5.0
+    return (PARKINSONS_BASE_FEATURES * (1 + symptom_multiplier * PARKINSONS_SCALED_FEATURES)).reshape(1, -1)
+
+# Map common symptom names to dataset columns
+SYMPTOM_ALIASES = {
+    "fever": "fever",
+    "headache": "headache",
+    "cough": "cough",
+    "sore throat": "sore_throat",
+    "runny nose": "nasal_congestion",
+    "body aches": "muscle_pain",
+    "nausea": "nausea",
+    "vomiting": "vomiting",
+    "diarrhea": "diarrhea",
+    "fatigue": "fatigue",
+    "dizziness": "dizziness",
+    "shortness of breath": "shortness_of_breath",
+    "chest pain": "sharp_chest_pain",
+    "abdominal pain": "sharp_abdominal_pain",
+    "skin rash": "skin_rash",
+    "joint pain": "joint_pain"
+}
+
+def normalize_symptom(symptom: str) -> str:
+    """Normalize a reported symptom name before looking it up"""
+    return symptom.strip().lower()
+
+def symptom_key(symptom: str) -> str:
+    """Normalize a symptom name for index lookups, treating spaces and underscores alike"""
+    return "_".join(normalize_symptom(symptom).replace("_", " ").split())
+
+class SymptomIndex:
+    """Symptom name -> column position for the common disease models
     
-    # Modify base features based on symptom severity
-    adjusted_features = []
-    for i, feature in enumerate(base_features):
-        if i in [3, 4, 5, 6, 7, 8, 9, 13, 14]:  # Jitter and shimmer features
-            adjusted_features.append(feature * (1 + symptom_multiplier))
-        else:
-            adjusted_features.append(feature)
-    
-    return np.array([adjusted_features])
+    Built once when the symptom columns are loaded. Every column name in the
+    model vocabulary is accepted, as are the friendly names in SYMPTOM_ALIASES,
+    so mapping a request costs one dict lookup per reported symptom.
+    """
+    
+    def __init__(self, symptom_columns: Sequence[str]):
+        self.columns = [str(column) for column in symptom_columns]
+        self.positions: Dict[str, int] = {}
+        for i, column in enumerate(self.columns):
+            self.positions.setdefault(symptom_key(column), i)
+        
+        # Aliases never shadow a real column name
+        for alias, column in SYMPTOM_ALIASES.items():
+            position = self.positions.get(symptom_key(column))
+            if position is not None:
+                self.positions.setdefault(symptom_key(alias), position)
+        
+        # Also index the spaced spelling, so common inputs skip normalization
+        for key, position in list(self.positions.items()):
+            self.positions.setdefault(key.replace("_", " "), position)
+    
+    def __len__(self) -> int:
+        return len(self.columns)
+    
+    def position(self, symptom: str) -> Optional[int]:
+        """Get the column position of a symptom, or None if it is not recognized"""
+        position = self.positions.get(symptom)
+        if position is None:
+            position = self.positions.get(symptom_key(symptom))
+        return position
+    
+    def positions_of(self, symptoms: Sequence[str]) -> Tuple[int, ...]:
+        """Get the sorted, de-duplicated column positions of the recognized symptoms
+        
+        Unknown symptoms do not reach the models, so requests with the same
+        positions always get the same prediction.
+        """
+        positions = {self.position(symptom) for symptom in symptoms}
+        positions.discard(None)
+        return tuple(sorted(positions))
+
+def map_common_symptoms_batch(records: Sequence[CommonInput], symptom_index) -> np.ndarray:
+    """Map a list of symptom inputs to an (N, n_symptoms) binary matrix
+    
+    Takes a SymptomIndex, or the raw symptom columns to index on the fly.
+    """
+    if not isinstance(symptom_index, SymptomIndex):
+        symptom_index = SymptomIndex(symptom_index)
+    
+    # Collect the (row, column) position of every reported symptom
+    rows, cols = [], []
+    for row, data in enumerate(records):
+        for symptom in data.symptoms:
+            position = symptom_index.position(symptom)
+            if position is not None:
+                rows.append(row)
+                cols.append(position)
+    
+    # Set 1 for reported symptoms
+    symptom_matrix = np.zeros((len(records), len(symptom_index)))
+    symptom_matrix[rows, cols] = 1
+    return symptom_matrix
 
-def map_common_symptoms(data: CommonInput, symptom_columns) -> np.ndarray:
+def map_common_symptoms(data: CommonInput, symptom_index) -> np.ndarray:
     """Map symptoms to the common diseases model format"""
-    # Create a binary vector for symptoms
-    symptom_vector = np.zeros(len(symptom_columns))
-    
-    # Map common symptom names to dataset columns
-    symptom_mapping = {
-        "fever": "fever",
-        "headache": "headache",
-        "cough": "cough",
-        "sore throat": "sore_throat",
-        "runny nose": "nasal_congestion",
-        "body aches": "muscle_pain",
-        "nausea": "nausea",
-        "vomiting": "vomiting",
-        "diarrhea": "diarrhea",
-        "fatigue": "fatigue",
-        "dizziness": "dizziness",
-        "shortness of breath": "shortness_of_breath",
-        "chest pain": "sharp_chest_pain",
-        "abdominal pain": "sharp_abdominal_pain",
-        "skin rash": "skin_rash",
-        "joint pain": "joint_pain"
-    }
+    if not isinstance(symptom_index, SymptomIndex):
+        symptom_index = SymptomIndex(symptom_index)
     
     # Set 1 for reported symptoms
-    for symptom in data.symptoms:
-        symptom_key = symptom_mapping.get(symptom.lower())
-        if symptom_key:
-            # Handle both list and numpy array types for symptom_columns
-            if hasattr(symptom_columns, 'tolist'):
-                symptom_list = symptom_columns.tolist()
-            else:
-                symptom_list = list(symptom_columns)
-            
-            if symptom_key in symptom_list:
-                idx = symptom_list.index(symptom_key)
-                symptom_vector[idx] = 1
-    
-    return symptom_vector.reshape(1, -1)
\ No newline at end of file
+    symptom_vector = np.zeros((1, len(symptom_index)))
+    symptom_vector[0, list(symptom_index.positions_of(data.symptoms))] = 1
+    return symptom_vector
@@ -0,0 +1,105 @@
+"""
+Memory-mappable copies of the model artifacts
+
+The notebooks saved the models with `pickle.dump`, so loading them copies every
+array (SVC support vectors, dual and logistic coefficients) into private memory
+in each process, whatever `mmap_mode` is passed. `scripts/convert_mmap.py`
+rewrites them with `joblib.dump`, which stores each array as raw aligned
+bytes, and the loader opens those copies with `mmap_mode="r"`: the arrays are
+read-only views of the file, so every worker and process shares one page-cache
+copy and loading only parses the small object skeleton.
+
+A manifest records the size and modification time of each source artifact;
+a copy whose source has changed since it was converted is ignored.
+"""
+import json
+import logging
+from pathlib import Path
+from typing import Any, Dict, Optional, Tuple
+
+import joblib
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+# Artifacts that have a memory-mappable copy: the sklearn models and the NumPy network
+MMAP_ARTIFACTS = ("diabetes", "heart", "parkinsons", "logistic", "neural")
+
+MANIFEST_NAME = "manifest.json"
+
+
+def mapped_path(directory: Path, name: str) -> Path:
+    """Path of an artifact's memory-mappable copy"""
+    return Path(directory) / f"{name}.joblib"
+
+
+def _stamp(source: Path) -> Dict[str, int]:
+    stat = Path(source).stat()
+    return {"size": stat.st_size, "mtime_ns": stat.st_mtime_ns}
+
+
+def read_manifest(directory: Path) -> Dict[str, Dict[str, Any]]:
+    """Source stamps of the converted artifacts, by name"""
+    path = Path(directory) / MANIFEST_NAME
+    if not path.exists():
+        return {}
+    with open(path, encoding="utf-8") as f:
+        return json.load(f)
+
+
+def write_mapped(model: Any, directory: Path, name: str, source: Path) -> Path:
+    """Write an artifact's memory-mappable copy and record its source in the manifest"""
+    directory = Path(directory)
+    directory.mkdir(parents=True, exist_ok=True)
+    path = mapped_path(directory, name)
+    # Uncompressed, so joblib can map each array straight from the file
+    joblib.dump(model, str(path), compress=0)
+    manifest = read_manifest(directory)
+    manifest[name] = {"source": Path(source).name, **_stamp(source)}
+    with open(directory / MANIFEST_NAME, "w", encoding="utf-8") as f:
+        json.dump(manifest, f, indent=2)
+    return path
+
+
+def find_mapped(directory: Path, name: str, source: Path) -> Optional[Path]:
+    """The memory-mappable copy of an artifact, unless it is missing or out of date"""
+    path = mapped_path(directory, name)
+    if not path.exists():
+        return None
+    recorded = read_manifest(directory).get(name)
+    if recorded is None:
+        logger.warning(f"Ignoring {path}: not in the manifest")
+        return None
+    if Path(source).exists() and _stamp(source) != {key: recorded.get(key) for key in ("size", "mtime_ns")}:
+        logger.warning(f"Ignoring {path}: {source} changed since it was converted")
+        return None
+    return path
+
+
+def load_mapped(path: Path) -> Any:
+    """Load a converted artifact with its arrays mapped read-only"""
+    return joblib.load(str(path), mmap_mode="r")
+
+
+def count_arrays(obj: Any, _seen: Optional[set] = None) -> Tuple[int, int]:
+    """(memory-mapped, total) NumPy arrays reachable from an object's attributes"""
+    seen = _seen if _seen is not None else set()
+    if id(obj) in seen:
+        return 0, 0
+    seen.add(id(obj))
+    if isinstance(obj, np.ndarray) and obj.dtype != object:
+        return int(isinstance(obj, np.memmap)), 1
+    if isinstance(obj, dict):
+        children = obj.values()
+    elif isinstance(obj, (list, tuple)):
+        children = obj
+    elif hasattr(obj, "__dict__"):
+        children = vars(obj).values()
+    else:
+        return 0, 0
+    mapped = total = 0
+    for child in children:
+        child_mapped, child_total = count_arrays(child, seen)
+        mapped += child_mapped
+        total += child_total
+    return mapped, total
@@ -0,0 +1,117 @@
+"""
+TensorFlow-free forward pass for the common-disease neural network
+
+The Keras model is a Sequential stack of Dense layers, so serving it only
+takes a matrix product, a bias add and an activation per layer. The weights
+are extracted once into a `.npz` artifact (see scripts/export_numpy_nn.py)
+and scored with NumPy, without importing TensorFlow.
+"""
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Sequence, Tuple, Union
+
+import numpy as np
+
+ARTIFACT_VERSION = 1
+
+# Keras layers with no effect at inference time on 2D inputs
+PASSTHROUGH_LAYERS = ("InputLayer", "Dropout", "Flatten")
+
+
+def _softmax(x: np.ndarray) -> np.ndarray:
+    """Row-wise softmax, shifted by the row maximum for stability"""
+    exp = np.exp(x - x.max(axis=1, keepdims=True))
+    return exp / exp.sum(axis=1, keepdims=True)
+
+
+def _sigmoid(x: np.ndarray) -> np.ndarray:
+    return 1.0 / (1.0 + np.exp(-x))
+
+
+ACTIVATIONS: Dict[str, Callable[[np.ndarray], np.ndarray]] = {
+    "linear": lambda x: x,
+    "relu": lambda x: np.maximum(x, 0),
+    "sigmoid": _sigmoid,
+    "tanh": np.tanh,
+    "softmax": _softmax,
+}
+
+
+class NumpyNetwork:
+    """Stack of dense layers scored with NumPy, matching Keras `predict`
+
+    Computation is done in float32, as Keras does, so outputs agree with the
+    original model to float32 rounding.
+    """
+
+    def __init__(self, layers: Sequence[Tuple[np.ndarray, np.ndarray, str]]):
+        if not layers:
+            raise ValueError("A network needs at least one layer")
+        for kernel, bias, activation in layers:
+            if activation not in ACTIVATIONS:
+                raise ValueError(f"Unsupported activation '{activation}'")
+            if kernel.ndim != 2 or bias.shape != (kernel.shape[1],):
+                raise ValueError(f"Bad layer shapes: kernel {kernel.shape}, bias {bias.shape}")
+        for (kernel, _, _), (next_kernel, _, _) in zip(layers, layers[1:]):
+            if kernel.shape[1] != next_kernel.shape[0]:
+                raise ValueError(f"Layer output {kernel.shape[1]} does not match next input {next_kernel.shape[0]}")
+        self.layers = [
+            (np.ascontiguousarray(kernel, dtype=np.float32), np.asarray(bias, dtype=np.float32), activation)
+            for kernel, bias, activation in layers
+        ]
+
+    @property
+    def input_shape(self) -> Tuple[None, int]:
+        """Input shape in Keras form, (batch, features)"""
+        return (None, self.layers[0][0].shape[0])
+
+    @property
+    def activations(self) -> List[str]:
+        return [activation for _, _, activation in self.layers]
+
+    def predict(self, features: np.ndarray) -> np.ndarray:
+        """Run the forward pass on a feature matrix"""
+        x = np.asarray(features, dtype=np.float32)
+        for kernel, bias, activation in self.layers:
+            x = ACTIVATIONS[activation](x @ kernel + bias)
+        return x
+
+    def save(self, path: Union[str, Path]):
+        """Write the weights and activations to a `.npz` artifact"""
+        arrays = {"version": np.array(ARTIFACT_VERSION), "activations": np.array(self.activations)}
+        for i, (kernel, bias, _) in enumerate(self.layers):
+            arrays[f"kernel_{i}"] = kernel
+            arrays[f"bias_{i}"] = bias
+        np.savez(path, **arrays)
+
+    @classmethod
+    def load(cls, path: Union[str, Path]) -> "NumpyNetwork":
+        """Read a network written by `save`"""
+        with np.load(path, allow_pickle=False) as artifact:
+            version = int(artifact["version"])
+            if version != ARTIFACT_VERSION:
+                raise ValueError(f"Unsupported network artifact version {version}")
+            activations = [str(activation) for activation in artifact["activations"]]
+            return cls([
+                (artifact[f"kernel_{i}"], artifact[f"bias_{i}"], activation)
+                for i, activation in enumerate(activations)
+            ])
+
+
+def extract_dense_layers(model: Any) -> NumpyNetwork:
+    """Copy the weights and activations out of a Keras Sequential Dense model"""
+    layers = []
+    for layer in model.layers:
+        kind = type(layer).__name__
+        if kind in PASSTHROUGH_LAYERS:
+            continue
+        if kind != "Dense":
+            raise ValueError(f"Unsupported layer '{layer.name}' ({kind}); only Dense layers can be extracted")
+        config = layer.get_config()
+        activation = config["activation"]
+        if not isinstance(activation, str):
+            raise ValueError(f"Layer '{layer.name}' uses a custom activation")
+        weights = layer.get_weights()
+        kernel = weights[0]
+        bias = weights[1] if config.get("use_bias", True) else np.zeros(kernel.shape[1], dtype=kernel.dtype)
+        layers.append((kernel, bias, activation))
+    return NumpyNetwork(layers)
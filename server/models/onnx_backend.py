@@ -0,0 +1,181 @@
+"""
+ONNX Runtime inference backend
+
+Serves the sklearn models exported by `ML/export_onnx.py` with CPU
+onnxruntime sessions. Models without a usable export keep their sklearn
+adapter.
+"""
+import json
+import logging
+import time
+from pathlib import Path
+from typing import Any, Dict, Mapping, Optional, Tuple
+
+import numpy as np
+
+from .adapters import DECISION, PROBA, SPARSE, ModelAdapter, decision_confidence, rank_classes
+
+logger = logging.getLogger(__name__)
+
+MANIFEST_FILE = "models_manifest.json"
+
+# Manifest keys written by ML/export_onnx.py -> model loader names
+MANIFEST_KEYS = {
+    "diabetes": "diabetes",
+    "heart": "heart",
+    "parkinsons": "parkinsons",
+    "common_logistic": "logistic",
+    "common_neural": "neural",
+}
+
+
+def _import_onnxruntime() -> Any:
+    """Import onnxruntime on first use, or None when it is not installed"""
+    try:
+        import onnxruntime
+    except ImportError:  # Optional dependency: the sklearn backend works without it
+        return None
+    return onnxruntime
+
+
+class OnnxAdapter:
+    """`infer(X) -> (labels, confidences)` over an ONNX Runtime session
+
+    `method` is the sklearn adapter method of the same model. skl2onnx emits
+    class probabilities for probabilistic classifiers and the decision score
+    (first column) for SVMs without probability estimates, so confidences are
+    derived exactly as the sklearn adapter derives them. `classes` labels the
+    probability columns, for ranking.
+    """
+
+    backend = "onnx"
+
+    def __init__(self, name: str, session: Any, method: str, classes: Optional[np.ndarray] = None):
+        if method not in (PROBA, DECISION):
+            raise ValueError(f"{name}: ONNX serving does not support method '{method}'")
+        self.name = name
+        self.session = session
+        self.method = method
+        self.classes = classes
+        model_input = session.get_inputs()[0]
+        self.input_name = model_input.name
+        self.n_features = model_input.shape[-1]
+
+    def _run(self, features: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """Run the session once, returning its labels and scores"""
+        labels, scores = self.session.run(
+            None, {self.input_name: np.asarray(features, dtype=np.float32)}
+        )
+        if isinstance(scores, list):
+            # Exports made with a ZipMap output return one {class: probability} dict per row
+            scores = np.array([[row[key] for key in sorted(row)] for row in scores])
+        return labels, np.asarray(scores, dtype=np.float64)
+
+    def infer(self, features: np.ndarray):
+        """Score a feature matrix with a single session run"""
+        labels, scores = self._run(features)
+        if self.method == DECISION:
+            return labels, decision_confidence(scores[:, 0])
+        return labels, scores.max(axis=1)
+
+    def infer_ranked(self, features: np.ndarray, k: int) -> Tuple[np.ndarray, ...]:
+        """Score a feature matrix and rank each row's k most probable classes"""
+        if self.method != PROBA or self.classes is None:
+            raise ValueError(f"{self.name}: ranking needs class probabilities and labels")
+        _, proba = self._run(features)
+        return rank_classes(self.classes, proba, k)
+
+
+def read_manifest(models_dir: Path) -> Dict[str, Path]:
+    """Get the exported ONNX file of every successfully exported model"""
+    manifest_path = models_dir / MANIFEST_FILE
+    with open(manifest_path, encoding="utf-8") as f:
+        manifest = json.load(f)
+
+    files = {}
+    for entry in manifest.get("models", []):
+        name = MANIFEST_KEYS.get(entry.get("key"))
+        if name and entry.get("status") == "success" and entry.get("file"):
+            files[name] = models_dir / entry["file"]
+    return files
+
+
+def create_session(path: Path, intra_op_threads: int = 1) -> Any:
+    """Create a CPU inference session for an ONNX file"""
+    ort = _import_onnxruntime()
+    options = ort.SessionOptions()
+    # Concurrency comes from the inference worker pools, not from each session
+    options.intra_op_num_threads = intra_op_threads
+    options.inter_op_num_threads = 1
+    return ort.InferenceSession(str(path), sess_options=options, providers=["CPUExecutionProvider"])
+
+
+def build_onnx_adapters(models_dir: Path, fallbacks: Mapping[str, ModelAdapter],
+                        intra_op_threads: int = 1) -> Dict[str, Any]:
+    """Swap in ONNX adapters for every model with a working export
+
+    Any model whose export is missing, unsupported or fails its probe keeps
+    its entry from `fallbacks`.
+    """
+    adapters = dict(fallbacks)
+    if _import_onnxruntime() is None:
+        logger.warning("onnxruntime is not installed; serving every model with sklearn")
+        return adapters
+    try:
+        files = read_manifest(models_dir)
+    except (OSError, ValueError) as e:
+        logger.warning(f"Cannot read ONNX manifest in {models_dir}, serving with sklearn: {e}")
+        return adapters
+
+    for name, path in files.items():
+        fallback = fallbacks.get(name)
+        if fallback is None:
+            continue
+        try:
+            # Sparse logistic scoring stands in for predict_proba, the exported output
+            method = PROBA if fallback.method == SPARSE else fallback.method
+            adapter = OnnxAdapter(name, create_session(path, intra_op_threads), method, fallback.classes)
+            adapter.infer(np.zeros((1, adapter.n_features)))
+        except Exception as e:
+            logger.warning(f"{name}: ONNX model {path.name} unusable, falling back to sklearn: {e}")
+            continue
+        adapters[name] = adapter
+        logger.info(f"{name}: serving with onnxruntime ({path.name})")
+    return adapters
+
+
+def _median_ms(fn, features: np.ndarray, repeats: int) -> float:
+    """Median wall time of `fn(features)` in milliseconds"""
+    timings = []
+    for _ in range(repeats):
+        started = time.perf_counter()
+        fn(features)
+        timings.append((time.perf_counter() - started) * 1000.0)
+    return float(np.median(timings))
+
+
+def compare_backends(reference: Any, candidate: Any, features: np.ndarray,
+                     repeats: int = 50) -> Dict[str, Any]:
+    """Compare a candidate adapter against the reference on the same inputs
+
+    Reports label agreement, the largest confidence difference, and median
+    latency of both adapters for a single row and for the whole matrix.
+    """
+    reference_labels, reference_confidences = reference.infer(features)
+    candidate_labels, candidate_confidences = candidate.infer(features)
+    matches = np.asarray(reference_labels) == np.asarray(candidate_labels)
+
+    return {
+        "rows": int(len(features)),
+        "label_agreement": float(np.mean(matches)),
+        "mismatched_rows": np.flatnonzero(~matches).tolist()[:20],
+        "max_confidence_diff": float(np.max(np.abs(
+            np.asarray(reference_confidences, dtype=float) - np.asarray(candidate_confidences, dtype=float)
+        ))),
+        "latency_ms": {
+            "reference_single": _median_ms(reference.infer, features[:1], repeats),
+            "candidate_single": _median_ms(candidate.infer, features[:1], repeats),
+            "reference_batch": _median_ms(reference.infer, features, repeats),
+            "candidate_batch": _median_ms(candidate.infer, features, repeats),
+        },
+    }
@@ -0,0 +1,320 @@
+"""
+Raw feature layouts of the training datasets
+
+The diabetes, heart and parkinsons models were trained on the numeric columns
+of `Datasets/data/{diabetes,heart,parkinsons}.csv`. Clinical extracts with the
+same columns can be scored directly, without the questionnaire mappers.
+
+`CsvChunker` splits a streamed CSV upload into blocks of whole rows, and
+`parse_rows` turns one block into an (n, n_features) matrix in training
+column order, so a file of any size is scored with bounded memory.
+
+Callers that already hold the feature matrix send it in binary instead: an
+`.npy` body is wrapped as the model input without copying its data, and an
+Arrow IPC stream (with pyarrow installed) has its feature columns gathered
+into one matrix. Results are returned in the format of the request.
+"""
+import csv
+import io
+import json
+from typing import Any, Iterator, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+# Feature columns of each dataset, in the order the models were trained on
+RAW_FEATURE_COLUMNS = {
+    "diabetes": [
+        "Pregnancies", "Glucose", "BloodPressure", "SkinThickness", "Insulin", "BMI",
+        "DiabetesPedigreeFunction", "Age",
+    ],
+    "heart": [
+        "age", "sex", "cp", "trestbps", "chol", "fbs", "restecg", "thalach", "exang",
+        "oldpeak", "slope", "ca", "thal",
+    ],
+    "parkinsons": [
+        "MDVP:Fo(Hz)", "MDVP:Fhi(Hz)", "MDVP:Flo(Hz)", "MDVP:Jitter(%)", "MDVP:Jitter(Abs)",
+        "MDVP:RAP", "MDVP:PPQ", "Jitter:DDP", "MDVP:Shimmer", "MDVP:Shimmer(dB)",
+        "Shimmer:APQ3", "Shimmer:APQ5", "MDVP:APQ", "Shimmer:DDA", "NHR", "HNR", "RPDE",
+        "DFA", "spread1", "spread2", "D2", "PPE",
+    ],
+}
+
+# Output formats of the streaming scoring endpoint
+NDJSON = "ndjson"
+CSV = "csv"
+MEDIA_TYPES = {NDJSON: "application/x-ndjson", CSV: "text/csv"}
+
+CSV_RESULT_HEADER = b"row,prediction,risk,confidence,error\n"
+
+INVALID_ROW = "missing or non-numeric feature values"
+
+# Binary formats of the raw-feature endpoints
+NPY_MEDIA_TYPE = "application/x-npy"
+ARROW_MEDIA_TYPE = "application/vnd.apache.arrow.stream"
+BINARY_MEDIA_TYPES = (NPY_MEDIA_TYPE, ARROW_MEDIA_TYPE)
+
+# One record per row of an .npy result
+RESULT_DTYPE = np.dtype([("prediction", "<i8"), ("confidence", "<f8")])
+
+
+class CsvChunker:
+    """Split a CSV byte stream into blocks of `chunk_rows` complete rows
+
+    The header line is read first and must name every feature column of the
+    model, or `columns` when given; other columns (labels, record names) are
+    ignored. Each record must be on one line, and blank lines, rows with more
+    fields than the header and rows that do not parse count as (invalid) rows,
+    so row numbers match the data lines of the file.
+    """
+
+    def __init__(self, model_name: str, chunk_rows: int, columns: Optional[Sequence[str]] = None):
+        self.columns = list(columns) if columns is not None else RAW_FEATURE_COLUMNS[model_name]
+        self.chunk_rows = max(1, chunk_rows)
+        self.header: Optional[List[str]] = None
+        self.positions: Optional[List[int]] = None
+        self._buffer = bytearray()
+        self._pending_lines = 0
+
+    def feed(self, data: bytes) -> Iterator[bytes]:
+        """Add bytes from the stream and yield every complete block of rows"""
+        self._buffer += data
+        self._pending_lines += data.count(b"\n")
+        if self.header is None and not self._read_header():
+            return
+        while self._pending_lines >= self.chunk_rows:
+            newlines = np.flatnonzero(np.frombuffer(self._buffer, dtype=np.uint8) == ord("\n"))
+            cut = int(newlines[self.chunk_rows - 1]) + 1
+            block = bytes(self._buffer[:cut])
+            del self._buffer[:cut]
+            self._pending_lines -= self.chunk_rows
+            yield block
+
+    def finish(self) -> Iterator[bytes]:
+        """Yield the rows left at the end of the stream"""
+        if self.header is None:
+            self._buffer += b"\n"
+            if not self._read_header():
+                raise ValueError("The CSV upload is empty")
+        rows = bytes(self._buffer).rstrip(b"\r\n")
+        if rows.strip():
+            yield rows + b"\n"
+        self._buffer.clear()
+        self._pending_lines = 0
+
+    def _read_header(self) -> bool:
+        """Find the feature columns in the header line, once it has arrived"""
+        end = self._buffer.find(b"\n")
+        if end < 0:
+            return False
+        line = bytes(self._buffer[:end]).decode("utf-8-sig").strip()
+        if not line:
+            raise ValueError("The CSV upload is empty")
+        self.header = [name.strip().strip('"') for name in line.split(",")]
+        missing = [column for column in self.columns if column not in self.header]
+        if missing:
+            raise ValueError(f"Missing feature columns: {', '.join(missing)}")
+        self.positions = [self.header.index(column) for column in self.columns]
+        del self._buffer[:end + 1]
+        self._pending_lines -= 1
+        return True
+
+    def _well_formed(self, block: bytes) -> np.ndarray:
+        """Flag the lines of a block that are not blank and have at most as many fields as the header"""
+        data = np.frombuffer(block, dtype=np.uint8)
+        ends = np.flatnonzero(data == ord("\n"))
+        if b'"' in block:
+            # Quoted fields may hold commas, so count the fields of each line with csv
+            text = block.decode("utf-8", errors="replace").split("\n")[:-1]
+            fields = np.array([len(next(csv.reader([line]), [])) for line in text], dtype=int)
+            return (fields > 0) & (fields <= len(self.header))
+        # Without quotes, every comma separates two fields
+        commas = np.flatnonzero(data == ord(","))
+        gaps = len(self.header) - 1
+        if gaps and len(commas) == len(ends) * gaps:
+            # Usually each line has exactly one comma per gap: check its first and last comma
+            starts = np.concatenate(([-1], ends[:-1]))
+            if (commas[::gaps] > starts).all() and (commas[gaps - 1::gaps] < ends).all():
+                return np.ones(len(ends), dtype=bool)
+        commas = np.bincount(np.searchsorted(ends, commas), minlength=len(ends))
+        lengths = np.diff(np.concatenate(([-1], ends))) - 1
+        lengths -= (lengths > 0) & (data[np.maximum(ends - 1, 0)] == ord("\r"))
+        return (lengths > 0) & (commas < len(self.header))
+
+    def read_rows(self, block: bytes, **options) -> Tuple[Any, np.ndarray]:
+        """Read the columns of a block's rows with pandas into (frame of the well-formed rows, well_formed)
+
+        `options` are passed to `pandas.read_csv`. A row the parser rejects, or
+        that would be merged with its neighbours, is not well formed and does
+        not stop the others: the block is then read one row at a time.
+        """
+        # Imported on first use, so starting the API does not pay for pandas
+        import pandas as pd
+
+        def read(rows: bytes):
+            return pd.read_csv(
+                io.BytesIO(rows), header=None, names=range(len(self.header)),
+                usecols=self.positions, index_col=False, skip_blank_lines=False, **options
+            )[self.positions]
+
+        def no_rows():
+            # One record of empty (quoted, so never blank) fields, dropped again
+            return read(b",".join([b'""'] * len(self.header)) + b"\n").iloc[:0]
+
+        if not block.endswith(b"\n"):
+            block += b"\n"
+        well_formed = self._well_formed(block)
+        lines = None
+        if not well_formed.all():
+            lines = block.split(b"\n")[:-1]
+            block = b"".join(line + b"\n" for line, ok in zip(lines, well_formed) if ok)
+        if not well_formed.any():
+            return no_rows(), well_formed
+        try:
+            frame = read(block)
+            if len(frame) == well_formed.sum():
+                return frame, well_formed
+        except pd.errors.ParserError:
+            pass
+
+        # Unbalanced quotes: find the rows that do not read as exactly one record
+        lines = lines if lines is not None else block.split(b"\n")[:-1]
+        frames = []
+        for i in np.flatnonzero(well_formed):
+            try:
+                row = read(lines[i] + b"\n")
+            except pd.errors.ParserError:
+                row = None
+            if row is not None and len(row) == 1:
+                frames.append(row)
+            else:
+                well_formed[i] = False
+        return pd.concat(frames, ignore_index=True) if frames else no_rows(), well_formed
+
+    def parse_rows(self, block: bytes) -> Tuple[np.ndarray, np.ndarray]:
+        """Parse a block into (features, valid): rows with a missing or non-numeric value are invalid"""
+        if not block:
+            return np.empty((0, len(self.columns))), np.empty(0, dtype=bool)
+        frame, well_formed = self.read_rows(block)
+        if any(dtype == object for dtype in frame.dtypes):
+            import pandas as pd
+            frame = frame.apply(pd.to_numeric, errors="coerce")
+        features = frame.to_numpy(dtype=np.float64)
+        if not well_formed.all():
+            rows = np.full((len(well_formed), len(self.columns)), np.nan)
+            rows[well_formed] = features
+            features = rows
+        valid = ~np.isnan(features).any(axis=1)
+        return features, valid
+
+
+def encode_results(fmt: str, first_row: int, valid: np.ndarray,
+                   predictions: Sequence, confidences: Sequence) -> bytes:
+    """Serialize the results of one block; `predictions` and `confidences` cover the valid rows only"""
+    lines = []
+    scored = iter(zip(np.asarray(predictions).tolist(), np.asarray(confidences).tolist()))
+    for row, ok in enumerate(valid.tolist(), start=first_row):
+        if ok:
+            prediction, confidence = next(scored)
+            risk = "High Risk" if prediction == 1 else "Low Risk"
+            if fmt == NDJSON:
+                lines.append(json.dumps({
+                    "row": row, "prediction": prediction, "risk": risk, "confidence": confidence * 100
+                }))
+            else:
+                lines.append(f"{row},{prediction},{risk},{confidence * 100!r},")
+        elif fmt == NDJSON:
+            lines.append(json.dumps({"row": row, "error": INVALID_ROW}))
+        else:
+            lines.append(f"{row},,,,{INVALID_ROW}")
+    return ("\n".join(lines) + "\n").encode() if lines else b""
+
+
+def encode_error(fmt: str, message: str) -> bytes:
+    """Serialize an error that stopped the stream"""
+    if fmt == NDJSON:
+        return (json.dumps({"error": message}) + "\n").encode()
+    return f",,,,{message}\n".encode()
+
+
+def _import_pyarrow() -> Any:
+    """Import pyarrow on first use, or None when it is not installed"""
+    try:
+        import pyarrow
+        import pyarrow.ipc
+    except ImportError:  # Optional dependency: .npy bodies work without it
+        return None
+    return pyarrow
+
+
+def arrow_available() -> bool:
+    """Whether Arrow IPC bodies can be read"""
+    return _import_pyarrow() is not None
+
+
+def read_npy(body: bytes) -> np.ndarray:
+    """Wrap an .npy body as an array over the body's own bytes"""
+    stream = io.BytesIO(body)
+    version = np.lib.format.read_magic(stream)
+    if version == (1, 0):
+        shape, fortran_order, dtype = np.lib.format.read_array_header_1_0(stream)
+    elif version == (2, 0):
+        shape, fortran_order, dtype = np.lib.format.read_array_header_2_0(stream)
+    else:
+        raise ValueError(f"Unsupported .npy format version {version}")
+    if dtype.kind not in "biuf":
+        raise ValueError(f"Features must be numeric, got dtype {dtype}")
+    count = int(np.prod(shape))
+    array = np.frombuffer(body, dtype=dtype, count=count, offset=stream.tell())
+    return array.reshape(shape, order="F" if fortran_order else "C")
+
+
+def read_arrow(body: bytes, columns: Sequence[str]) -> np.ndarray:
+    """Gather the feature columns of an Arrow IPC stream into an (n, n_features) matrix"""
+    pyarrow = _import_pyarrow()
+    table = pyarrow.ipc.open_stream(pyarrow.py_buffer(body)).read_all()
+    missing = [column for column in columns if column not in table.column_names]
+    if missing:
+        raise ValueError(f"Missing feature columns: {', '.join(missing)}")
+    # Arrow is columnar, so building the row-major model input is the one copy
+    features = np.empty((table.num_rows, len(columns)))
+    for i, column in enumerate(columns):
+        values = table.column(column)
+        if values.null_count:
+            raise ValueError(f"Column {column} has missing values")
+        if not (pyarrow.types.is_integer(values.type) or pyarrow.types.is_floating(values.type)):
+            raise ValueError(f"Column {column} must be numeric, got {values.type}")
+        features[:, i] = values.to_numpy()
+    return features
+
+
+def read_features(media_type: str, model_name: str, body: bytes) -> np.ndarray:
+    """Read a binary request body into the model's (n, n_features) input matrix"""
+    columns = RAW_FEATURE_COLUMNS[model_name]
+    if media_type == ARROW_MEDIA_TYPE:
+        features = read_arrow(body, columns)
+    else:
+        features = read_npy(body)
+        if features.ndim != 2 or features.shape[1] != len(columns):
+            raise ValueError(f"Expected an (n, {len(columns)}) array, got shape {features.shape}")
+    if not np.isfinite(features).all():
+        raise ValueError("Features must be finite")
+    return features
+
+
+def write_results(media_type: str, predictions: Sequence, confidences: Sequence) -> bytes:
+    """Serialize predictions and confidences (in percent) in the format of the request"""
+    predictions = np.asarray(predictions, dtype=np.int64)
+    confidences = np.asarray(confidences, dtype=np.float64) * 100
+    if media_type == ARROW_MEDIA_TYPE:
+        pyarrow = _import_pyarrow()
+        table = pyarrow.table({"prediction": predictions, "confidence": confidences})
+        sink = pyarrow.BufferOutputStream()
+        with pyarrow.ipc.new_stream(sink, table.schema) as writer:
+            writer.write_table(table)
+        return sink.getvalue().to_pybytes()
+    results = np.empty(len(predictions), dtype=RESULT_DTYPE)
+    results["prediction"] = predictions
+    results["confidence"] = confidences
+    output = io.BytesIO()
+    np.save(output, results, allow_pickle=False)
+    return output.getvalue()
@@ -0,0 +1,59 @@
+"""
+Single-flight deduplication of identical in-flight predictions
+
+Retries and double submissions send the same payload several times at once.
+The first request with a key starts the computation; identical requests that
+arrive while it runs await the same task instead of mapping and scoring the
+record again. The task is shielded, so a caller that disconnects does not
+cancel it for the others, and its key is dropped as soon as it finishes:
+this only shares work between concurrent requests and caches nothing.
+"""
+import asyncio
+import hashlib
+import json
+from typing import Any, Awaitable, Callable, Dict, Hashable
+
+from pydantic import BaseModel
+
+
+def request_key(data: BaseModel) -> str:
+    """Canonical hash of a validated request: equal field values give equal keys"""
+    canonical = json.dumps(data.model_dump(mode="json"), sort_keys=True, separators=(",", ":"))
+    return hashlib.sha256(canonical.encode()).hexdigest()
+
+
+class SingleFlight:
+    """Run one computation per key at a time, shared by every concurrent caller"""
+
+    def __init__(self):
+        self._calls: Dict[Hashable, asyncio.Task] = {}
+        self.leaders = 0
+        self.coalesced = 0
+
+    def __contains__(self, key: Hashable) -> bool:
+        return key in self._calls
+
+    def __len__(self) -> int:
+        return len(self._calls)
+
+    async def run(self, key: Hashable, call: Callable[[], Awaitable[Any]]) -> Any:
+        """Await the computation in flight for `key`, starting `call()` if there is none"""
+        task = self._calls.get(key)
+        if task is None:
+            task = asyncio.ensure_future(call())
+            self._calls[key] = task
+            task.add_done_callback(lambda done: self._finish(key, done))
+            self.leaders += 1
+        else:
+            self.coalesced += 1
+        return await asyncio.shield(task)
+
+    def _finish(self, key: Hashable, task: asyncio.Task) -> None:
+        if self._calls.get(key) is task:
+            del self._calls[key]
+        # Mark the exception retrieved when every caller has gone
+        if not task.cancelled():
+            task.exception()
+
+    def stats(self) -> Dict[str, int]:
+        return {"in_flight": len(self._calls), "leaders": self.leaders, "coalesced": self.coalesced}
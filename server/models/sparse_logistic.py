@@ -0,0 +1,89 @@
+"""
+Sparse scoring for the common-disease logistic regression
+
+A common-disease request sets a handful of the symptom features, so the
+decision scores are the intercept plus the sum of the `coef_` columns of the
+active symptoms. Scoring only those columns replaces the dense
+(n x n_features) . (n_features x n_classes) product, and the probabilities are
+then computed once, exactly as `LogisticRegression.predict_proba` does.
+"""
+from typing import Any
+
+import numpy as np
+from scipy.sparse import csr_matrix
+from scipy.special import expit
+
+
+def is_logistic_regression(model: Any) -> bool:
+    """Check whether a model is a fitted sklearn LogisticRegression"""
+    return (
+        type(model).__name__ == "LogisticRegression"
+        and type(model).__module__.startswith("sklearn")
+        and hasattr(model, "coef_")
+    )
+
+
+def _softmax(scores: np.ndarray) -> np.ndarray:
+    """In-place row-wise softmax, in the same order of operations as sklearn's"""
+    scores -= np.max(scores, axis=1).reshape((-1, 1))
+    np.exp(scores, scores)
+    scores /= np.sum(scores, axis=1).reshape((-1, 1))
+    return scores
+
+
+class SparseLogistic:
+    """Logistic regression scored over the nonzero features of each row"""
+
+    def __init__(self, coef: np.ndarray, intercept: np.ndarray, multinomial: bool):
+        coef = np.atleast_2d(np.asarray(coef, dtype=np.float64))
+        # One contiguous row of class weights per feature
+        self.weights = np.ascontiguousarray(coef.T)
+        self.intercept = np.broadcast_to(np.asarray(intercept, dtype=np.float64), (coef.shape[0],)).copy()
+        self.multinomial = multinomial
+        self.n_features = self.weights.shape[0]
+
+    @classmethod
+    def from_model(cls, model: Any) -> "SparseLogistic":
+        """Copy the coefficients of a fitted LogisticRegression"""
+        # The same rule LogisticRegression.predict_proba uses to pick
+        # one-vs-rest sigmoids over a multinomial softmax
+        ovr = model.multi_class in ("ovr", "warn") or (
+            model.multi_class == "auto"
+            and (len(model.classes_) <= 2 or model.solver in ("liblinear", "newton-cholesky"))
+        )
+        return cls(model.coef_, model.intercept_, multinomial=not ovr)
+
+    def decision_function(self, features: np.ndarray) -> np.ndarray:
+        """Decision scores of shape (n, n_classes), or (n, 1) for a binary model
+
+        Only the nonzero features are multiplied, through a CSR matrix for batches.
+        """
+        features = np.asarray(features, dtype=np.float64)
+        if features.ndim != 2 or features.shape[1] != self.n_features:
+            raise ValueError(f"Expected features of shape (n, {self.n_features}), got {features.shape}")
+
+        rows, cols = np.nonzero(features)
+        values = features[rows, cols]
+        if len(features) == 1:
+            # A single request: sum the weight rows of its few active features
+            contributions = self.weights[cols]
+            if not np.all(values == 1.0):
+                contributions = contributions * values[:, None]
+            scores = contributions.sum(axis=0, keepdims=True)
+        else:
+            scores = csr_matrix((values, (rows, cols)), shape=features.shape) @ self.weights
+        scores += self.intercept
+        return scores
+
+    def predict_proba(self, features: np.ndarray) -> np.ndarray:
+        """Class probabilities, matching LogisticRegression.predict_proba"""
+        scores = self.decision_function(features)
+        if self.multinomial:
+            if scores.shape[1] == 1:
+                scores = np.c_[-scores[:, 0], scores[:, 0]]
+            return _softmax(scores)
+        proba = expit(scores)
+        if proba.shape[1] == 1:
+            return np.c_[1 - proba[:, 0], proba[:, 0]]
+        proba /= proba.sum(axis=1).reshape((-1, 1))
+        return proba
@@ -0,0 +1,237 @@
+#!/usr/bin/env python3
+"""
+Startup profiling for the FastAPI server
+
+Starts `python -X importtime app.py` in a subprocess several times and
+reports, per run and summarized across runs:
+  - import time per top-level package (from -X importtime)
+  - load time per model artifact (from GET /stats)
+  - seconds from process start until /health answers and until each
+    prediction endpoint returns its first successful response
+
+Environment variables are passed through, so configurations can be compared,
+e.g. `MODEL_LOAD_MODE=lazy python server/scripts/bench_startup.py`.
+
+Usage:
+  python server/scripts/bench_startup.py [--runs 5] [--output startup_bench.json]
+"""
+
+import argparse
+import json
+import os
+import socket
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import urllib.error
+import urllib.request
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+SERVER_DIR = Path(__file__).resolve().parent.parent
+BENCH_API_KEY = "startup-bench"
+
+# First request sent to each prediction endpoint
+SAMPLE_REQUESTS = {
+    "diabetes": {
+        "excessiveThirst": "often", "frequentUrination": "much", "unexplainedWeightLoss": "moderate",
+        "fatigue": "often", "blurredVision": "frequently", "slowHealingWounds": "much"
+    },
+    "heart": {
+        "chestPain": "often", "breathingDifficulty": "moderate", "fatigue": "often",
+        "heartRate": "fast", "age": "50_70", "exerciseHabits": "never"
+    },
+    "parkinsons": {
+        "age": 60, "speech_problems": "mild", "handwriting_changes": "no",
+        "tremors": "severe", "balance_issues": "mild", "stiffness": "moderate"
+    },
+    "common": {
+        "symptoms": ["fever", "headache", "cough", "fatigue"], "duration": "3-7 days",
+        "severity": "moderate", "age": "30_50", "medicalHistory": "none"
+    },
+}
+
+def _free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+def _request(url: str, body: Optional[dict] = None) -> Optional[Any]:
+    """Send a request and return the decoded JSON body, or None on any failure"""
+    data = json.dumps(body).encode() if body is not None else None
+    request = urllib.request.Request(url, data=data, headers={
+        "Content-Type": "application/json", "X-API-Key": BENCH_API_KEY
+    })
+    try:
+        with urllib.request.urlopen(request, timeout=30) as response:
+            return json.loads(response.read())
+    except (urllib.error.URLError, ConnectionError, OSError, ValueError):
+        return None
+
+def parse_importtime(stderr: str) -> Dict[str, float]:
+    """Sum -X importtime self times (ms) per top-level package"""
+    totals: Dict[str, float] = {}
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        try:
+            self_us, _, module = line[len("import time:"):].split("|", 2)
+            package = module.strip().split(".")[0]
+            totals[package] = totals.get(package, 0.0) + int(self_us) / 1000.0
+        except ValueError:
+            continue
+    return dict(sorted(totals.items(), key=lambda item: item[1], reverse=True))
+
+def run_once(timeout: float) -> Dict[str, Any]:
+    """Start the server once and time it up to the first prediction on every endpoint"""
+    port = _free_port()
+    base_url = f"http://127.0.0.1:{port}"
+    env = {**os.environ, "PORT": str(port), "HOST": "127.0.0.1", "MODEL_API_KEY": BENCH_API_KEY}
+
+    with tempfile.TemporaryFile(mode="w+") as stderr:
+        started = time.perf_counter()
+        process = subprocess.Popen(
+            [sys.executable, "-X", "importtime", "app.py"],
+            cwd=SERVER_DIR, env=env, stdout=subprocess.DEVNULL, stderr=stderr
+        )
+        result: Dict[str, Any] = {"health_seconds": None, "first_prediction_seconds": {}}
+        try:
+            deadline = started + timeout
+            while time.perf_counter() < deadline and process.poll() is None:
+                if _request(f"{base_url}/health") is not None:
+                    result["health_seconds"] = time.perf_counter() - started
+                    break
+                time.sleep(0.02)
+
+            for endpoint, body in SAMPLE_REQUESTS.items():
+                while time.perf_counter() < deadline and process.poll() is None:
+                    if _request(f"{base_url}/predict/{endpoint}", body) is not None:
+                        result["first_prediction_seconds"][endpoint] = time.perf_counter() - started
+                        break
+                    time.sleep(0.02)
+
+            stats = _request(f"{base_url}/stats") or {}
+            result["model_load_seconds"] = stats.get("model_load_seconds", {})
+        finally:
+            process.terminate()
+            try:
+                process.wait(timeout=10)
+            except subprocess.TimeoutExpired:
+                process.kill()
+                process.wait()
+
+        stderr.seek(0)
+        output = stderr.read()
+
+    result["import_ms"] = parse_importtime(output)
+    if result["health_seconds"] is None:
+        # Keep the server's own error output, without the import timings
+        errors = [line for line in output.splitlines() if not line.startswith("import time:")]
+        result["error"] = "\n".join(errors[-20:]) or "server did not become healthy"
+    return result
+
+def _summary(values: List[float]) -> Dict[str, float]:
+    return {
+        "median": statistics.median(values),
+        "min": min(values),
+        "max": max(values),
+    }
+
+def summarize(runs: List[Dict[str, Any]], top_packages: int) -> Dict[str, Any]:
+    """Median/min/max of every measurement across successful runs"""
+    runs = [run for run in runs if "error" not in run]
+    if not runs:
+        return {}
+
+    first_predictions = {
+        endpoint: _summary([run["first_prediction_seconds"][endpoint] for run in runs
+                            if endpoint in run["first_prediction_seconds"]])
+        for endpoint in SAMPLE_REQUESTS
+        if any(endpoint in run["first_prediction_seconds"] for run in runs)
+    }
+    artifacts = sorted({name for run in runs for name in run["model_load_seconds"]})
+    packages = sorted(
+        {package for run in runs for package in run["import_ms"]},
+        key=lambda package: statistics.median(run["import_ms"].get(package, 0.0) for run in runs),
+        reverse=True
+    )[:top_packages]
+
+    return {
+        "health_seconds": _summary([run["health_seconds"] for run in runs]),
+        "first_prediction_seconds": first_predictions,
+        "model_load_seconds": {
+            name: _summary([run["model_load_seconds"][name] for run in runs if name in run["model_load_seconds"]])
+            for name in artifacts
+        },
+        "import_ms": {
+            package: _summary([run["import_ms"].get(package, 0.0) for run in runs])
+            for package in packages
+        },
+        "total_import_ms": _summary([sum(run["import_ms"].values()) for run in runs]),
+    }
+
+def _git_commit() -> Optional[str]:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=SERVER_DIR,
+            capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+def print_summary(summary: Dict[str, Any]):
+    print("\nStartup breakdown (median of runs, [min - max]):")
+    print(f"  /health answering:        {summary['health_seconds']['median']:.3f} s")
+    for endpoint, times in summary["first_prediction_seconds"].items():
+        print(f"  first {endpoint:<20} {times['median']:.3f} s  [{times['min']:.3f} - {times['max']:.3f}]")
+    print(f"\n  Total import time:        {summary['total_import_ms']['median']:.0f} ms")
+    for package, times in summary["import_ms"].items():
+        print(f"    {package:<24} {times['median']:8.1f} ms")
+    print("\n  Artifact load time:")
+    for name, times in summary["model_load_seconds"].items():
+        print(f"    {name:<24} {times['median'] * 1000.0:8.1f} ms")
+
+def main():
+    parser = argparse.ArgumentParser(description="Profile server startup in repeated subprocess runs")
+    parser.add_argument("--runs", type=int, default=5, help="Number of server starts")
+    parser.add_argument("--timeout", type=float, default=120.0, help="Seconds allowed per run")
+    parser.add_argument("--top", type=int, default=15, help="Packages listed in the import breakdown")
+    parser.add_argument("--output", default="startup_bench.json", help="JSON results file")
+    args = parser.parse_args()
+
+    runs = []
+    for i in range(args.runs):
+        run = run_once(args.timeout)
+        runs.append(run)
+        if "error" in run:
+            print(f"[run {i + 1}/{args.runs}] FAILED:\n{run['error']}")
+        else:
+            print(f"[run {i + 1}/{args.runs}] healthy after {run['health_seconds']:.3f} s, "
+                  f"all predictions after {max(run['first_prediction_seconds'].values(), default=0):.3f} s")
+
+    summary = summarize(runs, args.top)
+    report = {
+        "generated_at": datetime.now(timezone.utc).isoformat(),
+        "commit": _git_commit(),
+        "python": sys.version.split()[0],
+        "config": {
+            name: os.environ[name] for name in sorted(os.environ)
+            if name.endswith("_LOAD_MODE") or name in ("NEURAL_BACKEND", "INFERENCE_BACKEND", "ANSWER_TABLES_ENABLED")
+        },
+        "summary": summary,
+        "runs": runs,
+    }
+    with open(args.output, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2)
+
+    if summary:
+        print_summary(summary)
+    print(f"\nResults written to {args.output}")
+    return bool(summary)
+
+if __name__ == "__main__":
+    success = main()
+    sys.exit(0 if success else 1)
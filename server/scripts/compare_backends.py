@@ -0,0 +1,90 @@
+#!/usr/bin/env python3
+"""
+Compare the ONNX Runtime backend against the pickled sklearn models
+
+Checks prediction parity and reports median latency of both backends for
+every model exported by ML/export_onnx.py. Questionnaire models are compared
+over their full answer space; the common logistic model over random symptom
+sets.
+
+Usage:
+  python server/scripts/compare_backends.py [--rows 1000] [--repeats 50] [--output report.json]
+"""
+
+import argparse
+import json
+import os
+import sys
+
+import numpy as np
+
+# Add the parent directory to the path so we can import from the server
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from config import settings
+from models.answer_tables import QUESTIONNAIRE_MODELS, enumerate_records
+from models.loader import SERVABLE_MODELS, model_loader
+from models.onnx_backend import OnnxAdapter, build_onnx_adapters, compare_backends
+
+def _random_symptom_matrix(n_columns: int, rows: int, seed: int = 0) -> np.ndarray:
+    """Binary symptom vectors with 1-8 symptoms each"""
+    rng = np.random.default_rng(seed)
+    features = np.zeros((rows, n_columns))
+    for row in features:
+        row[rng.choice(n_columns, size=rng.integers(1, 9), replace=False)] = 1
+    return features
+
+def _comparison_features(name: str, rows: int) -> np.ndarray:
+    """Inputs to compare a model on"""
+    if name in QUESTIONNAIRE_MODELS:
+        fields, input_cls, batch_mapper = QUESTIONNAIRE_MODELS[name]
+        return batch_mapper(enumerate_records(fields, input_cls))
+    return _random_symptom_matrix(len(model_loader.get_model("symptom_columns")), rows)
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare ONNX Runtime and sklearn model backends")
+    parser.add_argument("--rows", type=int, default=1000, help="Random rows for the symptom models")
+    parser.add_argument("--repeats", type=int, default=50, help="Timed runs per latency measurement")
+    parser.add_argument("--output", help="Write the JSON report to this file")
+    args = parser.parse_args()
+
+    # Load the pickles as the reference backend
+    settings.INFERENCE_BACKEND = "sklearn"
+    if not model_loader.load_all_models():
+        print("ERROR: Could not load the sklearn models")
+        return False
+
+    # Lazily configured models are loaded here too
+    references = {name: model_loader.get_adapter(name) for name in SERVABLE_MODELS}
+    onnx_dir = model_loader.project_root / settings.ONNX_MODELS_DIR
+    candidates = build_onnx_adapters(onnx_dir, references, settings.ONNX_INTRA_OP_THREADS)
+
+    report = {}
+    for name, candidate in candidates.items():
+        if not isinstance(candidate, OnnxAdapter):
+            print(f"[SKIP] {name}: no ONNX model")
+            continue
+        features = _comparison_features(name, args.rows)
+        report[name] = compare_backends(references[name], candidate, features, args.repeats)
+
+        result = report[name]
+        latency = result["latency_ms"]
+        status = "[OK]" if result["label_agreement"] == 1.0 else "[MISMATCH]"
+        print(f"{status} {name}: {result['rows']} rows, "
+              f"label agreement {result['label_agreement']:.4f}, "
+              f"max confidence diff {result['max_confidence_diff']:.2e}")
+        print(f"     single row: sklearn {latency['reference_single']:.3f} ms, "
+              f"onnx {latency['candidate_single']:.3f} ms | "
+              f"{result['rows']} rows: sklearn {latency['reference_batch']:.3f} ms, "
+              f"onnx {latency['candidate_batch']:.3f} ms")
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+        print(f"Report written to {args.output}")
+
+    return bool(report) and all(result["label_agreement"] == 1.0 for result in report.values())
+
+if __name__ == "__main__":
+    success = main()
+    sys.exit(0 if success else 1)
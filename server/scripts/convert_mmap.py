@@ -0,0 +1,76 @@
+#!/usr/bin/env python3
+"""
+Convert the model artifacts into memory-mappable copies
+
+Loads each sklearn model (and the NumPy neural network, when it has been
+exported) from its original artifact, writes it with `joblib.dump` into
+MMAP_MODELS_DIR, and checks that the copy loaded with `mmap_mode="r"` maps
+its arrays and predicts exactly like the original before moving on. The
+server then maps the copies instead of unpickling the originals. Rerun after
+replacing an artifact: copies whose source has changed are ignored.
+
+Usage:
+  python server/scripts/convert_mmap.py [--out DIR] [--rows 256]
+"""
+
+import argparse
+import os
+import sys
+from pathlib import Path
+
+import numpy as np
+
+# Add the parent directory to the path so we can import from the server
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from config import settings
+from models.adapters import build_adapter
+from models.loader import model_loader
+from models.mmap_artifacts import MMAP_ARTIFACTS, count_arrays, load_mapped, write_mapped
+
+def _n_features(model) -> int:
+    if hasattr(model, "n_features_in_"):
+        return int(model.n_features_in_)
+    return int(model.input_shape[1])
+
+def check_equivalence(name: str, original, mapped, rows: int, seed: int = 0) -> bool:
+    """Compare the original and mapped models' predictions on random inputs"""
+    rng = np.random.default_rng(seed)
+    features = rng.random((rows, _n_features(original)))
+    expected = build_adapter(name, original, sparse=False).infer(features)
+    actual = build_adapter(name, mapped, sparse=False).infer(features)
+    return all(np.array_equal(a, b) for a, b in zip(expected, actual))
+
+def main():
+    parser = argparse.ArgumentParser(description="Write memory-mappable copies of the model artifacts")
+    parser.add_argument("--out", default=str(model_loader.project_root / settings.MMAP_MODELS_DIR),
+                        help="Output directory for the converted artifacts")
+    parser.add_argument("--rows", type=int, default=256, help="Random rows for the equivalence check")
+    args = parser.parse_args()
+
+    failed = False
+    for name in MMAP_ARTIFACTS:
+        source = model_loader.mapped_source(name)
+        if source is None:
+            print(f"[convert] {name}: skipped, export the NumPy network first (scripts/export_numpy_nn.py)")
+            continue
+        if not source.exists():
+            print(f"[convert] {name}: skipped, {source} not found")
+            continue
+
+        original = model_loader._load_artifact(name, mapped=False)
+        path = write_mapped(original, Path(args.out), name, source)
+        mapped = load_mapped(path)
+        mapped_arrays, arrays = count_arrays(mapped)
+        if not check_equivalence(name, original, mapped, args.rows):
+            print(f"[convert][ERROR] {name}: mapped copy predicts differently, removing {path}")
+            path.unlink()
+            failed = True
+            continue
+        print(f"[convert] {name}: {path} ({os.path.getsize(path) / 1024.0:.1f} KB, "
+              f"{mapped_arrays}/{arrays} arrays mapped)")
+    return not failed
+
+if __name__ == "__main__":
+    success = main()
+    sys.exit(0 if success else 1)
@@ -0,0 +1,69 @@
+#!/usr/bin/env python3
+"""
+Extract the common-disease Keras network into a NumPy weights artifact
+
+Reads the pickled Keras Sequential model, writes its Dense weights and
+activations to a `.npz` file the server can serve without TensorFlow, and
+checks the NumPy forward pass against Keras before finishing.
+
+Usage:
+  python server/scripts/export_numpy_nn.py [--model PATH] [--out PATH] [--rows 1000]
+"""
+
+import argparse
+import os
+import sys
+
+import joblib
+import numpy as np
+
+# Add the parent directory to the path so we can import from the server
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from config import settings
+from models.loader import model_loader
+from models.numpy_nn import NumpyNetwork, extract_dense_layers
+
+# Largest difference accepted between Keras and NumPy class probabilities
+TOLERANCE = 1e-5
+
+def check_equivalence(model, network: NumpyNetwork, rows: int, seed: int = 0) -> float:
+    """Compare Keras and NumPy outputs on random binary symptom vectors"""
+    rng = np.random.default_rng(seed)
+    features = (rng.random((rows, network.input_shape[1])) < 0.05).astype(np.float32)
+    expected = np.asarray(model.predict(features, verbose=0))
+    actual = network.predict(features)
+    if not np.array_equal(np.argmax(expected, axis=1), np.argmax(actual, axis=1)):
+        print("[export][WARN] Predicted classes differ between Keras and NumPy")
+    return float(np.max(np.abs(expected - actual)))
+
+def main():
+    parser = argparse.ArgumentParser(description="Extract the Keras neural network into NumPy weights")
+    parser.add_argument("--model", default=str(model_loader.project_root / settings.NEURAL_MODEL_PATH),
+                        help="Pickled Keras model")
+    parser.add_argument("--out", default=str(model_loader.project_root / settings.NEURAL_NUMPY_PATH),
+                        help="Output .npz artifact")
+    parser.add_argument("--rows", type=int, default=1000, help="Random rows for the equivalence check")
+    args = parser.parse_args()
+
+    print(f"[export] Loading Keras model from {args.model}")
+    model = joblib.load(args.model)
+    network = extract_dense_layers(model)
+    shapes = " -> ".join(
+        f"{kernel.shape[1]} {activation}" for kernel, _, activation in network.layers
+    )
+    print(f"[export] Extracted {len(network.layers)} Dense layers: {network.input_shape[1]} -> {shapes}")
+
+    max_diff = check_equivalence(model, network, args.rows)
+    print(f"[export] Max probability difference vs Keras over {args.rows} rows: {max_diff:.2e}")
+    if max_diff > TOLERANCE:
+        print(f"[export][ERROR] Difference exceeds tolerance {TOLERANCE:.0e}, not writing {args.out}")
+        return False
+
+    network.save(args.out)
+    print(f"[export] Successfully wrote NumPy network to {args.out}")
+    return True
+
+if __name__ == "__main__":
+    success = main()
+    sys.exit(0 if success else 1)
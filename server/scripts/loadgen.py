@@ -0,0 +1,350 @@
+#!/usr/bin/env python3
+"""
+Asynchronous load generator for the prediction API
+
+Replays a weighted mix of diabetes, heart, Parkinson's and common disease
+requests and reports throughput, latency percentiles and error rates as JSON.
+The target is one of:
+  --url URL       a server that is already running
+  --spawn         a local server started for the run (`python app.py`)
+  --in-process    the ASGI app called directly through httpx, without sockets
+
+Load is either closed-loop (--concurrency workers each sending their next
+request as soon as the previous one answers) or open-loop (--rps requests
+started per second whatever the response times). Open-loop latency is
+measured from each request's scheduled start, so time spent waiting for a
+free connection counts against the server.
+
+Usage:
+  python server/scripts/loadgen.py --in-process --concurrency 16 --duration 10
+  python server/scripts/loadgen.py --url http://localhost:8000 --rps 200 --mix diabetes=1,common=3
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import random
+import socket
+import subprocess
+import sys
+import time
+from contextlib import asynccontextmanager
+from datetime import datetime, timezone
+from typing import Any, AsyncIterator, Callable, Dict, List, Optional, Tuple
+
+import httpx
+import numpy as np
+
+SERVER_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Add the parent directory to the path so we can import from the server
+sys.path.insert(0, SERVER_DIR)
+
+from models.mappers import DIABETES_FIELD_MAPS, HEART_FIELD_MAPS, PARKINSONS_FIELD_MAPS, SYMPTOM_ALIASES
+
+ENDPOINTS = ("diabetes", "heart", "parkinsons", "common")
+LOADGEN_API_KEY = "loadgen"
+
+# One fixed request per endpoint, used with --payloads fixed
+FIXED_PAYLOADS = {
+    "diabetes": {
+        "excessiveThirst": "often", "frequentUrination": "much", "unexplainedWeightLoss": "moderate",
+        "fatigue": "often", "blurredVision": "frequently", "slowHealingWounds": "much"
+    },
+    "heart": {
+        "chestPain": "often", "breathingDifficulty": "moderate", "fatigue": "often",
+        "heartRate": "fast", "age": "50_70", "exerciseHabits": "never"
+    },
+    "parkinsons": {
+        "age": 60, "speech_problems": "mild", "handwriting_changes": "no",
+        "tremors": "severe", "balance_issues": "mild", "stiffness": "moderate"
+    },
+    "common": {
+        "symptoms": ["fever", "headache", "cough", "fatigue"], "duration": "3-7 days",
+        "severity": "moderate", "age": "30_50", "medicalHistory": "none"
+    },
+}
+
+def random_payload(endpoint: str, rng: random.Random) -> Dict[str, Any]:
+    """A valid request body with randomly chosen answers"""
+    if endpoint == "diabetes":
+        return {field: rng.choice(list(answers)) for field, answers in DIABETES_FIELD_MAPS.items()}
+    if endpoint == "heart":
+        return {field: rng.choice(list(answers)) for field, answers in HEART_FIELD_MAPS.items()}
+    if endpoint == "parkinsons":
+        payload = {field: rng.choice(list(answers)) for field, answers in PARKINSONS_FIELD_MAPS.items()}
+        payload["age"] = rng.randint(30, 90)
+        return payload
+    return {
+        "symptoms": rng.sample(sorted(SYMPTOM_ALIASES), rng.randint(1, 6)),
+        "duration": rng.choice(["1-3 days", "3-7 days", "1-2 weeks", "more than 2 weeks"]),
+        "severity": rng.choice(["mild", "moderate", "severe"]),
+        "age": rng.choice(["under_30", "30_50", "50_70", "over_70"]),
+        "medicalHistory": "none",
+    }
+
+def parse_mix(mix: str) -> Dict[str, float]:
+    """Parse 'diabetes=1,common=3' into endpoint weights"""
+    weights = {}
+    for part in mix.split(","):
+        endpoint, _, weight = part.partition("=")
+        endpoint = endpoint.strip()
+        if endpoint not in ENDPOINTS:
+            raise ValueError(f"Unknown endpoint in mix: {endpoint!r} (expected one of {', '.join(ENDPOINTS)})")
+        weights[endpoint] = float(weight) if weight else 1.0
+    if not any(weight > 0 for weight in weights.values()):
+        raise ValueError("The request mix needs at least one positive weight")
+    return weights
+
+def request_picker(weights: Dict[str, float], payloads: str, seed: int) -> Callable[[], Tuple[str, Dict[str, Any]]]:
+    """Draw (endpoint, body) pairs following the mix weights"""
+    rng = random.Random(seed)
+    endpoints = list(weights)
+    cumulative = list(np.cumsum([weights[endpoint] for endpoint in endpoints]))
+
+    def pick():
+        endpoint = rng.choices(endpoints, cum_weights=cumulative)[0]
+        if payloads == "fixed":
+            return endpoint, FIXED_PAYLOADS[endpoint]
+        return endpoint, random_payload(endpoint, rng)
+    return pick
+
+class Recorder:
+    """Outcome and latency of every request sent during the measured window"""
+
+    def __init__(self):
+        self.samples: List[Tuple[str, float, str]] = []  # (endpoint, seconds, status)
+
+    def record(self, endpoint: str, seconds: float, status: str):
+        self.samples.append((endpoint, seconds, status))
+
+async def send_request(client: httpx.AsyncClient, endpoint: str, body: Dict[str, Any],
+                       recorder: Optional[Recorder], started: Optional[float] = None):
+    """POST one prediction and record its status code, or the error type if it failed"""
+    if started is None:
+        started = time.perf_counter()
+    try:
+        response = await client.post(f"/predict/{endpoint}", json=body)
+        status = str(response.status_code)
+    except httpx.HTTPError as e:
+        status = type(e).__name__
+    if recorder is not None:
+        recorder.record(endpoint, time.perf_counter() - started, status)
+
+async def run_closed_loop(client: httpx.AsyncClient, pick, concurrency: int,
+                          duration: float, recorder: Optional[Recorder]):
+    """Keep `concurrency` requests outstanding for `duration` seconds"""
+    deadline = time.perf_counter() + duration
+
+    async def worker():
+        while time.perf_counter() < deadline:
+            endpoint, body = pick()
+            await send_request(client, endpoint, body, recorder)
+
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+
+async def run_open_loop(client: httpx.AsyncClient, pick, rps: float, duration: float,
+                        recorder: Optional[Recorder], max_in_flight: int):
+    """Start `rps` requests per second for `duration` seconds"""
+    slots = asyncio.Semaphore(max_in_flight)
+    start = time.perf_counter()
+    tasks = []
+
+    async def scheduled_request(endpoint, body, scheduled):
+        async with slots:
+            await send_request(client, endpoint, body, recorder, started=scheduled)
+
+    for i in range(int(rps * duration)):
+        scheduled = start + i / rps
+        delay = scheduled - time.perf_counter()
+        if delay > 0:
+            await asyncio.sleep(delay)
+        endpoint, body = pick()
+        tasks.append(asyncio.create_task(scheduled_request(endpoint, body, scheduled)))
+    await asyncio.gather(*tasks)
+
+def _latency_summary(seconds: List[float]) -> Dict[str, float]:
+    ms = np.asarray(seconds) * 1000.0
+    p50, p95, p99 = np.percentile(ms, [50, 95, 99])
+    return {
+        "mean": float(ms.mean()), "p50": float(p50), "p95": float(p95),
+        "p99": float(p99), "max": float(ms.max()),
+    }
+
+def _group_summary(samples: List[Tuple[str, float, str]], elapsed: float) -> Dict[str, Any]:
+    status_codes: Dict[str, int] = {}
+    for _, _, status in samples:
+        status_codes[status] = status_codes.get(status, 0) + 1
+    errors = sum(count for status, count in status_codes.items() if not status.startswith("2"))
+    return {
+        "requests": len(samples),
+        "errors": errors,
+        "error_rate": errors / len(samples) if samples else 0.0,
+        "throughput_rps": len(samples) / elapsed if elapsed > 0 else 0.0,
+        "status_codes": dict(sorted(status_codes.items())),
+        "latency_ms": _latency_summary([seconds for _, seconds, _ in samples]) if samples else {},
+    }
+
+def summarize(recorder: Recorder, elapsed: float) -> Dict[str, Any]:
+    """Throughput, error rate and latency percentiles overall and per endpoint"""
+    return {
+        "elapsed_seconds": elapsed,
+        "overall": _group_summary(recorder.samples, elapsed),
+        "endpoints": {
+            endpoint: _group_summary([s for s in recorder.samples if s[0] == endpoint], elapsed)
+            for endpoint in ENDPOINTS
+            if any(s[0] == endpoint for s in recorder.samples)
+        },
+    }
+
+async def run_load(client: httpx.AsyncClient, pick, concurrency: int, duration: float,
+                   rps: Optional[float] = None, warmup: float = 0.0) -> Dict[str, Any]:
+    """Warm up, then run the measured window and summarize it"""
+    if warmup > 0:
+        await run_closed_loop(client, pick, concurrency, warmup, None)
+
+    recorder = Recorder()
+    started = time.perf_counter()
+    if rps:
+        await run_open_loop(client, pick, rps, duration, recorder, concurrency)
+    else:
+        await run_closed_loop(client, pick, concurrency, duration, recorder)
+    return summarize(recorder, time.perf_counter() - started)
+
+def _free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+@asynccontextmanager
+async def spawned_server(timeout: float) -> AsyncIterator[str]:
+    """Start `python app.py` on a free local port and yield its base URL"""
+    port = _free_port()
+    base_url = f"http://127.0.0.1:{port}"
+    env = {**os.environ, "PORT": str(port), "HOST": "127.0.0.1", "MODEL_API_KEY": LOADGEN_API_KEY}
+    process = subprocess.Popen([sys.executable, "app.py"], cwd=SERVER_DIR, env=env,
+                               stdout=subprocess.DEVNULL)
+    try:
+        deadline = time.perf_counter() + timeout
+        async with httpx.AsyncClient(base_url=base_url) as probe:
+            while True:
+                if process.poll() is not None:
+                    raise RuntimeError(f"Server exited with code {process.returncode}")
+                if time.perf_counter() > deadline:
+                    raise RuntimeError(f"Server did not become healthy within {timeout:.0f} s")
+                try:
+                    if (await probe.get("/health")).status_code == 200:
+                        break
+                except httpx.HTTPError:
+                    pass
+                await asyncio.sleep(0.1)
+        yield base_url
+    finally:
+        process.terminate()
+        try:
+            process.wait(timeout=10)
+        except subprocess.TimeoutExpired:
+            process.kill()
+            process.wait()
+
+@asynccontextmanager
+async def in_process_app() -> AsyncIterator[Tuple[Any, str]]:
+    """Import the ASGI app and run its startup and shutdown around the load"""
+    from app import app
+    from config import settings
+    async with app.router.lifespan_context(app):
+        yield app, settings.API_KEY
+
+def _client(limit: int, timeout: float, api_key: str, **kwargs) -> httpx.AsyncClient:
+    return httpx.AsyncClient(
+        headers={"X-API-Key": api_key},
+        limits=httpx.Limits(max_connections=limit, max_keepalive_connections=limit),
+        timeout=timeout,
+        **kwargs
+    )
+
+async def benchmark(args) -> Dict[str, Any]:
+    """Run the load against the configured target"""
+    pick = request_picker(parse_mix(args.mix), args.payloads, args.seed)
+    load = dict(concurrency=args.concurrency, duration=args.duration, rps=args.rps, warmup=args.warmup)
+
+    if args.in_process:
+        async with in_process_app() as (app, api_key):
+            transport = httpx.ASGITransport(app=app)
+            async with _client(args.concurrency, args.timeout, api_key,
+                               transport=transport, base_url="http://loadgen") as client:
+                return await run_load(client, pick, **load)
+
+    if args.spawn:
+        async with spawned_server(args.startup_timeout) as base_url:
+            async with _client(args.concurrency, args.timeout, LOADGEN_API_KEY, base_url=base_url) as client:
+                return await run_load(client, pick, **load)
+
+    async with _client(args.concurrency, args.timeout, args.api_key, base_url=args.url) as client:
+        return await run_load(client, pick, **load)
+
+def _git_commit() -> Optional[str]:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=SERVER_DIR,
+            capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+def print_summary(summary: Dict[str, Any]):
+    print(f"\n{'endpoint':<12} {'requests':>9} {'rps':>9} {'errors':>7} "
+          f"{'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9}")
+    groups = [("overall", summary["overall"])] + list(summary["endpoints"].items())
+    for name, group in groups:
+        latency = group["latency_ms"] or {"p50": 0.0, "p95": 0.0, "p99": 0.0}
+        print(f"{name:<12} {group['requests']:>9} {group['throughput_rps']:>9.1f} "
+              f"{group['error_rate']:>6.1%} {latency['p50']:>9.2f} {latency['p95']:>9.2f} {latency['p99']:>9.2f}")
+
+def main():
+    parser = argparse.ArgumentParser(description="Load test the prediction API")
+    target = parser.add_mutually_exclusive_group()
+    target.add_argument("--url", default="http://localhost:8000", help="Base URL of a running server")
+    target.add_argument("--spawn", action="store_true", help="Start a local server for the run")
+    target.add_argument("--in-process", action="store_true", help="Call the ASGI app in this process")
+    parser.add_argument("--api-key", default=os.getenv("MODEL_API_KEY", "changeme"),
+                        help="API key sent to a running server")
+    parser.add_argument("--mix", default="diabetes=1,heart=1,parkinsons=1,common=1",
+                        help="Endpoint weights, e.g. diabetes=1,common=3")
+    parser.add_argument("--payloads", choices=("random", "fixed"), default="random",
+                        help="Random valid answers, or the same request per endpoint")
+    parser.add_argument("--concurrency", type=int, default=16,
+                        help="Concurrent requests (the in-flight limit when --rps is set)")
+    parser.add_argument("--rps", type=float, help="Open-loop request rate instead of closed-loop workers")
+    parser.add_argument("--duration", type=float, default=10.0, help="Measured seconds")
+    parser.add_argument("--warmup", type=float, default=2.0, help="Unmeasured seconds before the run")
+    parser.add_argument("--timeout", type=float, default=30.0, help="Seconds allowed per request")
+    parser.add_argument("--startup-timeout", type=float, default=120.0, help="Seconds allowed for --spawn")
+    parser.add_argument("--seed", type=int, default=0, help="Seed for the request mix and payloads")
+    parser.add_argument("--output", default="loadgen.json", help="JSON results file")
+    args = parser.parse_args()
+
+    summary = asyncio.run(benchmark(args))
+    report = {
+        "generated_at": datetime.now(timezone.utc).isoformat(),
+        "commit": _git_commit(),
+        "python": sys.version.split()[0],
+        "target": "in-process" if args.in_process else "spawn" if args.spawn else args.url,
+        "load": {
+            "mode": "open" if args.rps else "closed",
+            "concurrency": args.concurrency, "rps": args.rps, "duration": args.duration,
+            "warmup": args.warmup, "mix": parse_mix(args.mix), "payloads": args.payloads,
+        },
+        "summary": summary,
+    }
+    with open(args.output, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2)
+
+    print_summary(summary)
+    print(f"\nResults written to {args.output}")
+    return summary["overall"]["requests"] > 0
+
+if __name__ == "__main__":
+    success = main()
+    sys.exit(0 if success else 1)
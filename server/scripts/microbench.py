@@ -0,0 +1,265 @@
+#!/usr/bin/env python3
+"""
+Microbenchmarks for the input mappers and model inference
+
+Times every hot function in isolation at batch sizes 1, 32 and 1024:
+  - map_diabetes_batch, map_heart_batch, map_parkinsons_batch and
+    map_common_symptoms_batch
+  - the single-record map_diabetes_input, map_heart_input,
+    map_parkinsons_input and map_common_symptoms that every live request
+    goes through, at batch size 1 only
+  - adapter.infer of every model that loads, on features from those mappers
+  - the logistic regression scored densely (predict_proba) and sparsely, both
+    on the loaded model and on a synthetic one of the served model's shape
+
+Results are compared with a baseline file kept in the repository; the run
+fails when any benchmark's fastest round is slower than the baseline's median
+round by more than --threshold. Scheduler and cache noise only ever adds
+time, so a real slowdown shows up in every round while a noisy run still has
+some rounds near the baseline.
+Benchmarks over the threshold are timed again (--retries) before they count
+as regressions, so a single noisy stretch does not fail the run.
+Models whose artifacts are not available are skipped, as are baseline entries
+recorded with a different inference backend. Refresh the baseline on the
+benchmark machine after an intended change:
+
+  python server/scripts/microbench.py --update-baseline
+
+Usage:
+  python server/scripts/microbench.py [--threshold 0.25] [--filter map_] [--output microbench.json]
+"""
+
+import argparse
+import json
+import os
+import statistics
+import sys
+import time
+from datetime import datetime, timezone
+from typing import Any, Callable, Dict, List, Sequence, Tuple
+
+import numpy as np
+
+# Add the parent directory to the path so we can import from the server
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sklearn.linear_model import LogisticRegression
+
+from models.adapters import PROBA, SPARSE, ModelAdapter
+from models.loader import SERVABLE_MODELS, model_loader
+from models.mappers import (
+    CommonInput, DiabetesInput, HeartInput, ParkinsonsInput, SymptomIndex,
+    DIABETES_FIELD_MAPS, HEART_FIELD_MAPS, PARKINSONS_FIELD_MAPS, SYMPTOM_ALIASES,
+    map_common_symptoms, map_common_symptoms_batch, map_diabetes_batch, map_diabetes_input,
+    map_heart_batch, map_heart_input, map_parkinsons_batch, map_parkinsons_input
+)
+
+# Single-record mapper of each batch mapper
+SINGLE_RECORD_MAPPERS = {
+    map_diabetes_batch: map_diabetes_input,
+    map_heart_batch: map_heart_input,
+    map_parkinsons_batch: map_parkinsons_input,
+    map_common_symptoms_batch: map_common_symptoms,
+}
+
+BATCH_SIZES = (1, 32, 1024)
+BASELINE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "microbench_baseline.json")
+
+# Width of the symptom vector used when the symptom_columns artifact is unavailable
+DEFAULT_SYMPTOM_COLUMNS = 377
+
+# Diseases predicted by the served common-disease models
+SYNTHETIC_LOGISTIC_CLASSES = 773
+
+def time_call(fn: Callable[[], Any], min_time: float, repeats: int) -> Dict[str, float]:
+    """Median and minimum microseconds per call over `repeats` rounds of at least `min_time` seconds"""
+    fn()
+    number = 1
+    while True:
+        started = time.perf_counter()
+        for _ in range(number):
+            fn()
+        elapsed = time.perf_counter() - started
+        if elapsed >= min_time:
+            break
+        number *= 2 if elapsed <= 0 else max(2, min(10, int(min_time / elapsed) + 1))
+
+    rounds = [elapsed / number]
+    for _ in range(repeats - 1):
+        started = time.perf_counter()
+        for _ in range(number):
+            fn()
+        rounds.append((time.perf_counter() - started) / number)
+    return {
+        "median_us": statistics.median(rounds) * 1e6,
+        "min_us": min(rounds) * 1e6,
+        "calls_per_round": number,
+    }
+
+def _random_records(fields: Dict[str, Dict[str, Any]], input_cls, n: int, rng, **extra) -> list:
+    records = []
+    for _ in range(n):
+        answers = {field: str(rng.choice(list(levels))) for field, levels in fields.items()}
+        records.append(input_cls(**answers, **{name: value(rng) for name, value in extra.items()}))
+    return records
+
+def _random_common_records(n: int, rng) -> List[CommonInput]:
+    aliases = sorted(SYMPTOM_ALIASES)
+    return [
+        CommonInput(symptoms=list(rng.choice(aliases, size=rng.integers(1, 7), replace=False)),
+                    duration="3-7 days", severity="moderate", age="30_50", medicalHistory="none")
+        for _ in range(n)
+    ]
+
+def _symptom_index() -> SymptomIndex:
+    """The served symptom index, or a same-width stand-in containing every alias target"""
+    index = model_loader.get_symptom_index()
+    if index is not None:
+        return index
+    targets = sorted(set(SYMPTOM_ALIASES.values()))
+    return SymptomIndex(targets + [f"symptom_{i}" for i in range(DEFAULT_SYMPTOM_COLUMNS - len(targets))])
+
+def _synthetic_logistic(n_features: int, rng) -> LogisticRegression:
+    """Multinomial LogisticRegression with random coefficients, without fitting"""
+    model = LogisticRegression()
+    model.coef_ = rng.normal(size=(SYNTHETIC_LOGISTIC_CLASSES, n_features))
+    model.intercept_ = rng.normal(size=SYNTHETIC_LOGISTIC_CLASSES)
+    model.classes_ = np.arange(SYNTHETIC_LOGISTIC_CLASSES)
+    model.n_features_in_ = n_features
+    return model
+
+def _logistic_cases(name: str, model: Any, rows: np.ndarray, n: int) -> list:
+    """Dense and sparse scoring of one logistic regression"""
+    cases = []
+    for method, label in ((PROBA, "dense"), (SPARSE, "sparse")):
+        adapter = ModelAdapter(name, model, method)
+        cases.append((f"{name}_{label}[{n}]", lambda adapter=adapter: adapter.infer(rows),
+                      {"batch_size": n, "backend": adapter.backend}))
+    return cases
+
+def benchmark_cases(batch_sizes: Sequence[int], seed: int) -> List[Tuple[str, Callable[[], Any], Dict[str, Any]]]:
+    """(name, zero-argument callable, metadata) for every benchmark"""
+    rng = np.random.default_rng(seed)
+    symptom_index = _symptom_index()
+    synthetic_logistic = _synthetic_logistic(len(symptom_index), rng)
+    cases = []
+    for n in batch_sizes:
+        diabetes = _random_records(DIABETES_FIELD_MAPS, DiabetesInput, n, rng)
+        heart = _random_records(HEART_FIELD_MAPS, HeartInput, n, rng)
+        parkinsons = _random_records(PARKINSONS_FIELD_MAPS, ParkinsonsInput, n, rng,
+                                     age=lambda r: float(r.integers(30, 90)))
+        common = _random_common_records(n, rng)
+
+        mapped = {
+            "diabetes": (map_diabetes_batch, (diabetes,)),
+            "heart": (map_heart_batch, (heart,)),
+            "parkinsons": (map_parkinsons_batch, (parkinsons,)),
+            "common": (map_common_symptoms_batch, (common, symptom_index)),
+        }
+        features = {}
+        for name, (mapper, args) in mapped.items():
+            cases.append((f"{mapper.__name__}[{n}]", lambda mapper=mapper, args=args: mapper(*args),
+                          {"batch_size": n}))
+            features[name] = mapper(*args)
+            if n == 1:
+                single = SINGLE_RECORD_MAPPERS[mapper]
+                record_args = (args[0][0],) + args[1:]
+                cases.append((f"{single.__name__}[1]",
+                              lambda single=single, record_args=record_args: single(*record_args),
+                              {"batch_size": 1}))
+
+        for model in SERVABLE_MODELS:
+            adapter = model_loader.get_adapter(model)
+            if adapter is None:
+                continue
+            rows = features["common" if model in ("logistic", "neural") else model]
+            cases.append((f"predict_{model}[{n}]", lambda adapter=adapter, rows=rows: adapter.infer(rows),
+                          {"batch_size": n, "backend": adapter.backend}))
+            if model == "logistic" and adapter.method == SPARSE:
+                cases.extend(_logistic_cases("logistic", adapter.model, rows, n))
+
+        cases.extend(_logistic_cases("synthetic_logistic", synthetic_logistic, features["common"], n))
+    return cases
+
+def compare(results: Dict[str, Dict[str, Any]], baseline: Dict[str, Dict[str, Any]],
+            threshold: float) -> Dict[str, List[str]]:
+    """Sort benchmarks into regressions, passes and those without a comparable baseline"""
+    report = {"regressions": [], "passed": [], "not_compared": []}
+    for name, result in results.items():
+        reference = baseline.get(name)
+        if reference is None or reference.get("backend") != result.get("backend"):
+            report["not_compared"].append(name)
+            continue
+        change = result["min_us"] / reference["median_us"] - 1.0
+        result["change"] = change
+        report["regressions" if change > threshold else "passed"].append(name)
+    return report
+
+def _load_baseline(path: str) -> Dict[str, Dict[str, Any]]:
+    if not os.path.exists(path):
+        return {}
+    with open(path, encoding="utf-8") as f:
+        return json.load(f)["benchmarks"]
+
+def main():
+    parser = argparse.ArgumentParser(description="Microbenchmark the mappers and model inference")
+    parser.add_argument("--baseline", default=BASELINE_PATH, help="Baseline results file")
+    parser.add_argument("--update-baseline", action="store_true", help="Write this run as the new baseline")
+    parser.add_argument("--threshold", type=float, default=float(os.getenv("MICROBENCH_THRESHOLD", "0.25")),
+                        help="Allowed slowdown as a fraction of the baseline (default: 0.25)")
+    parser.add_argument("--filter", default="", help="Only run benchmarks whose name contains this text")
+    parser.add_argument("--min-time", type=float, default=0.05, help="Minimum seconds per timing round")
+    parser.add_argument("--repeats", type=int, default=7, help="Timing rounds per benchmark")
+    parser.add_argument("--retries", type=int, default=2, help="Re-timings of a benchmark over the threshold")
+    parser.add_argument("--seed", type=int, default=0, help="Seed for the generated inputs")
+    parser.add_argument("--output", help="Also write this run's results to a JSON file")
+    args = parser.parse_args()
+
+    model_loader.load_all_models()
+    results, functions = {}, {}
+    for name, fn, metadata in benchmark_cases(BATCH_SIZES, args.seed):
+        if args.filter not in name:
+            continue
+        functions[name] = fn
+        results[name] = {**metadata, **time_call(fn, args.min_time, args.repeats)}
+        per_row = results[name]["median_us"] / metadata["batch_size"]
+        print(f"  {name:<36} {results[name]['median_us']:>12.1f} us  ({per_row:.2f} us/row)")
+
+    run = {
+        "generated_at": datetime.now(timezone.utc).isoformat(),
+        "python": sys.version.split()[0],
+        "numpy": np.__version__,
+        "benchmarks": results,
+    }
+    if args.update_baseline:
+        with open(args.baseline, "w", encoding="utf-8") as f:
+            json.dump(run, f, indent=2)
+            f.write("\n")
+        print(f"\nBaseline written to {args.baseline}")
+        return True
+
+    baseline = _load_baseline(args.baseline)
+    report = compare(results, baseline, args.threshold)
+    for _ in range(args.retries):
+        if not report["regressions"]:
+            break
+        for name in report["regressions"]:
+            retry = time_call(functions[name], args.min_time, args.repeats)
+            if retry["min_us"] < results[name]["min_us"]:
+                results[name].update(retry)
+        report = compare(results, baseline, args.threshold)
+    run["comparison"] = {"threshold": args.threshold, **report}
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(run, f, indent=2)
+
+    print(f"\n{len(report['passed'])} within {args.threshold:.0%} of the baseline, "
+          f"{len(report['not_compared'])} without a comparable baseline")
+    for name in report["regressions"]:
+        print(f"  REGRESSION {name}: {results[name]['change']:+.0%} "
+              f"({results[name]['min_us']:.1f} us vs baseline)")
+    return not report["regressions"]
+
+if __name__ == "__main__":
+    success = main()
+    sys.exit(0 if success else 1)
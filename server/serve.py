@@ -0,0 +1,212 @@
+"""
+Multi-worker launcher for the health prediction API
+
+`python app.py` runs one uvicorn process, which loads every model itself, so
+N processes hold N copies of the models. This launcher loads the models once
+in a parent process and then forks `settings.WORKERS` uvicorn workers that
+accept connections on one shared listening socket. The workers inherit the
+loaded models as copy-on-write pages: model weights are never written after
+loading, so those pages stay shared and each worker only pays for what it
+allocates while serving.
+
+The Keras neural network is the exception: TensorFlow's thread pools do not
+survive a fork, so it is loaded in each worker after the fork. The extracted
+NumPy network (see scripts/export_numpy_nn.py) is shared like every other model.
+
+Usage:
+  python serve.py [--workers 4] [--host 0.0.0.0] [--port 8000]
+  python serve.py --memory-report --pid <launcher pid>
+"""
+import argparse
+import gc
+import json
+import logging
+import os
+import signal
+import socket
+import sys
+import time
+from typing import Dict, List, Optional
+
+from config import settings
+from models.loader import ARTIFACTS, model_loader
+
+logger = logging.getLogger("serve")
+
+# Fields of /proc/<pid>/smaps_rollup summed into the memory report, in kB
+SHARED_FIELDS = ("Shared_Clean", "Shared_Dirty")
+PRIVATE_FIELDS = ("Private_Clean", "Private_Dirty")
+
+def preload() -> List[str]:
+    """Load every eager artifact that can be shared with forked workers
+
+    Returns the eager artifacts left for each worker to load after the fork.
+    """
+    deferred = []
+    for name in ARTIFACTS:
+        if model_loader.load_mode(name) != "eager":
+            continue
+        if not model_loader.is_fork_safe(name):
+            deferred.append(name)
+            continue
+        if not model_loader.load_model(name):
+            raise RuntimeError(f"Failed to load {name}: {model_loader.errors.get(name)}")
+    return deferred
+
+def bind_socket(host: str, port: int) -> socket.socket:
+    """Open the listening socket shared by every worker"""
+    family = socket.AF_INET6 if ":" in host else socket.AF_INET
+    sock = socket.socket(family, socket.SOCK_STREAM)
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+    sock.bind((host, port))
+    sock.listen(2048)
+    sock.set_inheritable(True)
+    return sock
+
+def run_worker(sock: socket.socket) -> None:
+    """Serve the app on the shared socket; runs in a forked child"""
+    import uvicorn
+    from app import app
+
+    config = uvicorn.Config(app, log_level="info" if settings.DEBUG else "warning")
+    uvicorn.Server(config).run(sockets=[sock])
+
+def spawn_worker(sock: socket.socket) -> int:
+    """Fork one worker process and return its pid"""
+    pid = os.fork()
+    if pid == 0:
+        signal.signal(signal.SIGTERM, signal.SIG_DFL)
+        signal.signal(signal.SIGINT, signal.SIG_DFL)
+        code = 0
+        try:
+            run_worker(sock)
+        except BaseException:
+            logger.exception("Worker failed")
+            code = 1
+        finally:
+            os._exit(code)
+    return pid
+
+def serve(workers: int, host: str, port: int) -> None:
+    """Preload the models, fork the workers and restart any that exit unexpectedly"""
+    if not hasattr(os, "fork"):
+        raise RuntimeError("The multi-worker launcher needs os.fork; run app.py on this platform")
+
+    started = time.perf_counter()
+    # Import the app and its dependencies once, so the workers share them too
+    import app  # noqa: F401
+    deferred = preload()
+    if deferred:
+        logger.warning(f"Loading in every worker (not fork-safe): {', '.join(deferred)}")
+    logger.info(f"Preloaded models in {time.perf_counter() - started:.1f} s")
+
+    # Move everything allocated so far out of the collector's reach, so that
+    # collections in the workers never write to the shared pages
+    gc.collect()
+    gc.freeze()
+
+    sock = bind_socket(host, port)
+    children: Dict[int, int] = {}
+    stopping = False
+
+    def stop(signum, frame):
+        nonlocal stopping
+        stopping = True
+        for pid in children:
+            try:
+                os.kill(pid, signal.SIGTERM)
+            except ProcessLookupError:
+                pass
+
+    signal.signal(signal.SIGTERM, stop)
+    signal.signal(signal.SIGINT, stop)
+
+    for slot in range(workers):
+        children[spawn_worker(sock)] = slot
+    logger.info(f"Serving on {host}:{port} with {workers} workers (launcher pid {os.getpid()})")
+
+    while children:
+        try:
+            pid, status = os.wait()
+        except ChildProcessError:
+            break
+        slot = children.pop(pid, None)
+        if slot is None or stopping:
+            continue
+        logger.warning(f"Worker {pid} exited with status {status}, restarting")
+        children[spawn_worker(sock)] = slot
+    sock.close()
+
+def process_memory(pid: int) -> Dict[str, float]:
+    """RSS of one process split into pages shared with other processes and unique to it, in MB"""
+    fields = {}
+    with open(f"/proc/{pid}/smaps_rollup", encoding="utf-8") as f:
+        for line in f:
+            parts = line.split()
+            if len(parts) == 3 and parts[2] == "kB":
+                fields[parts[0].rstrip(":")] = int(parts[1])
+    return {
+        "rss_mb": fields.get("Rss", 0) / 1024.0,
+        "pss_mb": fields.get("Pss", 0) / 1024.0,
+        "shared_mb": sum(fields.get(name, 0) for name in SHARED_FIELDS) / 1024.0,
+        "unique_mb": sum(fields.get(name, 0) for name in PRIVATE_FIELDS) / 1024.0,
+    }
+
+def child_pids(pid: int) -> List[int]:
+    """Direct children of a process"""
+    with open(f"/proc/{pid}/task/{pid}/children", encoding="utf-8") as f:
+        return [int(child) for child in f.read().split()]
+
+def memory_report(launcher_pid: int) -> Dict[str, object]:
+    """Per-worker unique and shared memory of a running launcher
+
+    `unique_mb` is what stopping that worker would free, so adding a worker
+    costs about the mean unique size. `total_pss_mb` is the footprint of the
+    launcher and all workers, with shared pages counted once.
+    """
+    launcher = process_memory(launcher_pid)
+    workers = {pid: process_memory(pid) for pid in child_pids(launcher_pid)}
+    unique = [usage["unique_mb"] for usage in workers.values()]
+    return {
+        "launcher": launcher,
+        "workers": workers,
+        "mean_worker_unique_mb": sum(unique) / len(unique) if unique else 0.0,
+        "total_pss_mb": launcher["pss_mb"] + sum(usage["pss_mb"] for usage in workers.values()),
+    }
+
+def print_memory_report(report: Dict[str, object]) -> None:
+    """Print a memory report as a table"""
+    print(f"{'process':<16} {'rss MB':>10} {'shared MB':>10} {'unique MB':>10} {'pss MB':>10}")
+    rows = [("launcher", report["launcher"])]
+    rows += [(f"worker {pid}", usage) for pid, usage in report["workers"].items()]
+    for name, usage in rows:
+        print(f"{name:<16} {usage['rss_mb']:>10.1f} {usage['shared_mb']:>10.1f} "
+              f"{usage['unique_mb']:>10.1f} {usage['pss_mb']:>10.1f}")
+    print(f"\nMean unique memory per worker: {report['mean_worker_unique_mb']:.1f} MB")
+    print(f"Total footprint (PSS): {report['total_pss_mb']:.1f} MB")
+
+def main(argv: Optional[List[str]] = None):
+    parser = argparse.ArgumentParser(description="Run the API with preloaded models shared by forked workers")
+    parser.add_argument("--workers", type=int, default=settings.WORKERS, help="Worker processes")
+    parser.add_argument("--host", default=settings.HOST, help="Listen address")
+    parser.add_argument("--port", type=int, default=settings.PORT, help="Listen port")
+    parser.add_argument("--memory-report", action="store_true", help="Report the memory of a running launcher")
+    parser.add_argument("--pid", type=int, help="Launcher pid for --memory-report")
+    parser.add_argument("--json", action="store_true", help="Print the memory report as JSON")
+    args = parser.parse_args(argv)
+
+    if args.memory_report:
+        if args.pid is None:
+            parser.error("--memory-report needs the launcher's --pid")
+        report = memory_report(args.pid)
+        if args.json:
+            print(json.dumps(report, indent=2))
+        else:
+            print_memory_report(report)
+        return
+
+    logging.basicConfig(level=logging.INFO)
+    serve(max(1, args.workers), args.host, args.port)
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
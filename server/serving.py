@@ -0,0 +1,254 @@
+"""
+Model generations and zero-downtime reloads
+
+A generation is one ModelLoader together with the predict functions,
+micro-batchers, answer tables and common-disease cache built on its models.
+Every request holds the generation that was current when it started, so
+replacing the current generation never changes the models under a request
+that is already running.
+
+A reload builds the next generation in the background: a fresh ModelLoader
+loads the artifacts from disk, the answer tables are built and every model is
+warmed up with a few inferences. Only then does the new generation replace the
+current one, in a single assignment. The previous generation keeps serving its
+in-flight requests and is closed once they have finished.
+"""
+import asyncio
+import logging
+import os
+import time
+from pathlib import Path
+from typing import Any, Callable, Dict, Optional, Tuple
+
+import numpy as np
+
+from admission import AdmissionController
+from config import settings
+from metrics import MODEL_LATENCY
+from models.answer_tables import AnswerTable, build_answer_tables
+from models.batching import MicroBatcher
+from models.cache import LRUCache
+from models.executor import InferenceExecutor
+from models.loader import SERVABLE_MODELS, ModelLoader
+
+logger = logging.getLogger(__name__)
+
+# Common disease models, which also rank their most probable classes for top_k
+RANKED_MODELS = ("logistic", "neural")
+
+
+def _adapter_predict_fn(loader: ModelLoader, model_name: str):
+    """Build a batch predict function for a model's load-time adapter"""
+    model_latency = MODEL_LATENCY.labels(model_name)
+    ranked = model_name in RANKED_MODELS
+    def predict(features: np.ndarray):
+        adapter = loader.get_adapter(model_name)
+        with model_latency.time():
+            if ranked:
+                return adapter.infer_ranked(features, settings.MAX_TOP_K)
+            return adapter.infer(features)
+    return predict
+
+
+def _input_width(model: Any) -> int:
+    """Number of input features of a loaded model"""
+    if hasattr(model, "n_features_in_"):
+        return int(model.n_features_in_)
+    return int(model.input_shape[-1])
+
+
+class ModelGeneration:
+    """One set of loaded models and the serving state built on them"""
+
+    def __init__(self, number: int, loader: ModelLoader, executor: InferenceExecutor,
+                 admission: Optional[Dict[str, AdmissionController]] = None):
+        self.number = number
+        self.loader = loader
+        self.executor = executor
+        # Admission controllers are shared by every generation, so limits hold across a reload
+        self.admission = admission or {}
+        # Vectorized predict functions and micro-batchers, one per servable model
+        self.predict_fns = {name: _adapter_predict_fn(loader, name) for name in SERVABLE_MODELS}
+        self.batchers: Dict[str, MicroBatcher] = {
+            name: MicroBatcher(
+                name,
+                predict_fn,
+                max_batch_size=settings.BATCH_MAX_SIZE,
+                max_wait_ms=settings.BATCH_MAX_WAIT_MS,
+                runner=executor.runner(name),
+                admission=self.admission.get(name)
+            )
+            for name, predict_fn in self.predict_fns.items()
+        }
+        self.answer_tables: Dict[str, AnswerTable] = {}
+        # Cached /predict/common results, keyed on the recognized symptom columns
+        self.common_cache: Optional[LRUCache] = (
+            LRUCache(settings.COMMON_CACHE_SIZE, settings.COMMON_CACHE_TTL_SECONDS)
+            if settings.COMMON_CACHE_SIZE > 0 else None
+        )
+        self.in_flight = 0
+        self.warm_up_ms: Dict[str, float] = {}
+
+    def prepare(self, warm_up: bool = True) -> None:
+        """Load the eager models, build the answer tables and warm every loaded model up"""
+        if not self.loader.load_all_models():
+            raise RuntimeError(f"Model loading failed: {self.loader.errors}")
+        if settings.ANSWER_TABLES_ENABLED:
+            # Lazily loaded models are served by live inference, so they stay unloaded until used
+            self.answer_tables.update(build_answer_tables({
+                name: predict_fn for name, predict_fn in self.predict_fns.items()
+                if self.loader.is_model_loaded(name)
+            }))
+        if warm_up:
+            self.warm_up()
+
+    def warm_up(self) -> None:
+        """Score zero rows at the single-request and full-batch sizes through every loaded model"""
+        for name, predict_fn in self.predict_fns.items():
+            if not self.loader.is_model_loaded(name):
+                continue
+            width = _input_width(self.loader.get_model(name))
+            started = time.perf_counter()
+            for batch_size in sorted({1, settings.BATCH_MAX_SIZE}):
+                predict_fn(np.zeros((batch_size, width)))
+            self.warm_up_ms[name] = (time.perf_counter() - started) * 1000.0
+
+    async def drain(self, timeout: float) -> bool:
+        """Wait until no request holds this generation; False if `timeout` expired first"""
+        deadline = time.monotonic() + timeout
+        while self.in_flight > 0:
+            if time.monotonic() >= deadline:
+                return False
+            await asyncio.sleep(0.05)
+        return True
+
+    async def close(self) -> None:
+        """Stop the batchers and drop the answer tables and cached results"""
+        for batcher in self.batchers.values():
+            await batcher.close()
+        self.answer_tables.clear()
+        if self.common_cache is not None:
+            self.common_cache.clear()
+
+
+class ReloadInProgress(RuntimeError):
+    """Raised when a reload is requested while another is running"""
+
+
+class ModelServer:
+    """Holds the current model generation and replaces it on reload"""
+
+    def __init__(self, loader_factory: Callable[[], ModelLoader] = ModelLoader):
+        self.loader_factory = loader_factory
+        self.current: Optional[ModelGeneration] = None
+        self.admission = {
+            name: AdmissionController(name, settings.MAX_QUEUE_DEPTHS[name], settings.MAX_QUEUE_WAITS_MS[name])
+            for name in SERVABLE_MODELS
+        }
+        self.reloads = 0
+        self.last_reload: Optional[Dict[str, Any]] = None
+        self._reloading = False
+
+    def start(self, loader: ModelLoader, executor: InferenceExecutor) -> ModelGeneration:
+        """Serve the first generation from an existing loader, e.g. the preloaded one"""
+        generation = ModelGeneration(1, loader, executor, self.admission)
+        generation.prepare(warm_up=False)
+        self.current = generation
+        return generation
+
+    async def reload(self) -> Dict[str, Any]:
+        """Load, warm up and switch to a new generation; the current one serves until then"""
+        if self._reloading:
+            raise ReloadInProgress("A model reload is already in progress")
+        self._reloading = True
+        try:
+            previous = self.current
+            loader = self.loader_factory()
+            loader.project_root = previous.loader.project_root
+            generation = ModelGeneration(previous.number + 1, loader, previous.executor, self.admission)
+            started = time.perf_counter()
+            try:
+                # Off the event loop and off the inference pools, which keep serving
+                await asyncio.to_thread(generation.prepare)
+            except Exception:
+                await generation.close()
+                raise
+            prepare_seconds = time.perf_counter() - started
+
+            self.current = generation
+            self.reloads += 1
+            logger.info(f"Serving model generation {generation.number} "
+                        f"(prepared in {prepare_seconds:.2f} s)")
+
+            drained = await previous.drain(settings.RELOAD_DRAIN_SECONDS)
+            if not drained:
+                logger.warning(f"Closing model generation {previous.number} with "
+                               f"{previous.in_flight} requests still in flight")
+            await previous.close()
+            self.last_reload = {
+                "generation": generation.number,
+                "completed_at": time.time(),
+                "prepare_seconds": prepare_seconds,
+                "model_load_seconds": dict(loader.load_seconds),
+                "warm_up_ms": dict(generation.warm_up_ms),
+                "previous_drained": drained,
+            }
+            return self.last_reload
+        finally:
+            self._reloading = False
+
+    async def stop(self) -> None:
+        """Close the current generation"""
+        if self.current is not None:
+            await self.current.close()
+
+
+def _watched_directories(loader: ModelLoader) -> set:
+    """Directories holding the artifacts the server loads"""
+    paths = [
+        settings.DIABETES_MODEL_PATH, settings.HEART_MODEL_PATH, settings.PARKINSONS_MODEL_PATH,
+        settings.LOGISTIC_MODEL_PATH, settings.NEURAL_MODEL_PATH, settings.NEURAL_NUMPY_PATH,
+        settings.ENCODER_PATH, settings.SYMPTOM_COLUMNS_PATH,
+    ]
+    directories = {(loader.project_root / path).parent for path in paths}
+    directories.add(loader.project_root / settings.MMAP_MODELS_DIR)
+    if settings.INFERENCE_BACKEND == "onnx":
+        directories.add(loader.project_root / settings.ONNX_MODELS_DIR)
+    return directories
+
+
+def snapshot_artifacts(directories) -> Dict[str, Tuple[int, int]]:
+    """(size, mtime) of every file in the model directories"""
+    snapshot = {}
+    for directory in directories:
+        if not Path(directory).is_dir():
+            continue
+        for entry in os.scandir(directory):
+            if entry.is_file():
+                stat = entry.stat()
+                snapshot[entry.path] = (stat.st_size, stat.st_mtime_ns)
+    return snapshot
+
+
+async def watch_artifacts(server: ModelServer, interval: float) -> None:
+    """Reload when the model files change, once they have stopped changing for one interval"""
+    directories = _watched_directories(server.current.loader)
+    loaded = snapshot_artifacts(directories)
+    previous = loaded
+    logger.info(f"Watching {len(directories)} model directories every {interval:g} s")
+    while True:
+        await asyncio.sleep(interval)
+        current = await asyncio.to_thread(snapshot_artifacts, directories)
+        # A file still being copied changes between polls; wait until it settles
+        if current == loaded or current != previous:
+            previous = current
+            continue
+        changed = sorted(path for path in set(current) | set(loaded) if current.get(path) != loaded.get(path))
+        logger.info(f"Model files changed, reloading: {', '.join(changed)}")
+        try:
+            await server.reload()
+        except ReloadInProgress:
+            continue
+        except Exception as e:
+            logger.error(f"Model reload failed, still serving generation {server.current.number}: {e}")
+        loaded = previous = current
@@ -0,0 +1,100 @@
+#!/usr/bin/env python3
+"""
+Test script for the load-time model adapters
+"""
+
+import sys
+import os
+
+import numpy as np
+from sklearn import svm
+from sklearn.linear_model import LogisticRegression
+
+# Add the parent directory to the path so we can import from the server
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from models.adapters import DECISION, PROBA, build_adapter, rank_classes
+
+rng = np.random.default_rng(0)
+X = rng.normal(size=(200, 5))
+y = (X[:, 0] + X[:, 1] > 0).astype(int)
+
+class CallCounter:
+    """Wrap a model and count calls to its inference methods"""
+
+    def __init__(self, model):
+        self._model = model
+        self.calls = 0
+
+    def __getattr__(self, name):
+        attribute = getattr(self._model, name)
+        if name in ("predict", "predict_proba", "decision_function"):
+            def counted(*args, **kwargs):
+                self.calls += 1
+                return attribute(*args, **kwargs)
+            return counted
+        return attribute
+
+def test_linear_svc_uses_decision_function():
+    """SVCs without probability estimates resolve to one decision_function call"""
+    model = svm.SVC(kernel="linear").fit(X, y)
+    adapter = build_adapter("svc", model)
+    assert adapter.method == DECISION
+
+    labels, confidences = adapter.infer(X)
+    np.testing.assert_array_equal(labels, model.predict(X))
+    assert np.all((confidences >= 0.6) & (confidences <= 0.95))
+
+def test_logistic_regression_uses_predict_proba():
+    """Probabilistic classifiers resolve to one predict_proba call"""
+    model = LogisticRegression().fit(X, y)
+    adapter = build_adapter("logistic", model, sparse=False)
+    assert adapter.method == PROBA
+
+    labels, confidences = adapter.infer(X)
+    np.testing.assert_array_equal(labels, model.predict(X))
+    np.testing.assert_allclose(confidences, model.predict_proba(X).max(axis=1))
+
+def test_infer_runs_the_model_once():
+    """Each infer call invokes the underlying model exactly once"""
+    counter = CallCounter(svm.SVC(kernel="linear").fit(X, y))
+    adapter = build_adapter("svc", counter)
+    counter.calls = 0
+
+    adapter.infer(X[:10])
+    assert counter.calls == 1
+
+def test_rank_classes_orders_the_top_k():
+    """Top-k classes come back best first, labelled, with the argmax as the prediction"""
+    proba = rng.dirichlet(np.ones(30), size=20)
+    column_labels = np.arange(30) * 10
+    labels, confidences, top_labels, top_proba = rank_classes(column_labels, proba, 5)
+
+    expected = np.argsort(-proba, axis=1)[:, :5]
+    np.testing.assert_array_equal(top_labels, column_labels[expected])
+    np.testing.assert_array_equal(top_proba, np.take_along_axis(proba, expected, axis=1))
+    np.testing.assert_array_equal(labels, column_labels[proba.argmax(axis=1)])
+    np.testing.assert_array_equal(confidences, proba.max(axis=1))
+
+    # k is capped at the number of classes
+    assert rank_classes(column_labels, proba, 100)[2].shape == (20, 30)
+
+def test_infer_ranked_matches_infer():
+    """Ranked inference predicts what infer predicts"""
+    classes = np.digitize(X[:, 0], [-1.0, 0.0, 1.0])
+    model = LogisticRegression(max_iter=500).fit(X, classes)
+    adapter = build_adapter("logistic", model)
+    labels, confidences, top_labels, top_proba = adapter.infer_ranked(X, 3)
+    expected_labels, expected_confidences = adapter.infer(X)
+    np.testing.assert_array_equal(labels, expected_labels)
+    np.testing.assert_array_equal(confidences, expected_confidences)
+    np.testing.assert_array_equal(top_labels[:, 0], labels)
+    assert top_labels.shape == (len(X), 3)
+
+if __name__ == "__main__":
+    test_linear_svc_uses_decision_function()
+    test_logistic_regression_uses_predict_proba()
+    test_infer_runs_the_model_once()
+    test_rank_classes_orders_the_top_k()
+    test_infer_ranked_matches_infer()
+    print("SUCCESS: Adapter tests passed")
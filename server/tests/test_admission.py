@@ -0,0 +1,73 @@
+#!/usr/bin/env python3
+"""
+Test script for per-model admission control
+"""
+
+import sys
+import os
+import asyncio
+import time
+
+import numpy as np
+
+# Add the parent directory to the path so we can import from the server
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from admission import QUEUE_FULL, QUEUE_WAIT, AdmissionController, Overloaded
+from models.batching import MicroBatcher
+
+def test_full_queue_rejects_at_once():
+    """Requests beyond max_depth fail immediately and the place is freed on exit"""
+    admission = AdmissionController("test", max_depth=2, max_wait_ms=1500)
+    with admission.admit(), admission.admit():
+        try:
+            with admission.admit():
+                assert False, "a third request should be rejected"
+        except Overloaded as e:
+            assert e.retry_after == 2
+    assert admission.depth == 0
+    with admission.admit():
+        assert admission.depth == 1
+    assert admission.snapshot()["shed"] == {QUEUE_FULL: 1, QUEUE_WAIT: 0}
+
+def test_stale_pool_tasks_are_shed():
+    """A pool task that starts after max_wait raises instead of running"""
+    admission = AdmissionController("test", max_depth=0, max_wait_ms=10)
+    guarded = admission.guard(lambda x: x * 2)
+    assert guarded(2) == 4
+    stale = admission.guard(lambda x: x * 2)
+    time.sleep(0.02)
+    try:
+        stale(2)
+        assert False, "the stale task should be shed"
+    except Overloaded:
+        pass
+    assert admission.shed[QUEUE_WAIT] == 1
+
+def test_batcher_sheds_requests_queued_too_long():
+    """Requests stuck behind a slow batch are failed when their turn comes"""
+    admission = AdmissionController("slow", max_depth=0, max_wait_ms=50)
+
+    def slow_predict(features):
+        time.sleep(0.1)
+        return (features[:, 0],)
+
+    async def run():
+        batcher = MicroBatcher("slow", slow_predict, max_batch_size=1, max_wait_ms=0,
+                               runner=lambda fn, x: asyncio.to_thread(fn, x), admission=admission)
+        results = await asyncio.gather(
+            *(batcher.submit(np.array([[float(i)]])) for i in range(3)), return_exceptions=True
+        )
+        await batcher.close()
+        return results
+
+    results = asyncio.run(run())
+    assert results[0] == (0.0,)
+    assert all(isinstance(result, Overloaded) for result in results[1:])
+    assert admission.depth == 0 and admission.shed[QUEUE_WAIT] == 2
+
+if __name__ == "__main__":
+    test_full_queue_rejects_at_once()
+    test_stale_pool_tasks_are_shed()
+    test_batcher_sheds_requests_queued_too_long()
+    print("SUCCESS: Admission control tests passed")
@@ -0,0 +1,52 @@
+#!/usr/bin/env python3
+"""
+Test script for the precomputed questionnaire answer tables
+"""
+
+import sys
+import os
+
+import numpy as np
+
+# Add the parent directory to the path so we can import from the server
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from models.answer_tables import build_answer_table
+from models.mappers import HeartInput, HEART_FIELD_MAPS, map_heart_batch, map_heart_input
+
+def _threshold_predict(features):
+    """Stand-in binary model: risky when the max heart rate feature is high"""
+    return (features[:, 7] >= 150).astype(int), features[:, 9] / 2.0
+
+def test_table_matches_live_inference():
+    """Every enumerated combination returns exactly what the model returns"""
+    table = build_answer_table(HEART_FIELD_MAPS, HeartInput, map_heart_batch, _threshold_predict)
+    assert len(table) == 4 ** 6
+
+    data = HeartInput(
+        chestPain="often", breathingDifficulty="moderate", fatigue="often",
+        heartRate="fast", age="50_70", exerciseHabits="never"
+    )
+    prediction, confidence = table.lookup(data)
+    expected_prediction, expected_confidence = _threshold_predict(map_heart_input(data))
+    assert prediction == expected_prediction[0]
+    assert confidence == expected_confidence[0]
+
+def test_unknown_answers_miss():
+    """Answers outside the enumerated domain are left to live inference"""
+    table = build_answer_table(HEART_FIELD_MAPS, HeartInput, map_heart_batch, _threshold_predict)
+    known = HeartInput(
+        chestPain="never", breathingDifficulty="no", fatigue="never",
+        heartRate="slow", age="under_30", exerciseHabits="daily"
+    )
+    unknown = known.model_copy(update={"heartRate": "racing"})
+
+    assert table.lookup(unknown) is None
+    indices = table.lookup_many([known, unknown])
+    np.testing.assert_array_equal(indices, [0, -1])
+    assert table.stats() == {"entries": 4 ** 6, "hits": 1, "misses": 2}
+
+if __name__ == "__main__":
+    test_table_matches_live_inference()
+    test_unknown_answers_miss()
+    print("SUCCESS: Answer table tests passed")
@@ -0,0 +1,122 @@
+#!/usr/bin/env python3
+"""
+Test script for the offline batch-scoring CLI
+"""
+
+import sys
+import os
+import csv
+import pickle
+import tempfile
+from pathlib import Path
+
+import joblib
+import numpy as np
+from sklearn.linear_model import LogisticRegression
+from sklearn.preprocessing import LabelEncoder
+from sklearn.svm import SVC
+
+# Add the parent directory to the path so we can import from the server
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from batch import main, score_file
+from config import settings
+from models.adapters import build_adapter
+from models.ensemble import select_common_predictions
+from models.numpy_nn import NumpyNetwork
+from models.raw_features import RAW_FEATURE_COLUMNS
+
+def _project(root: Path) -> SVC:
+    """A project root holding a heart model saved as the notebooks saved it"""
+    rng = np.random.default_rng(0)
+    features = rng.random((80, 13))
+    model = SVC().fit(features, (features.sum(axis=1) > 6.5).astype(int))
+    path = root / settings.HEART_MODEL_PATH
+    path.parent.mkdir(parents=True)
+    with open(path, "wb") as f:
+        pickle.dump(model, f)
+    return model
+
+def test_results_are_in_input_order():
+    """Blocks scored by several workers are written back in input order"""
+    with tempfile.TemporaryDirectory() as tmp:
+        root = Path(tmp)
+        model = _project(root)
+        features = np.random.default_rng(1).random((50, 13))
+        with open(root / "in.csv", "w") as f:
+            f.write(",".join(["id"] + RAW_FEATURE_COLUMNS["heart"]) + "\n")
+            for i, row in enumerate(features):
+                f.write(",".join([str(i)] + [repr(value) for value in row]) + "\n")
+            f.write("bad" + ",x" * 13 + "\n")
+
+        summary = score_file("heart", str(root / "in.csv"), str(root / "out.csv"), 2, 7, project_root=root)
+        assert summary["rows"] == 51 and summary["rows_per_second"] > 0
+
+        lines = (root / "out.csv").read_text().splitlines()
+        assert lines[0] == "row,prediction,risk,confidence,error"
+        rows = [line.split(",") for line in lines[1:]]
+        assert [int(row[0]) for row in rows] == list(range(51))
+        expected, _ = build_adapter("heart", model, sparse=False).infer(features)
+        assert [int(row[1]) for row in rows[:50]] == expected.tolist()
+        assert rows[50][1] == "" and rows[50][4]
+
+def test_questionnaire_input():
+    """Questionnaire rows are validated and mapped like API requests"""
+    with tempfile.TemporaryDirectory() as tmp:
+        root = Path(tmp)
+        _project(root)
+        (root / "answers.csv").write_text(
+            "chestPain,breathingDifficulty,fatigue,heartRate,age,exerciseHabits\n"
+            "often,moderate,often,fast,50_70,never\n"
+            ",,,,,\n"
+        )
+        score_file("heart", str(root / "answers.csv"), str(root / "out.csv"), 1, 100,
+                   questionnaire=True, project_root=root)
+        rows = [line.split(",") for line in (root / "out.csv").read_text().splitlines()[1:]]
+        assert rows[0][1] in ("0", "1") and rows[1][1] == ""
+
+def test_common_symptom_lists():
+    """Symptom lists are scored by the more confident common model and named"""
+    with tempfile.TemporaryDirectory() as tmp:
+        root = Path(tmp)
+        (root / settings.LOGISTIC_MODEL_PATH).parent.mkdir(parents=True)
+        columns = ["fever", "cough", "sore_throat", "headache"]
+        joblib.dump(columns, root / settings.SYMPTOM_COLUMNS_PATH)
+        joblib.dump(LabelEncoder().fit(["cold", "flu", "migraine, chronic"]), root / settings.ENCODER_PATH)
+        symptoms = np.eye(4)[[0, 1, 2, 3, 0, 1]]
+        logistic = LogisticRegression().fit(symptoms, [1, 0, 0, 2, 1, 0])
+        joblib.dump(logistic, root / settings.LOGISTIC_MODEL_PATH)
+        rng = np.random.default_rng(3)
+        network = NumpyNetwork([(rng.random((4, 3)), rng.random(3), "softmax")])
+        network.save(root / settings.NEURAL_NUMPY_PATH)
+        (root / "in.csv").write_text('id,symptoms\n1,Fever;cough\n2,\n3,"headache; sore throat"\n')
+
+        score_file("common", str(root / "in.csv"), str(root / "out.csv"), 1, 2, project_root=root)
+        with open(root / "out.csv", newline="") as f:
+            rows = list(csv.reader(f))[1:]
+        assert [row[0] for row in rows] == ["0", "1", "2"]
+        assert rows[1] == ["1", "", "", "", "no symptoms"]
+
+        features = np.array([[1, 1, 0, 0], [0, 0, 1, 1]], dtype=float)
+        predictions, confidences, _ = select_common_predictions(
+            *build_adapter("logistic", logistic, sparse=False).infer(features),
+            *build_adapter("neural", network, sparse=False).infer(features),
+        )
+        expected = np.array(["cold", "flu", "migraine, chronic"])[predictions]
+        assert [rows[0][1], rows[2][1]] == expected.tolist()
+        assert [float(rows[0][3]), float(rows[2][3])] == (confidences * 100).tolist()
+        assert rows[0][2] == rows[2][2] == ""
+
+def test_missing_columns_fail():
+    """An input without the model's columns is an error, not an empty output"""
+    with tempfile.TemporaryDirectory() as tmp:
+        path = Path(tmp) / "in.csv"
+        path.write_text("age,sex\n50,1\n")
+        assert main(["score", "--model", "heart", str(path), str(Path(tmp) / "out.csv")]) == 1
+
+if __name__ == "__main__":
+    test_results_are_in_input_order()
+    test_questionnaire_input()
+    test_common_symptom_lists()
+    test_missing_columns_fail()
+    print("SUCCESS: Batch scoring tests passed")
@@ -0,0 +1,104 @@
+#!/usr/bin/env python3
+"""
+Test script for the micro-batching inference scheduler
+"""
+
+import asyncio
+import sys
+import os
+import threading
+
+import numpy as np
+
+# Add the parent directory to the path so we can import from the server
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from models.batching import MicroBatcher
+from models.executor import InferenceExecutor
+
+def _sum_predict(calls):
+    """Predict function that records batch sizes and returns row sums"""
+    def predict(features):
+        calls.append(features.shape[0])
+        return features.sum(axis=1), features[:, 0] * 10
+    return predict
+
+def test_concurrent_requests_share_one_batch():
+    """Concurrent submissions are scored in a single vectorized call"""
+    calls = []
+
+    async def run():
+        batcher = MicroBatcher("sum", _sum_predict(calls), max_batch_size=16, max_wait_ms=20)
+        rows = [np.array([[i, 1.0, 2.0]]) for i in range(10)]
+        results = await asyncio.gather(*(batcher.submit(row) for row in rows))
+        await batcher.close()
+        return batcher, results
+
+    batcher, results = asyncio.run(run())
+
+    assert calls == [10]
+    for i, (total, scaled) in enumerate(results):
+        assert total == i + 3.0
+        assert scaled == i * 10
+    stats = batcher.stats.snapshot()
+    assert stats["requests"] == 10
+    assert stats["batches"] == 1
+    assert stats["max_batch_size"] == 10
+
+def test_batches_respect_max_size():
+    """A burst larger than the batch limit is split into several calls"""
+    calls = []
+
+    async def run():
+        batcher = MicroBatcher("sum", _sum_predict(calls), max_batch_size=4, max_wait_ms=20)
+        await asyncio.gather(*(batcher.submit(np.ones((1, 2))) for _ in range(10)))
+        await batcher.close()
+
+    asyncio.run(run())
+
+    assert calls == [4, 4, 2]
+
+def test_errors_reach_every_caller():
+    """A failing predict call raises in each waiting request"""
+    def predict(features):
+        raise ValueError("boom")
+
+    async def run():
+        batcher = MicroBatcher("broken", predict, max_batch_size=8, max_wait_ms=5)
+        results = await asyncio.gather(
+            *(batcher.submit(np.ones((1, 2))) for _ in range(3)),
+            return_exceptions=True
+        )
+        await batcher.close()
+        return batcher, results
+
+    batcher, results = asyncio.run(run())
+
+    assert all(isinstance(result, ValueError) for result in results)
+    assert batcher.stats.errors == 3
+
+def test_runner_moves_inference_to_family_pool():
+    """Batches run on the model family's worker pool, not the event loop"""
+    threads = []
+
+    def predict(features):
+        threads.append(threading.current_thread().name)
+        return (features.sum(axis=1),)
+
+    async def run():
+        executor = InferenceExecutor({"common": 2})
+        batcher = MicroBatcher("neural", predict, max_wait_ms=5, runner=executor.runner("neural"))
+        result = await batcher.submit(np.ones((1, 3)))
+        await batcher.close()
+        executor.shutdown()
+        return result
+
+    assert asyncio.run(run()) == (3.0,)
+    assert threads[0].startswith("infer-common")
+
+if __name__ == "__main__":
+    test_concurrent_requests_share_one_batch()
+    test_batches_respect_max_size()
+    test_errors_reach_every_caller()
+    test_runner_moves_inference_to_family_pool()
+    print("SUCCESS: Micro-batching tests passed")
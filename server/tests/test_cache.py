@@ -0,0 +1,55 @@
+#!/usr/bin/env python3
+"""
+Test script for the LRU prediction cache
+"""
+
+import sys
+import os
+
+# Add the parent directory to the path so we can import from the server
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from models.cache import LRUCache
+from models.mappers import SymptomIndex
+
+def test_least_recently_used_entry_is_evicted():
+    """A full cache drops the entry that was used longest ago"""
+    cache = LRUCache(max_entries=2)
+    cache.put("a", 1)
+    cache.put("b", 2)
+    assert cache.get("a") == 1
+    cache.put("c", 3)
+
+    assert cache.get("b") is None
+    assert cache.get("a") == 1
+    assert cache.get("c") == 3
+    stats = cache.stats()
+    assert stats["evictions"] == 1
+    assert stats["hits"] == 3
+    assert stats["misses"] == 1
+
+def test_entries_expire_after_ttl():
+    """With a TTL, old entries are treated as misses"""
+    now = [100.0]
+    cache = LRUCache(max_entries=4, ttl_seconds=10, clock=lambda: now[0])
+    cache.put("a", 1)
+    now[0] += 5
+    assert cache.get("a") == 1
+    now[0] += 6
+    assert cache.get("a") is None
+    assert cache.stats()["expirations"] == 1
+    assert len(cache) == 0
+
+def test_symptom_positions_ignore_spelling_order_and_duplicates():
+    """Equivalent symptom lists produce the same cache key"""
+    index = SymptomIndex(["fever", "cough", "sore_throat", "muscle_pain"])
+    first = index.positions_of(["Fever", "sore throat", "body aches"])
+    second = index.positions_of(["muscle_pain", "SORE_THROAT ", "fever", "FEVER", "not a symptom"])
+    assert first == second == (0, 2, 3)
+    assert index.positions_of(["fever", "cough"]) != first
+
+if __name__ == "__main__":
+    test_least_recently_used_entry_is_evicted()
+    test_entries_expire_after_ttl()
+    test_symptom_positions_ignore_spelling_order_and_duplicates()
+    print("SUCCESS: Cache tests passed")
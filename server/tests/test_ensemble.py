@@ -0,0 +1,80 @@
+#!/usr/bin/env python3
+"""
+Test script for concurrent scoring of the common-disease models
+"""
+
+import sys
+import os
+import asyncio
+import time
+
+# Add the parent directory to the path so we can import from the server
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from models.ensemble import EnsembleStats, run_models
+
+def _model(prediction, confidence, delay, finished):
+    """Model call answering (prediction, confidence) after `delay` seconds"""
+    async def call():
+        await asyncio.sleep(delay)
+        finished.append(prediction)
+        return prediction, confidence
+    return call
+
+def test_models_run_concurrently():
+    """Both answers are returned after the slower model, not the sum of both"""
+    finished = []
+    stats = EnsembleStats(("logistic", "neural"))
+    started = time.perf_counter()
+    outputs = asyncio.run(run_models({
+        "logistic": _model("a", 0.9, 0.2, finished),
+        "neural": _model("b", 0.4, 0.2, finished),
+    }, stats=stats))
+    assert time.perf_counter() - started < 0.35
+    assert outputs == {"logistic": ("a", 0.9), "neural": ("b", 0.4)}
+    assert stats.snapshot()["combined"] == 1
+
+def test_first_confident_answer_cancels_the_other():
+    """A fast answer over the threshold is returned alone and the slow call never finishes"""
+    finished = []
+    stats = EnsembleStats(("logistic", "neural"))
+
+    async def run():
+        outputs = await run_models({
+            "logistic": _model("a", 0.3, 0.3, finished),
+            "neural": _model("b", 0.8, 0.01, finished),
+        }, threshold=0.5, stats=stats)
+        await asyncio.sleep(0.4)
+        return outputs
+
+    assert asyncio.run(run()) == {"neural": ("b", 0.8)}
+    assert finished == ["b"]
+    assert stats.snapshot() == {"combined": 0, "early_exits": {"logistic": 0, "neural": 1}, "cancelled": 1}
+
+def test_unconfident_answers_are_combined():
+    """When the first answer is below the threshold both answers are used"""
+    finished = []
+    outputs = asyncio.run(run_models({
+        "logistic": _model("a", 0.3, 0.1, finished),
+        "neural": _model("b", 0.2, 0.01, finished),
+    }, threshold=0.5))
+    assert outputs == {"logistic": ("a", 0.3), "neural": ("b", 0.2)}
+
+def test_errors_propagate():
+    """A failing model fails the request even when early exit is enabled"""
+    async def broken():
+        raise RuntimeError("model failed")
+
+    for threshold in (0.0, 0.5):
+        try:
+            asyncio.run(run_models({"logistic": broken, "neural": _model("b", 0.2, 0.01, [])}, threshold))
+            assert False, "the model error should propagate"
+        except RuntimeError as e:
+            assert str(e) == "model failed"
+
+if __name__ == "__main__":
+    test_models_run_concurrently()
+    test_first_confident_answer_cancels_the_other()
+    test_unconfident_answers_are_combined()
+    test_errors_propagate()
+    print("SUCCESS: Ensemble tests passed")
@@ -0,0 +1,100 @@
+#!/usr/bin/env python3
+"""
+Test script for lazy, per-model loading in ModelLoader
+"""
+
+import sys
+import os
+import tempfile
+import threading
+from pathlib import Path
+
+import joblib
+import numpy as np
+from sklearn.svm import SVC
+
+# Add the parent directory to the path so we can import from the server
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from config import settings
+from models.loader import ARTIFACTS, FAILED, LOADED, NOT_LOADED, ModelLoader
+
+def _lazy_loader(project_root):
+    """Loader over a project root containing only the diabetes model, with counted loads"""
+    features = np.random.default_rng(0).normal(size=(40, 8))
+    model = SVC(kernel="linear").fit(features, (features[:, 0] > 0).astype(int))
+    path = Path(project_root) / settings.DIABETES_MODEL_PATH
+    path.parent.mkdir(parents=True)
+    joblib.dump(model, path)
+
+    loader = ModelLoader()
+    loader.project_root = Path(project_root)
+    loader.load_counts = {}
+    load_artifact = loader._load_artifact
+
+    def counted(name):
+        loader.load_counts[name] = loader.load_counts.get(name, 0) + 1
+        return load_artifact(name)
+    loader._load_artifact = counted
+    return loader
+
+def _with_load_modes(modes, test):
+    original = settings.MODEL_LOAD_MODES
+    settings.MODEL_LOAD_MODES = modes
+    try:
+        with tempfile.TemporaryDirectory() as tmp:
+            test(_lazy_loader(tmp))
+    finally:
+        settings.MODEL_LOAD_MODES = original
+
+def test_lazy_models_load_once_on_first_use():
+    """Concurrent first requests share a single load"""
+    def check(loader):
+        assert loader.load_all_models()
+        assert loader.load_counts == {}
+        assert set(loader.get_load_states().values()) == {NOT_LOADED}
+
+        threads = [threading.Thread(target=loader.get_adapter, args=("diabetes",)) for _ in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        assert loader.load_counts == {"diabetes": 1}
+        assert loader.get_load_states()["diabetes"] == LOADED
+        labels, _ = loader.get_adapter("diabetes").infer(np.zeros((2, 8)))
+        assert len(labels) == 2
+
+    _with_load_modes({name: "lazy" for name in ARTIFACTS}, check)
+
+def test_failures_are_reported_not_retried():
+    """A missing artifact is reported as failed and not loaded again"""
+    def check(loader):
+        assert loader.get_model("heart") is None
+        assert loader.get_model("heart") is None
+        assert loader.load_counts == {"heart": 1}
+        assert loader.get_load_states()["heart"] == FAILED
+
+    _with_load_modes({name: "lazy" for name in ARTIFACTS}, check)
+
+def test_eager_models_load_at_startup():
+    """Eager artifacts load in load_all_models, which fails if any of them fails"""
+    def check(loader):
+        assert loader.load_all_models()
+        assert loader.load_counts == {"diabetes": 1}
+        assert loader.get_load_states()["heart"] == NOT_LOADED
+
+    modes = {name: "lazy" for name in ARTIFACTS}
+    _with_load_modes({**modes, "diabetes": "eager"}, check)
+
+    def check_failure(loader):
+        assert not loader.load_all_models()
+        assert loader.get_load_states()["heart"] == FAILED
+
+    _with_load_modes({**modes, "heart": "eager"}, check_failure)
+
+if __name__ == "__main__":
+    test_lazy_models_load_once_on_first_use()
+    test_failures_are_reported_not_retried()
+    test_eager_models_load_at_startup()
+    print("SUCCESS: Model loader tests passed")
@@ -0,0 +1,82 @@
+#!/usr/bin/env python3
+"""
+Test script for the asynchronous load generator
+"""
+
+import sys
+import os
+import asyncio
+
+import httpx
+from fastapi import FastAPI, HTTPException
+
+# Add the parent directory to the path so we can import from the server
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from scripts.loadgen import ENDPOINTS, parse_mix, request_picker, run_load
+
+def _stub_app():
+    """App answering every prediction endpoint, failing every heart request"""
+    app = FastAPI()
+
+    @app.post("/predict/{disease}")
+    async def predict(disease: str):
+        if disease == "heart":
+            raise HTTPException(status_code=503, detail="unavailable")
+        return {"prediction": 0}
+    return app
+
+def _run(app, **load):
+    async def main():
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://loadgen") as client:
+            pick = request_picker(parse_mix("diabetes=1,heart=1,common=2"), "random", seed=0)
+            return await run_load(client, pick, **load)
+    return asyncio.run(main())
+
+def test_parse_mix():
+    """Weights default to 1 and unknown endpoints are rejected"""
+    assert parse_mix("diabetes,common=3") == {"diabetes": 1.0, "common": 3.0}
+    for mix in ("unknown=1", "diabetes=0"):
+        try:
+            parse_mix(mix)
+            assert False, f"{mix} should be rejected"
+        except ValueError:
+            pass
+
+def test_random_payloads_follow_the_mix():
+    """Only endpoints in the mix are picked, each with a complete request body"""
+    pick = request_picker(parse_mix("parkinsons=1,common=1"), "random", seed=1)
+    picks = [pick() for _ in range(200)]
+    assert {endpoint for endpoint, _ in picks} == {"parkinsons", "common"}
+    for endpoint, body in picks:
+        assert endpoint in ENDPOINTS
+        if endpoint == "common":
+            assert body["symptoms"]
+        else:
+            assert len(body) == 6
+
+def test_closed_loop_report():
+    """Closed-loop runs report throughput, errors and percentiles per endpoint"""
+    summary = _run(_stub_app(), concurrency=4, duration=0.3)
+    overall = summary["overall"]
+    assert overall["requests"] > 0
+    assert overall["throughput_rps"] > 0
+    assert set(summary["endpoints"]) == {"diabetes", "heart", "common"}
+    assert summary["endpoints"]["heart"]["error_rate"] == 1.0
+    assert summary["endpoints"]["diabetes"]["errors"] == 0
+    assert overall["errors"] == summary["endpoints"]["heart"]["requests"]
+    latency = overall["latency_ms"]
+    assert latency["p50"] <= latency["p95"] <= latency["p99"] <= latency["max"]
+
+def test_open_loop_sends_the_scheduled_requests():
+    """Open-loop runs send rate times duration requests"""
+    summary = _run(_stub_app(), concurrency=4, duration=0.5, rps=40)
+    assert summary["overall"]["requests"] == 20
+
+if __name__ == "__main__":
+    test_parse_mix()
+    test_random_payloads_follow_the_mix()
+    test_closed_loop_report()
+    test_open_loop_sends_the_scheduled_requests()
+    print("SUCCESS: Load generator tests passed")
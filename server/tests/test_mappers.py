@@ -0,0 +1,155 @@
+#!/usr/bin/env python3
+"""
+Test script for the vectorized input mappers
+"""
+
+import sys
+import os
+import itertools
+
+import numpy as np
+
+# Add the parent directory to the path so we can import from the server
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from models.mappers import (
+    DiabetesInput, HeartInput, ParkinsonsInput, CommonInput, SymptomIndex,
+    DIABETES_FIELD_MAPS, HEART_FIELD_MAPS, PARKINSONS_FIELD_MAPS,
+    map_diabetes_input, map_heart_input, map_parkinsons_input, map_common_symptoms,
+    map_diabetes_batch, map_heart_batch, map_parkinsons_batch, map_common_symptoms_batch
+)
+
+HEART_HEALTHY = HeartInput(
+    chestPain="never", breathingDifficulty="no", fatigue="never",
+    heartRate="normal", age="50_70", exerciseHabits="daily"
+)
+HEART_SYMPTOMATIC = HeartInput(
+    chestPain="often", breathingDifficulty="moderate", fatigue="often",
+    heartRate="fast", age="50_70", exerciseHabits="never"
+)
+
+def test_diabetes_features():
+    """Diabetes answers map onto the dataset feature layout"""
+    data = DiabetesInput(
+        excessiveThirst="often", frequentUrination="much", unexplainedWeightLoss="moderate",
+        fatigue="often", blurredVision="frequently", slowHealingWounds="much"
+    )
+    expected = [[1, 180, 90, 20, 170, 29, 0.9, 50]]
+    np.testing.assert_allclose(map_diabetes_input(data), expected)
+
+def test_heart_features():
+    """Heart answers follow the dataset-derived heuristics"""
+    expected = np.array([
+        [58, 1, 0, 135, 250, 0, 0, 140, 1, 1.8, 1, 1, 3],
+        [58, 1, 3, 146, 290, 1, 1, 160, 0, 0.8, 2, 0, 2],
+    ])
+    np.testing.assert_allclose(map_heart_batch([HEART_HEALTHY, HEART_SYMPTOMATIC]), expected)
+
+def test_unknown_answers_use_defaults():
+    """Unrecognised answers fall back to the same defaults as before"""
+    data = HeartInput(
+        chestPain="?", breathingDifficulty="?", fatigue="?",
+        heartRate="?", age="?", exerciseHabits="?"
+    )
+    expected = [[50, 1, 0, 135, 250, 0, 0, 140, 0, 1.8, 1, 1, 3]]
+    np.testing.assert_allclose(map_heart_input(data), expected)
+
+def test_parkinsons_severity_scales_jitter_and_shimmer():
+    """Only jitter and shimmer features grow with symptom severity"""
+    mild = ParkinsonsInput(
+        age=60, speech_problems="no", handwriting_changes="no",
+        tremors="no", balance_issues="no", stiffness="no"
+    )
+    severe = ParkinsonsInput(
+        age=60, speech_problems="severe", handwriting_changes="severe",
+        tremors="severe", balance_issues="severe", stiffness="severe"
+    )
+    features = map_parkinsons_batch([mild, severe])
+    assert features.shape == (2, 22)
+    ratio = features[1] / features[0]
+    scaled = [3, 4, 5, 6, 7, 8, 9, 13, 14]
+    np.testing.assert_allclose(ratio[scaled], 4.0)
+    np.testing.assert_allclose(np.delete(ratio, scaled), 1.0)
+
+def test_batch_matches_single_records():
+    """Batch mappers return the same rows as mapping records one at a time"""
+    records = [HEART_HEALTHY, HEART_SYMPTOMATIC, HEART_HEALTHY]
+    single = np.vstack([map_heart_input(record) for record in records])
+    np.testing.assert_array_equal(map_heart_batch(records), single)
+
+    diabetes = [
+        DiabetesInput(
+            excessiveThirst="often", frequentUrination="much", unexplainedWeightLoss="moderate",
+            fatigue="often", blurredVision="frequently", slowHealingWounds="much"
+        ),
+        DiabetesInput(
+            excessiveThirst="never", frequentUrination="no", unexplainedWeightLoss="no",
+            fatigue="never", blurredVision="never", slowHealingWounds="normal"
+        ),
+    ]
+    single = np.vstack([map_diabetes_input(record) for record in diabetes])
+    np.testing.assert_array_equal(map_diabetes_batch(diabetes), single)
+
+    parkinsons = [
+        ParkinsonsInput(
+            age=45, speech_problems="no", handwriting_changes="mild",
+            tremors="moderate", balance_issues="no", stiffness="severe"
+        ),
+        ParkinsonsInput(
+            age=72, speech_problems="severe", handwriting_changes="no",
+            tremors="mild", balance_issues="moderate", stiffness="no"
+        ),
+    ]
+    single = np.vstack([map_parkinsons_input(record) for record in parkinsons])
+    np.testing.assert_array_equal(map_parkinsons_batch(parkinsons), single)
+
+    columns = ["fever", "cough", "sore_throat", "joint_pain"]
+    common = [
+        CommonInput(symptoms=["Fever", "sore throat"], duration="", severity="", age="", medicalHistory=""),
+        CommonInput(symptoms=["unknown"], duration="", severity="", age="", medicalHistory=""),
+    ]
+    matrix = map_common_symptoms_batch(common, columns)
+    np.testing.assert_array_equal(matrix, [[1, 0, 1, 0], [0, 0, 0, 0]])
+    np.testing.assert_array_equal(map_common_symptoms(common[0], columns), matrix[:1])
+
+def test_single_record_mappers_match_batch_on_every_answer():
+    """The scalar single-record mappers agree with the batch mappers, unknown answers included"""
+    for field_maps, input_model, single, batch, fixed in [
+        (DIABETES_FIELD_MAPS, DiabetesInput, map_diabetes_input, map_diabetes_batch, {}),
+        (HEART_FIELD_MAPS, HeartInput, map_heart_input, map_heart_batch, {}),
+        (PARKINSONS_FIELD_MAPS, ParkinsonsInput, map_parkinsons_input, map_parkinsons_batch, {"age": 60}),
+    ]:
+        answers = [list(mapping) + ["?"] for mapping in field_maps.values()]
+        records = [
+            input_model(**dict(zip(field_maps, combination)), **fixed)
+            for combination in itertools.product(*answers)
+        ]
+        expected = batch(records)
+        actual = np.vstack([single(record) for record in records])
+        assert actual.dtype == expected.dtype
+        np.testing.assert_array_equal(actual, expected)
+
+def test_symptom_index_accepts_vocabulary_and_aliases():
+    """Any column name or friendly alias maps to its column, in any case or spacing"""
+    columns = ["fever", "sharp_chest_pain", "nasal_congestion", "runny_nose", "hip_pain"]
+    index = SymptomIndex(columns)
+    assert len(index) == 5
+    assert index.positions_of(["Hip Pain", "hip_pain", "  HIP_PAIN "]) == (4,)
+    assert index.positions_of(["chest pain", "sharp chest pain", "fever"]) == (0, 1)
+    # The alias "runny nose" targets nasal_congestion, but the real column wins
+    assert index.positions_of(["runny nose"]) == (3,)
+    assert index.positions_of(["unknown", ""]) == ()
+
+    common = CommonInput(symptoms=["hip pain", "Fever"], duration="", severity="", age="", medicalHistory="")
+    np.testing.assert_array_equal(map_common_symptoms(common, index), [[1, 0, 0, 0, 1]])
+    np.testing.assert_array_equal(map_common_symptoms(common, columns), [[1, 0, 0, 0, 1]])
+
+if __name__ == "__main__":
+    test_diabetes_features()
+    test_heart_features()
+    test_unknown_answers_use_defaults()
+    test_parkinsons_severity_scales_jitter_and_shimmer()
+    test_batch_matches_single_records()
+    test_single_record_mappers_match_batch_on_every_answer()
+    test_symptom_index_accepts_vocabulary_and_aliases()
+    print("SUCCESS: Mapper tests passed")
@@ -0,0 +1,98 @@
+#!/usr/bin/env python3
+"""
+Test script for the in-process Prometheus metrics
+"""
+
+import sys
+import os
+
+from fastapi import FastAPI, HTTPException
+from fastapi.testclient import TestClient
+
+# Add the parent directory to the path so we can import from the server
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import metrics
+from metrics import MetricsMiddleware, MetricsRegistry
+
+def test_histogram_rendering():
+    """Histogram buckets are cumulative and end with +Inf, sum and count"""
+    registry = MetricsRegistry()
+    latency = registry.histogram("stage_seconds", "Stage time", ("stage",), buckets=(0.01, 0.1))
+    requests = registry.counter("requests_total", "Requests", ("status",))
+
+    series = latency.labels("mapping")
+    for value in (0.005, 0.05, 0.5):
+        series.observe(value)
+    requests.labels("200").inc()
+    requests.labels("200").inc()
+
+    lines = registry.render().splitlines()
+    assert "# TYPE stage_seconds histogram" in lines
+    assert 'stage_seconds_bucket{stage="mapping",le="0.01"} 1' in lines
+    assert 'stage_seconds_bucket{stage="mapping",le="0.1"} 2' in lines
+    assert 'stage_seconds_bucket{stage="mapping",le="+Inf"} 3' in lines
+    assert 'stage_seconds_sum{stage="mapping"} 0.555' in lines
+    assert 'stage_seconds_count{stage="mapping"} 3' in lines
+    assert 'requests_total{status="200"} 2' in lines
+
+def test_middleware_counts_requests():
+    """Requests are counted per route and status, with unknown paths grouped"""
+    app = FastAPI()
+    app.add_middleware(MetricsMiddleware)
+
+    @app.get("/ok")
+    async def ok():
+        return {"ok": True}
+
+    @app.get("/broken")
+    async def broken():
+        raise HTTPException(status_code=503, detail="unavailable")
+
+    client = TestClient(app)
+    before = metrics.REQUESTS.labels("/ok", "200").value
+    errors_before = metrics.ERRORS.labels("/broken").value
+
+    client.get("/ok")
+    client.get("/ok")
+    client.get("/broken")
+    client.get("/no-such-route")
+
+    assert metrics.REQUESTS.labels("/ok", "200").value == before + 2
+    assert metrics.ERRORS.labels("/broken").value == errors_before + 1
+    assert metrics.REQUESTS.labels("unmatched", "404").value >= 1
+    assert metrics.IN_FLIGHT.labels("/ok").value == 0
+    assert metrics.REQUEST_LATENCY.labels("/ok").count >= 2
+
+def test_parameterized_routes_use_their_template():
+    """Requests to routes with path parameters are labelled with the route template"""
+    app = FastAPI()
+    app.add_middleware(MetricsMiddleware)
+
+    @app.post("/predict/{disease}/csv")
+    async def predict_csv(disease: str):
+        return {"disease": disease}
+
+    @app.post("/predict/{disease}/raw")
+    async def predict_raw(disease: str):
+        raise HTTPException(status_code=400, detail="bad body")
+
+    client = TestClient(app)
+    csv_before = metrics.REQUESTS.labels("/predict/{disease}/csv", "200").value
+    raw_before = metrics.REQUESTS.labels("/predict/{disease}/raw", "400").value
+    unmatched_before = metrics.REQUESTS.labels("unmatched", "200").value
+
+    client.post("/predict/heart/csv")
+    client.post("/predict/diabetes/csv")
+    client.post("/predict/heart/raw")
+
+    assert metrics.REQUESTS.labels("/predict/{disease}/csv", "200").value == csv_before + 2
+    assert metrics.REQUESTS.labels("/predict/{disease}/raw", "400").value == raw_before + 1
+    assert metrics.REQUESTS.labels("unmatched", "200").value == unmatched_before
+    assert metrics.IN_FLIGHT.labels("/predict/{disease}/csv").value == 0
+
+if __name__ == "__main__":
+    test_histogram_rendering()
+    test_middleware_counts_requests()
+    test_parameterized_routes_use_their_template()
+    print("SUCCESS: Metrics tests passed")
@@ -0,0 +1,52 @@
+#!/usr/bin/env python3
+"""
+Test script for the microbenchmark regression check
+"""
+
+import sys
+import os
+
+# Add the parent directory to the path so we can import from the server
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from scripts.microbench import BASELINE_PATH, _load_baseline, compare, time_call
+
+def test_time_call():
+    """Timings are positive and the fastest round is not slower than the median"""
+    timing = time_call(lambda: sum(range(100)), min_time=0.001, repeats=3)
+    assert 0 < timing["min_us"] <= timing["median_us"]
+    assert timing["calls_per_round"] >= 1
+
+def test_compare_against_baseline():
+    """Slowdowns over the threshold fail, unknown or other-backend entries are skipped"""
+    baseline = {
+        "map_heart_batch[32]": {"median_us": 100.0, "min_us": 90.0},
+        "map_diabetes_batch[32]": {"median_us": 100.0, "min_us": 90.0},
+        "predict_heart[32]": {"median_us": 100.0, "min_us": 90.0, "backend": "sklearn"},
+    }
+    results = {
+        "map_heart_batch[32]": {"median_us": 140.0, "min_us": 130.0},
+        "map_diabetes_batch[32]": {"median_us": 130.0, "min_us": 110.0},
+        "predict_heart[32]": {"median_us": 500.0, "min_us": 400.0, "backend": "onnx"},
+        "map_parkinsons_batch[32]": {"median_us": 10.0, "min_us": 9.0},
+    }
+    report = compare(results, baseline, threshold=0.25)
+    assert report["regressions"] == ["map_heart_batch[32]"]
+    assert report["passed"] == ["map_diabetes_batch[32]"]
+    assert sorted(report["not_compared"]) == ["map_parkinsons_batch[32]", "predict_heart[32]"]
+    assert abs(results["map_heart_batch[32]"]["change"] - 0.3) < 1e-9
+
+def test_baseline_covers_every_mapper():
+    """The committed baseline has every batch mapper at every batch size, and every single-record mapper"""
+    baseline = _load_baseline(BASELINE_PATH)
+    for mapper in ("map_diabetes_batch", "map_heart_batch", "map_parkinsons_batch", "map_common_symptoms_batch"):
+        for batch_size in (1, 32, 1024):
+            assert f"{mapper}[{batch_size}]" in baseline
+    for mapper in ("map_diabetes_input", "map_heart_input", "map_parkinsons_input", "map_common_symptoms"):
+        assert f"{mapper}[1]" in baseline
+
+if __name__ == "__main__":
+    test_time_call()
+    test_compare_against_baseline()
+    test_baseline_covers_every_mapper()
+    print("SUCCESS: Microbenchmark tests passed")
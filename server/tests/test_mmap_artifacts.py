@@ -0,0 +1,79 @@
+#!/usr/bin/env python3
+"""
+Test script for the memory-mappable model artifacts
+"""
+
+import sys
+import os
+import pickle
+import tempfile
+import time
+from pathlib import Path
+
+import numpy as np
+from sklearn.svm import SVC
+
+# Add the parent directory to the path so we can import from the server
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from models.mmap_artifacts import count_arrays, find_mapped, load_mapped, write_mapped
+from models.numpy_nn import NumpyNetwork
+
+def _pickled_svc(directory: Path) -> Path:
+    """An SVC saved with pickle.dump, as the notebooks saved theirs"""
+    rng = np.random.default_rng(0)
+    features = rng.random((60, 6))
+    model = SVC().fit(features, (features.sum(axis=1) > 3).astype(int))
+    path = directory / "model.sav"
+    with open(path, "wb") as f:
+        pickle.dump(model, f)
+    return path
+
+def test_converted_model_is_mapped():
+    """Every array of a converted SVC is a read-only memory map with the same predictions"""
+    with tempfile.TemporaryDirectory() as tmp:
+        source = _pickled_svc(Path(tmp))
+        with open(source, "rb") as f:
+            original = pickle.load(f)
+        assert count_arrays(original)[0] == 0
+
+        path = write_mapped(original, Path(tmp) / "mmap", "heart", source)
+        mapped = load_mapped(find_mapped(Path(tmp) / "mmap", "heart", source))
+        mapped_arrays, arrays = count_arrays(mapped)
+        assert mapped_arrays == arrays > 0
+        assert not mapped.support_vectors_.flags.writeable
+
+        features = np.random.default_rng(1).random((20, 6))
+        assert np.array_equal(mapped.decision_function(features), original.decision_function(features))
+        assert path.name == "heart.joblib"
+
+def test_numpy_network_is_mapped():
+    """The NumPy network's weights are mapped too"""
+    rng = np.random.default_rng(2)
+    network = NumpyNetwork([(rng.random((5, 4)), rng.random(4), "relu"), (rng.random((4, 3)), rng.random(3), "softmax")])
+    with tempfile.TemporaryDirectory() as tmp:
+        source = Path(tmp) / "network.npz"
+        network.save(source)
+        mapped = load_mapped(write_mapped(network, Path(tmp), "neural", source))
+        assert count_arrays(mapped) == (4, 4)
+        features = rng.random((3, 5))
+        assert np.array_equal(mapped.predict(features), network.predict(features))
+
+def test_stale_copy_is_ignored():
+    """A copy is not used once its source artifact changes"""
+    with tempfile.TemporaryDirectory() as tmp:
+        source = _pickled_svc(Path(tmp))
+        with open(source, "rb") as f:
+            write_mapped(pickle.load(f), Path(tmp), "diabetes", source)
+        assert find_mapped(Path(tmp), "diabetes", source) is not None
+        assert find_mapped(Path(tmp), "heart", source) is None
+
+        stat = source.stat()
+        os.utime(source, ns=(stat.st_atime_ns, stat.st_mtime_ns + int(time.time())))
+        assert find_mapped(Path(tmp), "diabetes", source) is None
+
+if __name__ == "__main__":
+    test_converted_model_is_mapped()
+    test_numpy_network_is_mapped()
+    test_stale_copy_is_ignored()
+    print("SUCCESS: Memory-mapped artifact tests passed")
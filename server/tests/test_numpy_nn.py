@@ -0,0 +1,80 @@
+#!/usr/bin/env python3
+"""
+Test script for the TensorFlow-free neural network forward pass
+"""
+
+import sys
+import os
+import tempfile
+
+import numpy as np
+import pytest
+
+# Add the parent directory to the path so we can import from the server
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from models.adapters import NUMPY, build_adapter
+from models.numpy_nn import NumpyNetwork, extract_dense_layers
+
+def _keras_model(n_features, n_classes):
+    """Small stand-in with the same layer types as the common-disease network"""
+    keras = pytest.importorskip("tensorflow").keras
+    keras.utils.set_random_seed(0)
+    return keras.Sequential([
+        keras.layers.Dense(64, input_shape=(n_features,), activation="relu"),
+        keras.layers.Dropout(0.2),
+        keras.layers.Dense(32, activation="relu"),
+        keras.layers.Dense(n_classes, activation="softmax"),
+    ])
+
+def _symptom_vectors(rows, n_features):
+    rng = np.random.default_rng(0)
+    return (rng.random((rows, n_features)) < 0.1).astype(np.float32)
+
+def test_matches_keras():
+    """The extracted network gives Keras' probabilities, before and after a save/load round trip"""
+    model = _keras_model(40, 7)
+    features = _symptom_vectors(500, 40)
+    expected = model.predict(features, verbose=0)
+
+    network = extract_dense_layers(model)
+    assert network.activations == ["relu", "relu", "softmax"]
+    np.testing.assert_allclose(network.predict(features), expected, atol=1e-6)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "neural.npz")
+        network.save(path)
+        loaded = NumpyNetwork.load(path)
+    np.testing.assert_allclose(loaded.predict(features), expected, atol=1e-6)
+
+    labels, confidences = build_adapter("neural", loaded).infer(features)
+    np.testing.assert_array_equal(labels, np.argmax(expected, axis=1))
+    np.testing.assert_allclose(confidences, expected.max(axis=1), atol=1e-6)
+
+def test_adapter_uses_numpy():
+    """A NumPy network is served without Keras"""
+    rng = np.random.default_rng(1)
+    network = NumpyNetwork([
+        (rng.normal(size=(5, 4)), rng.normal(size=4), "relu"),
+        (rng.normal(size=(4, 3)), rng.normal(size=3), "softmax"),
+    ])
+    adapter = build_adapter("neural", network)
+    assert adapter.method == NUMPY
+    assert adapter.backend == "numpy"
+    assert adapter.n_features == 5
+
+    proba = network.predict(np.eye(5))
+    np.testing.assert_allclose(proba.sum(axis=1), 1.0, rtol=1e-6)
+
+def test_rejects_bad_layers():
+    """Mismatched shapes and unknown activations fail at construction"""
+    with pytest.raises(ValueError):
+        NumpyNetwork([(np.zeros((5, 4)), np.zeros(4), "relu"), (np.zeros((3, 2)), np.zeros(2), "softmax")])
+    with pytest.raises(ValueError):
+        NumpyNetwork([(np.zeros((5, 4)), np.zeros(4), "swish")])
+
+if __name__ == "__main__":
+    test_matches_keras()
+    test_adapter_uses_numpy()
+    test_rejects_bad_layers()
+    print("SUCCESS: NumPy neural network tests passed")
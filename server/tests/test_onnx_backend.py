@@ -0,0 +1,111 @@
+#!/usr/bin/env python3
+"""
+Test script for the ONNX Runtime inference backend
+"""
+
+import sys
+import os
+import json
+import tempfile
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+pytest.importorskip("onnxruntime")
+pytest.importorskip("skl2onnx")
+
+from skl2onnx import convert_sklearn
+from skl2onnx.common.data_types import FloatTensorType
+from sklearn.linear_model import LogisticRegression
+from sklearn.svm import SVC
+
+# Add the parent directory to the path so we can import from the server
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from models.adapters import build_adapter
+from models.onnx_backend import MANIFEST_FILE, OnnxAdapter, build_onnx_adapters, compare_backends
+
+def _training_data(n_classes):
+    rng = np.random.default_rng(0)
+    features = rng.normal(size=(200, 6))
+    labels = np.digitize(features[:, 0] + features[:, 1], np.linspace(-1, 1, n_classes - 1))
+    return features, labels
+
+def _export(model, models_dir, key, zipmap=False):
+    """Write a model's ONNX file and return its manifest entry"""
+    options = {id(model): {"zipmap": zipmap}} if hasattr(model, "predict_proba") else None
+    onnx_model = convert_sklearn(
+        model, initial_types=[("input", FloatTensorType([None, model.n_features_in_]))], options=options
+    )
+    (models_dir / f"{key}.onnx").write_bytes(onnx_model.SerializeToString())
+    return {"key": key, "file": f"{key}.onnx", "n_features": model.n_features_in_, "status": "success"}
+
+def _build(models, entries):
+    """Export models into a temporary manifest directory and build the adapters"""
+    with tempfile.TemporaryDirectory() as tmp:
+        models_dir = Path(tmp)
+        manifest = {"models": [entry(models_dir) for entry in entries]}
+        (models_dir / MANIFEST_FILE).write_text(json.dumps(manifest))
+        fallbacks = {name: build_adapter(name, model) for name, model in models.items()}
+        return fallbacks, build_onnx_adapters(models_dir, fallbacks)
+
+def test_parity_with_sklearn():
+    """ONNX adapters give the sklearn labels and confidences"""
+    X, y = _training_data(2)
+    heart = SVC(kernel="linear").fit(X, y)
+    X_common, y_common = _training_data(5)
+    logistic = LogisticRegression(max_iter=500).fit(X_common, y_common)
+
+    fallbacks, adapters = _build(
+        {"heart": heart, "logistic": logistic},
+        [lambda d: _export(heart, d, "heart"), lambda d: _export(logistic, d, "common_logistic")]
+    )
+    assert isinstance(adapters["heart"], OnnxAdapter)
+    assert isinstance(adapters["logistic"], OnnxAdapter)
+
+    for name, features in [("heart", X), ("logistic", X_common)]:
+        result = compare_backends(fallbacks[name], adapters[name], features, repeats=2)
+        assert result["label_agreement"] == 1.0
+        assert result["max_confidence_diff"] < 1e-3
+        assert set(result["latency_ms"]) == {
+            "reference_single", "candidate_single", "reference_batch", "candidate_batch"
+        }
+
+def test_zipmap_output():
+    """Older exports with ZipMap probability output are still read correctly"""
+    X, y = _training_data(3)
+    logistic = LogisticRegression(max_iter=500).fit(X, y)
+
+    fallbacks, adapters = _build(
+        {"logistic": logistic}, [lambda d: _export(logistic, d, "common_logistic", zipmap=True)]
+    )
+    labels, confidences = adapters["logistic"].infer(X)
+    expected_labels, expected_confidences = fallbacks["logistic"].infer(X)
+    np.testing.assert_array_equal(labels, expected_labels)
+    np.testing.assert_allclose(confidences, expected_confidences, atol=1e-5)
+
+def test_falls_back_to_sklearn():
+    """Missing, failed or broken exports keep the sklearn adapter"""
+    X, y = _training_data(2)
+    models = {name: SVC(kernel="linear").fit(X, y) for name in ("diabetes", "heart", "parkinsons")}
+
+    def broken(models_dir):
+        (models_dir / "heart.onnx").write_bytes(b"not an onnx model")
+        return {"key": "heart", "file": "heart.onnx", "status": "success"}
+
+    fallbacks, adapters = _build(models, [
+        broken,
+        lambda d: {"key": "parkinsons", "file": None, "status": "failed"},
+    ])
+    assert all(adapters[name] is fallbacks[name] for name in models)
+
+    # No manifest at all
+    with tempfile.TemporaryDirectory() as tmp:
+        assert build_onnx_adapters(Path(tmp), fallbacks) == fallbacks
+
+if __name__ == "__main__":
+    test_parity_with_sklearn()
+    test_zipmap_output()
+    test_falls_back_to_sklearn()
+    print("SUCCESS: ONNX backend tests passed")
@@ -0,0 +1,147 @@
+#!/usr/bin/env python3
+"""
+Test script for the raw-feature CSV chunker and binary formats
+"""
+
+import sys
+import os
+import io
+import json
+
+import numpy as np
+import pytest
+
+# Add the parent directory to the path so we can import from the server
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from models.raw_features import (
+    ARROW_MEDIA_TYPE, CSV, NDJSON, NPY_MEDIA_TYPE, RAW_FEATURE_COLUMNS, CsvChunker,
+    arrow_available, encode_results, read_features, write_results
+)
+
+HEART_COLUMNS = RAW_FEATURE_COLUMNS["heart"]
+
+def _heart_csv(rows: int) -> bytes:
+    """A heart extract with an extra label column, as in the training dataset"""
+    lines = [",".join(HEART_COLUMNS + ["target"])]
+    lines += [",".join(str(row * 13 + i) for i in range(13)) + ",1" for row in range(rows)]
+    return ("\n".join(lines) + "\n").encode()
+
+def test_blocks_have_fixed_row_counts():
+    """Rows split across reads are reassembled into blocks of chunk_rows rows"""
+    data = _heart_csv(23)
+    chunker = CsvChunker("heart", 5)
+    blocks = []
+    for start in range(0, len(data), 17):
+        blocks.extend(chunker.feed(data[start:start + 17]))
+    blocks.extend(chunker.finish())
+    assert [block.count(b"\n") for block in blocks] == [5, 5, 5, 5, 3]
+
+    features = np.vstack([chunker.parse_rows(block)[0] for block in blocks])
+    assert features.shape == (23, 13)
+    assert np.array_equal(features[:, 0], np.arange(23) * 13)
+
+def test_header_errors():
+    """Uploads without the feature columns are rejected"""
+    chunker = CsvChunker("heart", 5)
+    try:
+        list(chunker.feed(b"age,sex\n1,0\n"))
+        assert False, "missing columns should be rejected"
+    except ValueError as e:
+        assert "trestbps" in str(e)
+
+    try:
+        list(CsvChunker("heart", 5).finish())
+        assert False, "an empty upload should be rejected"
+    except ValueError:
+        pass
+
+def test_invalid_rows_are_reported():
+    """Rows with a missing or non-numeric value are flagged without failing the block"""
+    chunker = CsvChunker("heart", 5)
+    list(chunker.feed(",".join(reversed(HEART_COLUMNS)).encode() + b"\n"))
+    block = b"\n".join([
+        ",".join(["1"] * 13).encode(),
+        ",".join(["abc"] + ["1"] * 12).encode(),
+        ",".join(["1"] * 12).encode() + b",",
+    ]) + b"\n"
+    features, valid = chunker.parse_rows(block)
+    assert valid.tolist() == [True, False, False]
+
+    lines = encode_results(NDJSON, 10, valid, [1], [0.75]).decode().splitlines()
+    assert json.loads(lines[0]) == {"row": 10, "prediction": 1, "risk": "High Risk", "confidence": 75.0}
+    assert json.loads(lines[1])["row"] == 11 and "error" in json.loads(lines[1])
+    assert encode_results(CSV, 10, valid, [0], [0.5]).decode().splitlines()[0] == "10,0,Low Risk,50.0,"
+
+def test_malformed_rows_do_not_fail_the_block():
+    """Extra fields, broken quotes and blank blocks are invalid rows, counted like the others"""
+    chunker = CsvChunker("heart", 5)
+    list(chunker.feed(b"id," + ",".join(HEART_COLUMNS).encode() + b"\n"))
+    row = ",".join(["1"] * 13).encode()
+    block = b"\n".join([
+        b"a," + row,
+        b"b," + row + b",extra",
+        b'"c,d",' + row,
+        b'e,"1,' + row[2:],
+        b"f," + row,
+    ]) + b"\n"
+    features, valid = chunker.parse_rows(block)
+    assert valid.tolist() == [True, False, True, False, True]
+    assert features.shape == (5, 13)
+
+    features, valid = chunker.parse_rows(b"\n\n\n")
+    assert valid.tolist() == [False, False, False]
+
+def _npy(array: np.ndarray) -> bytes:
+    """An array saved as an .npy body"""
+    output = io.BytesIO()
+    np.save(output, array)
+    return output.getvalue()
+
+def test_npy_body_is_not_copied():
+    """An .npy body is wrapped in place, in either memory order"""
+    matrix = np.arange(26, dtype=np.float64).reshape(2, 13)
+    for array in (matrix, np.asfortranarray(matrix)):
+        body = _npy(array)
+        features = read_features(NPY_MEDIA_TYPE, "heart", body)
+        assert np.array_equal(features, matrix)
+        assert np.shares_memory(features, np.frombuffer(body, dtype=np.uint8))
+
+    for array in (np.zeros((2, 8)), np.array([["a"] * 13]), np.full((1, 13), np.inf)):
+        try:
+            read_features(NPY_MEDIA_TYPE, "heart", _npy(array))
+            assert False, "the body should be rejected"
+        except ValueError:
+            pass
+
+def test_npy_results():
+    """Results come back as an .npy record array, confidences in percent"""
+    results = np.load(io.BytesIO(write_results(NPY_MEDIA_TYPE, [1, 0], [0.75, 0.5])))
+    assert results["prediction"].tolist() == [1, 0]
+    assert results["confidence"].tolist() == [75.0, 50.0]
+
+def test_arrow_round_trip():
+    """Arrow feature columns are read by name and results are written as Arrow"""
+    pyarrow = pytest.importorskip("pyarrow")
+    columns = RAW_FEATURE_COLUMNS["diabetes"]
+    table = pyarrow.table({name: [float(i), float(i + 1)] for i, name in enumerate(reversed(columns))})
+    sink = pyarrow.BufferOutputStream()
+    with pyarrow.ipc.new_stream(sink, table.schema) as writer:
+        writer.write_table(table)
+    features = read_features(ARROW_MEDIA_TYPE, "diabetes", sink.getvalue().to_pybytes())
+    assert features[0].tolist() == list(reversed(range(len(columns))))
+
+    body = write_results(ARROW_MEDIA_TYPE, [1], [0.25])
+    results = pyarrow.ipc.open_stream(body).read_all()
+    assert results.column("confidence").to_pylist() == [25.0]
+
+if __name__ == "__main__":
+    test_blocks_have_fixed_row_counts()
+    test_header_errors()
+    test_invalid_rows_are_reported()
+    test_malformed_rows_do_not_fail_the_block()
+    test_npy_body_is_not_copied()
+    test_npy_results()
+    if arrow_available():
+        test_arrow_round_trip()
+    print("SUCCESS: Raw feature tests passed")
@@ -0,0 +1,52 @@
+#!/usr/bin/env python3
+"""
+Test script for the multi-worker launcher and its memory report
+"""
+
+import sys
+import os
+
+# Add the parent directory to the path so we can import from the server
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from config import settings
+from models.loader import ModelLoader
+from serve import child_pids, memory_report, process_memory
+
+def test_keras_network_is_loaded_after_fork():
+    """Only the Keras neural network is kept out of the pre-fork parent"""
+    loader = ModelLoader()
+    original = settings.NEURAL_BACKEND
+    try:
+        settings.NEURAL_BACKEND = "keras"
+        assert not loader.is_fork_safe("neural")
+        assert loader.is_fork_safe("logistic")
+        settings.NEURAL_BACKEND = "numpy"
+        assert loader.is_fork_safe("neural")
+    finally:
+        settings.NEURAL_BACKEND = original
+
+def test_memory_report_splits_shared_and_unique():
+    """Shared and unique pages add up to the resident set of each process"""
+    if not os.path.exists(f"/proc/{os.getpid()}/smaps_rollup"):
+        print("Skipping memory report test: /proc/<pid>/smaps_rollup is not available")
+        return
+    pid = os.fork()
+    if pid == 0:
+        os.read(os.pipe()[0], 1)
+    try:
+        usage = process_memory(os.getpid())
+        assert usage["rss_mb"] > 0
+        assert abs(usage["shared_mb"] + usage["unique_mb"] - usage["rss_mb"]) < 1.0
+        assert child_pids(os.getpid()) == [pid]
+        report = memory_report(os.getpid())
+        assert list(report["workers"]) == [pid]
+        assert report["workers"][pid]["shared_mb"] > 0
+    finally:
+        os.kill(pid, 9)
+        os.waitpid(pid, 0)
+
+if __name__ == "__main__":
+    test_keras_network_is_loaded_after_fork()
+    test_memory_report_splits_shared_and_unique()
+    print("SUCCESS: Launcher tests passed")
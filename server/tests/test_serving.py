@@ -0,0 +1,102 @@
+#!/usr/bin/env python3
+"""
+Test script for model generations and hot reloads
+"""
+
+import sys
+import os
+import asyncio
+import tempfile
+from pathlib import Path
+
+# Add the parent directory to the path so we can import from the server
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from models.executor import InferenceExecutor
+from models.loader import ModelLoader
+from serving import ModelServer, ReloadInProgress, snapshot_artifacts
+
+class StubLoader(ModelLoader):
+    """Loader whose artifacts are all lazy, so no model file is read"""
+
+    def __init__(self, fail: bool = False):
+        super().__init__()
+        self.fail = fail
+
+    def load_all_models(self) -> bool:
+        return not self.fail
+
+def test_reload_waits_for_in_flight_requests():
+    """The new generation serves new requests while the old one finishes its requests"""
+    executor = InferenceExecutor({"common": 1})
+
+    async def run():
+        server = ModelServer(loader_factory=StubLoader)
+        first = server.start(StubLoader(), executor)
+        first.in_flight += 1
+        reload = asyncio.create_task(server.reload())
+        while server.current is first:
+            await asyncio.sleep(0.01)
+        second = server.current
+        await asyncio.sleep(0.1)
+        # Swapped, but the old generation is kept until its request finishes
+        assert second.number == 2 and not reload.done()
+        first.in_flight -= 1
+        summary = await reload
+        assert summary["generation"] == 2 and summary["previous_drained"]
+        assert server.reloads == 1
+        await server.stop()
+
+    try:
+        asyncio.run(run())
+    finally:
+        executor.shutdown()
+
+def test_failed_reload_keeps_serving():
+    """A generation that fails to load never replaces the current one"""
+    executor = InferenceExecutor({"common": 1})
+
+    async def run():
+        server = ModelServer(loader_factory=lambda: StubLoader(fail=True))
+        first = server.start(StubLoader(), executor)
+        try:
+            await server.reload()
+            assert False, "the reload should fail"
+        except RuntimeError:
+            pass
+        assert server.current is first and server.reloads == 0
+
+        # Only one reload runs at a time
+        server.loader_factory = StubLoader
+        first.in_flight += 1
+        reload = asyncio.create_task(server.reload())
+        await asyncio.sleep(0.05)
+        try:
+            await server.reload()
+            assert False, "a concurrent reload should be rejected"
+        except ReloadInProgress:
+            pass
+        first.in_flight -= 1
+        await reload
+        await server.stop()
+
+    try:
+        asyncio.run(run())
+    finally:
+        executor.shutdown()
+
+def test_snapshot_detects_changed_artifacts():
+    """Replacing a model file changes the directory snapshot"""
+    with tempfile.TemporaryDirectory() as tmp:
+        path = Path(tmp) / "model.sav"
+        path.write_bytes(b"v1")
+        before = snapshot_artifacts([tmp, os.path.join(tmp, "missing")])
+        assert list(before) == [str(path)]
+        path.write_bytes(b"v2 retrained")
+        assert snapshot_artifacts([tmp]) != before
+
+if __name__ == "__main__":
+    test_reload_waits_for_in_flight_requests()
+    test_failed_reload_keeps_serving()
+    test_snapshot_detects_changed_artifacts()
+    print("SUCCESS: Model reload tests passed")
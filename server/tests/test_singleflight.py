@@ -0,0 +1,83 @@
+#!/usr/bin/env python3
+"""
+Test script for single-flight request deduplication
+"""
+
+import sys
+import os
+import asyncio
+
+# Add the parent directory to the path so we can import from the server
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from models.mappers import DiabetesInput
+from models.singleflight import SingleFlight, request_key
+
+ANSWERS = {
+    "excessiveThirst": "often", "frequentUrination": "much", "unexplainedWeightLoss": "moderate",
+    "fatigue": "often", "blurredVision": "frequently", "slowHealingWounds": "much",
+}
+
+def test_concurrent_calls_share_one_computation():
+    """Identical concurrent calls run once; later calls run again"""
+    async def run():
+        flight = SingleFlight()
+        calls = 0
+
+        async def compute():
+            nonlocal calls
+            calls += 1
+            await asyncio.sleep(0.05)
+            return calls
+
+        results = await asyncio.gather(*(flight.run("key", compute) for _ in range(5)))
+        assert results == [1] * 5 and calls == 1
+        assert flight.stats() == {"in_flight": 0, "leaders": 1, "coalesced": 4}
+        assert await flight.run("key", compute) == 2
+
+    asyncio.run(run())
+
+def test_cancelled_caller_does_not_cancel_others():
+    """A disconnecting caller leaves the shared computation running"""
+    async def run():
+        flight = SingleFlight()
+
+        async def compute():
+            await asyncio.sleep(0.05)
+            return "done"
+
+        first = asyncio.ensure_future(flight.run("key", compute))
+        second = asyncio.ensure_future(flight.run("key", compute))
+        await asyncio.sleep(0.01)
+        first.cancel()
+        assert await second == "done"
+
+    asyncio.run(run())
+
+def test_errors_reach_every_caller():
+    """A failed computation raises in each waiting caller and is not reused"""
+    async def run():
+        flight = SingleFlight()
+
+        async def fail():
+            await asyncio.sleep(0.01)
+            raise ValueError("model error")
+
+        results = await asyncio.gather(*(flight.run("key", fail) for _ in range(3)), return_exceptions=True)
+        assert all(isinstance(result, ValueError) for result in results)
+        assert "key" not in flight
+
+    asyncio.run(run())
+
+def test_request_key_is_canonical():
+    """Keys depend on the validated field values, not on the payload's field order"""
+    reordered = dict(reversed(list(ANSWERS.items())))
+    assert request_key(DiabetesInput(**ANSWERS)) == request_key(DiabetesInput(**reordered))
+    assert request_key(DiabetesInput(**ANSWERS)) != request_key(DiabetesInput(**dict(ANSWERS, fatigue="never")))
+
+if __name__ == "__main__":
+    test_concurrent_calls_share_one_computation()
+    test_cancelled_caller_does_not_cancel_others()
+    test_errors_reach_every_caller()
+    test_request_key_is_canonical()
+    print("SUCCESS: Single-flight tests passed")
@@ -0,0 +1,73 @@
+#!/usr/bin/env python3
+"""
+Test script for sparse logistic regression scoring
+"""
+
+import sys
+import os
+
+import numpy as np
+from sklearn.linear_model import LogisticRegression
+
+# Add the parent directory to the path so we can import from the server
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from models.adapters import SPARSE, build_adapter
+from models.sparse_logistic import SparseLogistic
+
+rng = np.random.default_rng(0)
+
+def _symptoms(rows, n_features=60, density=0.08):
+    features = (rng.random((rows, n_features)) < density).astype(float)
+    features[0] = 0.0  # a request with no recognized symptoms
+    return features
+
+def test_matches_predict_proba():
+    """Sparse scoring reproduces predict_proba for every LogisticRegression variant"""
+    X = _symptoms(400)
+    variants = [
+        ({}, 8),                               # multinomial softmax
+        ({}, 2),                               # binary sigmoid
+        ({"multi_class": "ovr"}, 8),           # one-vs-rest
+        ({"solver": "liblinear"}, 4),          # one-vs-rest via the solver
+        ({"multi_class": "multinomial"}, 2),   # binary softmax
+    ]
+    for options, n_classes in variants:
+        model = LogisticRegression(max_iter=500, **options).fit(X, rng.integers(0, n_classes, len(X)))
+        scorer = SparseLogistic.from_model(model)
+        test = _symptoms(100)
+        np.testing.assert_allclose(scorer.predict_proba(test), model.predict_proba(test), rtol=0, atol=1e-12)
+        np.testing.assert_array_equal(model.classes_[scorer.predict_proba(test).argmax(axis=1)], model.predict(test))
+
+def test_weighted_features():
+    """Non-binary feature values scale their coefficients"""
+    X = _symptoms(300)
+    model = LogisticRegression(max_iter=500).fit(X, rng.integers(0, 5, len(X)))
+    test = _symptoms(50) * rng.uniform(0.5, 3.0, size=(50, 60))
+    np.testing.assert_allclose(SparseLogistic.from_model(model).predict_proba(test),
+                               model.predict_proba(test), rtol=0, atol=1e-12)
+
+def test_adapter_serves_sparse_scoring():
+    """LogisticRegression adapters use sparse scoring unless disabled"""
+    X = _symptoms(300)
+    model = LogisticRegression(max_iter=500).fit(X, rng.integers(0, 6, len(X)))
+    adapter = build_adapter("logistic", model)
+    assert adapter.method == SPARSE
+    assert adapter.backend == "numpy"
+
+    test = _symptoms(40)
+    labels, confidences = adapter.infer(test)
+    np.testing.assert_array_equal(labels, model.predict(test))
+    np.testing.assert_allclose(confidences, model.predict_proba(test).max(axis=1), rtol=0, atol=1e-12)
+
+    try:
+        SparseLogistic.from_model(model).predict_proba(np.zeros((1, 59)))
+        assert False, "a wrong feature count should be rejected"
+    except ValueError:
+        pass
+
+if __name__ == "__main__":
+    test_matches_predict_proba()
+    test_weighted_features()
+    test_adapter_serves_sparse_scoring()
+    print("SUCCESS: Sparse logistic tests passed")